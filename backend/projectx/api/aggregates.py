@@ -0,0 +1,96 @@
+import json
+from typing import Any, Dict, List
+
+from django.db import connections, models
+from django.db.models import Count, Max, Min, Sum
+from pydantic import BaseModel, Field  # pylint: disable=no-name-in-module
+
+COUNT = "count"
+ROW_COUNT = "pk__count"
+FUNCTIONS = {"sum": Sum, "min": Min, "max": Max}
+SUMMABLE_FIELDS = (models.IntegerField, models.FloatField, models.DecimalField, models.DurationField)
+
+
+class CountResult(BaseModel):  # pylint: disable=too-few-public-methods
+    count: int
+    approximate: bool = Field(False, description="True if the count is an estimate from the table statistics.")
+
+
+class AggregateResult(BaseModel):  # pylint: disable=too-few-public-methods
+    items: List[Dict[str, Any]]
+
+
+def aggregate_name(field_name, function):
+    return f"{field_name}__{function}"
+
+
+def aggregate_names(fields):
+    """
+    Return the names of the aggregates of a mapping of field names to their functions.
+    """
+    return [aggregate_name(field_name, function) for field_name, functions in fields.items() for function in functions]
+
+
+def aggregate_expressions(names):
+    # Field names can not contain the lookup separator, so the aliases never clash with them.
+    expressions = {ROW_COUNT: Count("pk")}
+    for name in names:
+        field_name, function = name.rsplit("__", 1)
+        expressions[name] = FUNCTIONS[function](field_name)
+    return expressions
+
+
+def aggregate_rows(queryset, names, group_by=()):
+    """
+    Return the row count and the named aggregates of the queryset, for each group of the group_by fields, with one
+    query which does not load any objects.
+    """
+    expressions = aggregate_expressions(names)
+    queryset = queryset.prefetch_related(None)
+    if group_by:
+        rows = queryset.values(*group_by).annotate(**expressions).order_by(*group_by)
+    else:
+        rows = [queryset.aggregate(**expressions)]
+
+    return [
+        {
+            **{field_name: row[field_name] for field_name in group_by},
+            COUNT: row[ROW_COUNT],
+            **{name: row[name] for name in names},
+        }
+        for row in rows
+    ]
+
+
+def table_rows(queryset):
+    """
+    Return the number of rows in the table of the queryset estimated by the last ANALYZE, or None if it has not been
+    analyzed.
+    """
+    with connections[queryset.db].cursor() as cursor:
+        cursor.execute("SELECT reltuples FROM pg_class WHERE oid = to_regclass(%s)", [queryset.model._meta.db_table])
+        row = cursor.fetchone()
+    # Tables which have never been analyzed have -1 reltuples.
+    if row is None or row[0] < 0:
+        return None
+    return int(row[0])
+
+
+def plan_rows(queryset):
+    """
+    Return the number of rows the query planner estimates the queryset returns.
+    """
+    return int(json.loads(queryset.explain(format="json"))[0]["Plan"]["Plan Rows"])
+
+
+def estimated_count(queryset, threshold):
+    """
+    Return the number of rows in the queryset, and whether it is an estimate.
+
+    The table statistics are used for an unfiltered queryset and the query plan for a filtered one. When the estimate
+    is below the threshold, or there are no statistics, the rows are counted exactly.
+    """
+    estimate = plan_rows(queryset) if queryset.query.where else table_rows(queryset)
+    if estimate is None or estimate < threshold:
+        return queryset.count(), False
+    return estimate, True
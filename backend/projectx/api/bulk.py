@@ -0,0 +1,319 @@
+from collections import defaultdict
+from functools import reduce
+from operator import or_
+
+from django.core.exceptions import NON_FIELD_ERRORS, ValidationError
+from django.db import transaction
+from django.db.models import Q
+from django.db.models.deletion import Collector
+from django.utils import timezone
+
+from projectx.api.conditional import modification_field_names
+from projectx.api.serialization import MANY_TO_MANY
+
+
+class ItemValidationError(Exception):
+    """
+    Raised with the errors of every invalid item, in the same format as FastAPI request validation errors.
+    """
+
+    def __init__(self, errors):
+        super().__init__(errors)
+        self.errors = errors
+
+
+def item_error(location, field, message):
+    return {"loc": [*location, field], "msg": message, "type": "value_error"}
+
+
+def requested_related_pks(plan, api_instance):
+    value = getattr(api_instance, plan.name)
+    if plan.kind == MANY_TO_MANY:
+        return [related_data[plan.pk_name] for related_data in value]
+    return [] if value is None else [value]
+
+
+def fetch_related_objects(field_plans, api_instances):
+    """
+    Load every related object referenced by the items, with one in_bulk() query per related field.
+    """
+    related_objects = {}
+    for plan in field_plans:
+        if plan.related_model is None:
+            continue
+        pk_field = plan.related_model._meta.pk
+        pks = {
+            pk_field.to_python(pk) for api_instance in api_instances for pk in requested_related_pks(plan, api_instance)
+        }
+        related_objects[plan.name] = plan.related_model.objects.in_bulk(pks)
+    return related_objects
+
+
+def resolve_related(plan, api_instance, related_objects, location, errors):
+    """
+    Return the related objects requested by an item, adding an error for each one which does not exist.
+    """
+    pk_field = plan.related_model._meta.pk
+    resolved = []
+    for pk in requested_related_pks(plan, api_instance):
+        pk = pk_field.to_python(pk)
+        if pk in related_objects[plan.name]:
+            resolved.append(related_objects[plan.name][pk])
+        else:
+            errors.append(item_error(location, plan.name, f"{plan.related_model.__name__} {pk} does not exist."))
+    return resolved
+
+
+def clean_instance(instance, exclude, location, errors):
+    try:
+        # Related objects were checked by fetch_related_objects, and uniqueness by unique_errors.
+        instance.full_clean(exclude=exclude, validate_unique=False)
+    except ValidationError as validation_error:
+        for field, messages in validation_error.message_dict.items():
+            errors.extend(item_error(location, field, message) for message in messages)
+
+
+def unique_field_sets(django_model):
+    """
+    Return the field names of each unconditional unique constraint of the model, single fields first.
+    """
+    opts = django_model._meta
+    field_sets = [(field.name,) for field in opts.fields if field.unique]
+    field_sets.extend(tuple(fields) for fields in opts.unique_together)
+    field_sets.extend(tuple(constraint.fields) for constraint in opts.total_unique_constraints)
+    return list(dict.fromkeys(field_sets))
+
+
+def unique_errors(django_model, instances, locations):
+    """
+    Return an error for each unsaved instance which repeats a unique value of an earlier one, or of a stored row.
+
+    Stored rows are checked with one query per unique constraint for the whole batch, rather than one per instance
+    as full_clean() does.
+    """
+    errors = []
+    for names in unique_field_sets(django_model):
+        django_fields = [django_model._meta.get_field(name) for name in names]
+        attnames = [django_field.attname for django_field in django_fields]
+        field = names[0] if len(names) == 1 else NON_FIELD_ERRORS
+        batch = {}
+        for instance, location in zip(instances, locations):
+            key = tuple(
+                django_field.to_python(getattr(instance, attname))
+                for django_field, attname in zip(django_fields, attnames)
+            )
+            # NULL values never conflict.
+            if None in key:
+                continue
+            if key in batch:
+                value = key[0] if len(key) == 1 else ", ".join(str(part) for part in key)
+                errors.append(item_error(location, field, f"Duplicate {', '.join(names)} {value}."))
+            else:
+                batch[key] = (instance, location)
+
+        if not batch:
+            continue
+
+        if len(attnames) == 1:
+            existing = django_model.objects.filter(**{f"{attnames[0]}__in": [key[0] for key in batch]})
+        else:
+            existing = django_model.objects.filter(reduce(or_, (Q(**dict(zip(attnames, key))) for key in batch)))
+        for key in existing.values_list(*attnames):
+            instance, location = batch[key]
+            message = instance.unique_error_message(django_model, names).messages[0]
+            errors.append(item_error(location, field, message))
+
+    return errors
+
+
+def through_columns(plan):
+    """
+    Return the many to many through model, and its columns referencing the instance and the related object.
+    """
+    django_field = plan.django_field
+    through = django_field.remote_field.through
+    source = through._meta.get_field(django_field.m2m_field_name()).attname
+    target = through._meta.get_field(django_field.m2m_reverse_field_name()).attname
+    return through, source, target
+
+
+def through_rows(plan, instance, related):
+    """
+    Build the rows of a many to many through table linking the instance to the related objects.
+    """
+    through, source, target = through_columns(plan)
+    return [through(**{source: instance.pk, target: pk}) for pk in dict.fromkeys(obj.pk for obj in related)]
+
+
+def insert_links(many_to_many, batch_size=None):
+    rows_by_through = {}
+    for plan, instance, related in many_to_many:
+        rows = through_rows(plan, instance, related)
+        rows_by_through.setdefault(plan.django_field.remote_field.through, []).extend(rows)
+
+    for through, rows in rows_by_through.items():
+        through.objects.bulk_create(rows, batch_size=batch_size)
+
+
+def set_links(manager, related):
+    """
+    Link the instance of a many to many manager to exactly the related objects, like set(), returning True if any
+    links were added or removed.
+    """
+    old_pks = set(manager.values_list("pk", flat=True))
+    new_pks = {obj.pk for obj in related}
+    if old_pks == new_pks:
+        return False
+
+    # Neither makes a query when it has nothing to do.
+    manager.remove(*(old_pks - new_pks))
+    manager.add(*(new_pks - old_pks))
+    return True
+
+
+def bulk_insert(django_model, instances, many_to_many, batch_size=None):
+    """
+    Insert the instances and their many to many links in one transaction, batch_size rows per INSERT.
+    """
+    with transaction.atomic():
+        django_model.objects.bulk_create(instances, batch_size=batch_size)
+        insert_links(many_to_many, batch_size=batch_size)
+
+    return instances
+
+
+def bulk_upsert(  # pylint: disable=too-many-arguments
+    django_model, instances, many_to_many, unique_field, update_fields, batch_size=None
+):
+    """
+    Insert the instances, or update update_fields of the rows which already have their unique_field value, with
+    INSERT ... ON CONFLICT, batch_size rows per statement. Many to many links are replaced.
+    """
+    with transaction.atomic():
+        django_model.objects.bulk_create(
+            instances,
+            batch_size=batch_size,
+            update_conflicts=True,
+            unique_fields=[unique_field],
+            update_fields=update_fields,
+        )
+
+        if many_to_many:
+            # Primary keys are not returned for conflicting rows, so they are read back in one query.
+            values = [getattr(instance, unique_field) for instance in instances]
+            pks = dict(django_model.objects.filter(**{f"{unique_field}__in": values}).values_list(unique_field, "pk"))
+            for instance in instances:
+                instance.pk = pks[getattr(instance, unique_field)]
+
+            for plan in {plan for plan, _, _ in many_to_many}:
+                through, source, _ = through_columns(plan)
+                through.objects.filter(**{f"{source}__in": pks.values()}).delete()
+            insert_links(many_to_many, batch_size=batch_size)
+
+    return instances
+
+
+def clean_identifiers(django_field, identifiers, locations=None, unique=True):
+    """
+    Convert identifiers to python values, raising ItemValidationError for invalid ones, and repeated ones if unique.
+
+    The locations are the location and field of the errors for each identifier, the items of the body by default.
+    """
+    if locations is None:
+        locations = [(["body", index], "identifier") for index in range(len(identifiers))]
+
+    errors = []
+    cleaned = []
+    seen = set()
+    for identifier, (location, field) in zip(identifiers, locations):
+        try:
+            value = django_field.to_python(identifier)
+        except ValidationError as validation_error:
+            errors.extend(item_error(location, field, message) for message in validation_error.messages)
+            continue
+        if unique and value in seen:
+            errors.append(item_error(location, field, f"Duplicate identifier {value}."))
+        seen.add(value)
+        cleaned.append(value)
+
+    if errors:
+        raise ItemValidationError(errors)
+
+    return cleaned
+
+
+def clean_instance_fields(instance, exclude, location, errors):
+    try:
+        instance.clean_fields(exclude=exclude)
+    except ValidationError as validation_error:
+        for field, messages in validation_error.message_dict.items():
+            errors.extend(item_error(location, field, message) for message in messages)
+
+
+def build_updates(django_model, plans_by_name, pks, api_instances):  # pylint: disable=too-many-locals
+    """
+    Build unsaved instances holding only their primary key and the fields set in each item, grouped by those fields.
+    """
+    changes = [list(api_instance.dict(exclude_unset=True)) for api_instance in api_instances]
+    changed_plans = {plans_by_name[field] for changed in changes for field in changed}
+    related_objects = fetch_related_objects(
+        [plan for plan in changed_plans if plan.kind != MANY_TO_MANY], api_instances
+    )
+
+    errors = []
+    groups = defaultdict(list)
+    for index, (pk, api_instance, changed) in enumerate(zip(pks, api_instances, changes)):
+        location = ["body", index, "fields"]
+        instance = django_model(pk=pk)
+        for field in changed:
+            plan = plans_by_name[field]
+            if plan.kind == MANY_TO_MANY:
+                errors.append(item_error(location, field, "Many to many fields can not be updated in bulk."))
+            elif plan.related_model:
+                related = resolve_related(plan, api_instance, related_objects, location, errors)
+                setattr(instance, field, related[0] if related else None)
+            else:
+                setattr(instance, field, getattr(api_instance, field))
+
+        # Unchanged fields hold defaults rather than the stored values, so only changed fields are cleaned.
+        exclude = [field.name for field in django_model._meta.fields if field.name not in changed]
+        exclude.extend(field for field in changed if plans_by_name[field].related_model)
+        clean_instance_fields(instance, exclude, location, errors)
+        if changed:
+            groups[tuple(sorted(changed))].append(instance)
+
+    if errors:
+        raise ItemValidationError(errors)
+
+    return groups
+
+
+def bulk_change(django_model, groups, batch_size=None):
+    """
+    Save each group of instances with bulk_update() of only its changed columns, in one transaction.
+    """
+    # bulk_update() does not call pre_save(), so auto_now fields are set here.
+    modification_fields = modification_field_names(django_model)
+    now = timezone.now()
+    updated = 0
+    with transaction.atomic():
+        for fields, instances in groups.items():
+            for instance in instances:
+                for field in modification_fields:
+                    setattr(instance, field, now)
+            updated += django_model.objects.bulk_update(
+                instances, [*fields, *modification_fields], batch_size=batch_size
+            )
+    return updated
+
+
+def bulk_delete(queryset):
+    """
+    Delete every object in the queryset, returning the total and the number deleted per model.
+
+    When there are no cascades or signal receivers this is one DELETE statement, without loading the objects.
+    """
+    if Collector(using=queryset.db).can_fast_delete(queryset):
+        deleted = queryset._raw_delete(queryset.db)  # pylint: disable=protected-access
+        return deleted, {queryset.model._meta.label: deleted}
+    return queryset.delete()
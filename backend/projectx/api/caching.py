@@ -0,0 +1,202 @@
+import hashlib
+import time
+
+from django.core.cache import caches
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from fastapi import Response
+
+from projectx.api.serialization import MANY_TO_MANY, REVERSE, plan_names
+
+HIT = "HIT"
+MISS = "MISS"
+# Version counters outlive the entries stored under them, so they rarely expire while an entry is still in use.
+VERSION_TIMEOUT_FACTOR = 10
+
+
+def render(response):
+    """
+    Return the JSON body of a route response, which is either a Response or a pydantic model.
+    """
+    if isinstance(response, Response):
+        return response.body
+    return response.json().encode("utf-8")
+
+
+def cached_response(body, status):
+    return Response(body, media_type="application/json", headers={"X-Cache": status})
+
+
+class ResponseCache:  # pylint: disable=too-many-instance-attributes
+    """
+    Read-through cache of the serialized get and list responses of a single RouteBuilder.
+
+    Instead of deleting entries, writes bump version counters which are part of every key once they commit:
+
+    - a list version, bumped by any change to the model or the related models it returns,
+    - an object version per identifier, bumped when that instance is saved or deleted,
+    - a related version, bumped when a related model changes, so single objects stay cached
+      across writes to other instances of the same model.
+    """
+
+    def __init__(  # pylint: disable=too-many-arguments
+        self, model, field_plans, identifier, alias="default", timeout=300
+    ):
+        self.model = model
+        self.identifier = identifier
+        self.alias = alias
+        self.timeout = timeout
+        self.version_timeout = None if timeout is None else timeout * VERSION_TIMEOUT_FACTOR
+        self.identifier_field = model._meta.get_field(identifier)
+        self.prefix = f"routebuilder:{model._meta.label_lower}"
+        self.hits = 0
+        self.misses = 0
+
+        post_save.connect(self.invalidate_instance, sender=model)
+        post_delete.connect(self.invalidate_instance, sender=model)
+        for plan in field_plans:
+            if plan.kind == MANY_TO_MANY:
+                relation = plan.django_field if plan.django_field.auto_created else plan.django_field.remote_field
+                m2m_changed.connect(self.invalidate_related, sender=relation.through)
+            elif plan.kind == REVERSE:
+                post_save.connect(self.invalidate_related, sender=plan.related_model)
+                post_delete.connect(self.invalidate_related, sender=plan.related_model)
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    @property
+    def list_version_key(self):
+        return f"{self.prefix}:list-version"
+
+    @property
+    def related_version_key(self):
+        return f"{self.prefix}:related-version"
+
+    def identifier_key(self, identifier):
+        """
+        Return the stored form of an identifier, so that reads and writes agree on the key of an object whichever way
+        its identifier was written, such as an upper case uuid or an integer with leading zeros.
+        """
+        try:
+            return str(self.identifier_field.to_python(identifier))
+        except ValidationError:
+            return str(identifier)
+
+    def object_version_key(self, identifier):
+        return f"{self.prefix}:object-version:{self.identifier_key(identifier)}"
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses}
+
+    def bump(self, key):
+        try:
+            self.cache.incr(key)
+        except ValueError:
+            # A version which has expired or was never set restarts from the clock, so it can never
+            # reuse a version an existing entry was stored under.
+            self.cache.add(key, time.time_ns(), timeout=self.version_timeout)
+
+    def bump_on_commit(self, *keys, using=None):
+        """
+        Bump the versions once the current transaction commits, or straight away outside of one.
+
+        Signals are sent inside the transaction of the write, so a concurrent read bumped before the commit would
+        store the old committed rows under the new versions until the entry expires.
+        """
+
+        def bump_all():
+            for key in keys:
+                self.bump(key)
+
+        transaction.on_commit(bump_all, using=using)
+
+    def invalidate_instance(self, instance, using=None, **kwargs):  # pylint: disable=unused-argument
+        self.bump_on_commit(
+            self.object_version_key(getattr(instance, self.identifier)), self.list_version_key, using=using
+        )
+
+    def invalidate_related(self, using=None, **kwargs):  # pylint: disable=unused-argument
+        self.bump_on_commit(self.related_version_key, self.list_version_key, using=using)
+
+    def invalidate_all(self):
+        """
+        Invalidate every entry, for writes which do not send signals, such as QuerySet.update().
+        """
+        self.invalidate_related()
+
+    def _entry_key(self, kind, versions, *parts):
+        digest = hashlib.sha1(repr((versions, parts)).encode("utf-8")).hexdigest()
+        return f"{self.prefix}:{kind}:{digest}"
+
+    def _list_key_parts(  # pylint: disable=too-many-arguments
+        self, scope, field_plans, page_request, filters, ordering, search
+    ):
+        return self.list_version_key, (scope, plan_names(field_plans), page_request, filters, ordering, search)
+
+    def _get_key_parts(self, identifier, scope, field_plans):
+        version_keys = (self.related_version_key, self.object_version_key(identifier))
+        return version_keys, (self.identifier_key(identifier), scope, plan_names(field_plans))
+
+    def versions(self, version_keys):
+        versions = self.cache.get_many(version_keys)
+        for key in version_keys:
+            if key not in versions:
+                self.cache.add(key, time.time_ns(), timeout=self.version_timeout)
+                versions[key] = self.cache.get(key)
+        return tuple(versions[key] for key in version_keys)
+
+    async def aversions(self, version_keys):
+        versions = await self.cache.aget_many(version_keys)
+        for key in version_keys:
+            if key not in versions:
+                await self.cache.aadd(key, time.time_ns(), timeout=self.version_timeout)
+                versions[key] = await self.cache.aget(key)
+        return tuple(versions[key] for key in version_keys)
+
+    def list_key(  # pylint: disable=too-many-arguments
+        self, scope, field_plans, page_request, filters=None, ordering=None, search=None
+    ):
+        version_key, parts = self._list_key_parts(scope, field_plans, page_request, filters, ordering, search)
+        return self._entry_key("list", self.versions([version_key]), *parts)
+
+    async def alist_key(  # pylint: disable=too-many-arguments
+        self, scope, field_plans, page_request, filters=None, ordering=None, search=None
+    ):
+        version_key, parts = self._list_key_parts(scope, field_plans, page_request, filters, ordering, search)
+        return self._entry_key("list", await self.aversions([version_key]), *parts)
+
+    def get_key(self, identifier, scope, field_plans):
+        version_keys, parts = self._get_key_parts(identifier, scope, field_plans)
+        return self._entry_key("get", self.versions(version_keys), *parts)
+
+    async def aget_key(self, identifier, scope, field_plans):
+        version_keys, parts = self._get_key_parts(identifier, scope, field_plans)
+        return self._entry_key("get", await self.aversions(version_keys), *parts)
+
+    def fetch(self, key, respond):
+        """
+        Return the cached response for the key, or call respond and cache what it returns.
+        """
+        body = self.cache.get(key)
+        if body is not None:
+            self.hits += 1
+            return cached_response(body, HIT)
+
+        self.misses += 1
+        body = render(respond())
+        self.cache.set(key, body, timeout=self.timeout)
+        return cached_response(body, MISS)
+
+    async def afetch(self, key, arespond):
+        body = await self.cache.aget(key)
+        if body is not None:
+            self.hits += 1
+            return cached_response(body, HIT)
+
+        self.misses += 1
+        body = render(await arespond())
+        await self.cache.aset(key, body, timeout=self.timeout)
+        return cached_response(body, MISS)
@@ -0,0 +1,61 @@
+import hashlib
+
+from django.db import models
+from django.utils.http import http_date, parse_etags, parse_http_date_safe
+from fastapi import Response
+from model_utils.fields import AutoLastModifiedField
+
+
+def is_modification_field(django_field):
+    """
+    Return True if the field is updated with the current time whenever its instance is saved.
+    """
+    if isinstance(django_field, AutoLastModifiedField):
+        return True
+    return isinstance(django_field, models.DateTimeField) and django_field.auto_now
+
+
+def modification_field_names(django_model):
+    return [field.name for field in django_model._meta.concrete_fields if is_modification_field(field)]
+
+
+def make_etag(*parts):
+    # Weak, because it identifies the state of the rows in the response rather than its exact bytes.
+    digest = hashlib.sha1(repr(parts).encode("utf-8")).hexdigest()
+    return f'W/"{digest}"'
+
+
+def validator_headers(etag, last_modified):
+    headers = {"ETag": etag}
+    if last_modified is not None:
+        headers["Last-Modified"] = http_date(last_modified.timestamp())
+    return headers
+
+
+def is_not_modified(etag, last_modified, if_none_match, if_modified_since):
+    """
+    Evaluate If-None-Match, or If-Modified-Since when it is absent, as described in RFC 9110.
+    """
+    if if_none_match is not None:
+        weak_etag = etag.removeprefix("W/")
+        etags = parse_etags(if_none_match)
+        return "*" in etags or any(match.removeprefix("W/") == weak_etag for match in etags)
+
+    if if_modified_since is not None and last_modified is not None:
+        modified_since = parse_http_date_safe(if_modified_since)
+        return modified_since is not None and int(last_modified.timestamp()) <= modified_since
+
+    return False
+
+
+def not_modified_response(headers):
+    return Response(status_code=304, headers=headers)
+
+
+def add_headers(result, response, headers):
+    """
+    Add headers to a route result, which is either a Response or a model serialized into the injected response.
+    """
+    target = result if isinstance(result, Response) else response
+    target.headers.update(headers)
+    return result
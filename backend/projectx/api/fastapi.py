@@ -1,18 +1,102 @@
+# pylint: disable=too-many-lines
 import logging
-from collections import defaultdict
-from typing import Callable, List, Optional
+from contextlib import contextmanager
+from functools import partial, wraps
+from typing import Callable, Dict, List, Optional
 from urllib import parse
 
-from django.core.exceptions import ValidationError
-from django.db import models
-from django.db.models import Q
+from asgiref.sync import sync_to_async
+from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.search import SearchVectorField
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db import DataError, IntegrityError, models, transaction
+from django.db.models import (
+    Count,
+    Exists,
+    Max,
+    OuterRef,
+    Prefetch,
+    Q,
+    prefetch_related_objects,
+)
 from django.db.models.fields import NOT_PROVIDED
 from django.db.models.fields.json import JSONField
+from django.utils import timezone
 from djantic import ModelSchema
 from djantic.fields import FIELD_TYPES, ModelSchemaField
-from fastapi import Body, Depends, Header, HTTPException, Path
-from pydantic import BaseModel, validator  # pylint: disable=no-name-in-module
-
+from fastapi import Body, Depends, Header, HTTPException, Path, Query, Response
+from fastapi.responses import StreamingResponse
+from pydantic import (  # pylint: disable=no-name-in-module
+    BaseModel,
+    Field,
+    root_validator,
+    validator,
+)
+
+from projectx.api.aggregates import (
+    COUNT,
+    FUNCTIONS,
+    SUMMABLE_FIELDS,
+    AggregateResult,
+    CountResult,
+    aggregate_names,
+    aggregate_rows,
+    estimated_count,
+)
+from projectx.api.bulk import (
+    ItemValidationError,
+    build_updates,
+    bulk_change,
+    bulk_delete,
+    bulk_insert,
+    bulk_upsert,
+    clean_identifiers,
+    clean_instance,
+    fetch_related_objects,
+    item_error,
+    resolve_related,
+    set_links,
+    unique_errors,
+)
+from projectx.api.caching import ResponseCache
+from projectx.api.conditional import (
+    add_headers,
+    is_not_modified,
+    make_etag,
+    modification_field_names,
+    not_modified_response,
+    validator_headers,
+)
+from projectx.api.filters import (
+    ARRAY_LOOKUPS,
+    CONTAINS,
+    LOOKUPS,
+    filters_function,
+    filters_q,
+    is_indexed,
+)
+from projectx.api.idempotency import IdempotencyStore, fingerprint
+from projectx.api.operations import Operation, operation_updates, validated_fields
+from projectx.api.pagination import CursorPaginator, InvalidCursorException, Page
+from projectx.api.prefer import (
+    MINIMAL,
+    RETURN_PREFERENCES,
+    minimal_response,
+    return_preference,
+)
+from projectx.api.search import RANK, has_search_index, search_queryset, search_trigger
+from projectx.api.serialization import (
+    FOREIGN_KEY,
+    MANY_TO_MANY,
+    PLAIN,
+    REVERSE,
+    ValuesSerializer,
+    compile_field_plans,
+    dumps,
+    plan_names,
+    plans_to_dict,
+)
+from projectx.api.streaming import ASYNC_STREAMS, MEDIA_TYPES, STREAMS
 from projectx.common.fields import JSONDefaultField
 from projectx.users.models import ApiKey, User
 
@@ -52,6 +136,42 @@ class UnSupportedFieldException(RouteBuilderException):
     pass
 
 
+class InvalidPaginationException(RouteBuilderException):
+    pass
+
+
+class InvalidStreamingException(RouteBuilderException):
+    pass
+
+
+class InvalidCacheException(RouteBuilderException):
+    pass
+
+
+class InvalidConditionalException(RouteBuilderException):
+    pass
+
+
+class InvalidReturnException(RouteBuilderException):
+    pass
+
+
+class InvalidFiltersException(RouteBuilderException):
+    pass
+
+
+class InvalidOrderingException(RouteBuilderException):
+    pass
+
+
+class InvalidAggregateException(RouteBuilderException):
+    pass
+
+
+class InvalidSearchException(RouteBuilderException):
+    pass
+
+
 def check_api_key(x_api_key: str = API_KEY_HEADER) -> User:
     """
     Retrieve the user by the given API key.
@@ -62,12 +182,91 @@ def check_api_key(x_api_key: str = API_KEY_HEADER) -> User:
     raise HTTPException(status_code=400, detail="X-API-Key header invalid.")
 
 
-def schema_for_instance(django_model, fields):
+async def acheck_api_key(x_api_key: str = API_KEY_HEADER) -> User:
+    """
+    Retrieve the user by the given API key, using the async ORM.
+    """
+    api_key = await ApiKey.objects.select_related("user").filter(key=x_api_key).afirst()
+    if api_key:
+        return api_key.user
+    raise HTTPException(status_code=400, detail="X-API-Key header invalid.")
+
+
+def related_prefetches(field_plans):
+    """
+    Plan the prefetches needed to serialize the given fields without a query per instance.
+
+    Only the columns needed to build the list of related identifiers are loaded.
+    """
+    prefetches = []
+    for plan in field_plans:
+        if plan.kind == MANY_TO_MANY:
+            only_fields = ["pk"]
+        elif plan.kind == REVERSE:
+            # The reverse foreign key is needed to match the related objects back to each instance.
+            only_fields = ["pk", plan.django_field.field.attname]
+        else:
+            continue
+        prefetches.append(Prefetch(plan.accessor, queryset=plan.related_model.objects.only(*only_fields)))
+    return prefetches
+
+
+def comma_separated_choices(value, choices, kind):
+    """
+    Return the names in a comma separated query parameter, raising a 400 response if any are not in the choices.
+    """
+    names = [name.strip() for name in (value or "").split(",") if name.strip()]
+    invalid_names = sorted(set(names).difference(choices))
+    if invalid_names:
+        raise HTTPException(status_code=400, detail=f"Invalid {kind} {invalid_names}, choose from {sorted(choices)}.")
+    return tuple(dict.fromkeys(names))
+
+
+@contextmanager
+def http_validation_errors():
+    """
+    Raise item validation errors as a 422 response, in the same format as FastAPI request validation errors.
+    """
+    try:
+        yield
+    except ItemValidationError as validation_error:
+        raise HTTPException(status_code=422, detail=validation_error.errors) from validation_error
+
+
+def new_field_value(django_model, plan, value):
+    # A value may be required by the model but not in specified API fields.
+    # So we try to be helpful here and work out a sensible value to use.
+    if not value:
+        django_field = plan.django_field
+        value_required = not django_field.null and django_field.blank
+        if value_required and django_field.default == NOT_PROVIDED:
+            # A value is required, but no default is set
+            # Try to create a default - for now just an empty string
+            value = django_field.to_python("")
+            logger.warning("Setting %s on %s to %s", plan.name, django_model, value)
+
+        if isinstance(django_field, JSONField) and not isinstance(django_field, JSONDefaultField):
+            value = {"error": f"JSONField not supported with value '{value}', use {json_field_str}"}
+
+    return value
+
+
+def field_has_changed(instance, plan, value):
+    """
+    Return True if setting the field of the instance to the value would change what is stored.
+    """
+    django_field = plan.django_field
+    if plan.related_model and value is not None:
+        value = getattr(value, django_field.target_field.attname)
+    return getattr(instance, django_field.attname) != value
+
+
+def schema_for_instance(django_model, field_plans):
     class SingleSchema(ModelSchema):  # pylint: disable=too-few-public-methods
         class Config:  # pylint: disable=too-few-public-methods
             title = f"New{django_model.__name__}"
             model = django_model
-            include = fields
+            include = [plan.name for plan in field_plans]
             use_enum_values = True
 
         @classmethod
@@ -75,32 +274,20 @@ def schema_for_instance(django_model, fields):
             """
             Convert a Django model instance to an SingleSchema instance.
             """
-            field_data = {}
-            for field in fields:
-                django_field = django_model._meta.get_field(field)
-                if django_field.is_relation:
-                    if django_field.many_to_one:
-                        related_field = getattr(instance, field)
-                        field_data[field] = related_field.pk
-                    elif django_field.many_to_many:
-                        pk_name = django_field.related_model._meta.pk.name
-                        field_data[field] = [{pk_name: related.pk} for related in getattr(instance, field).all()]
-                    else:
-                        pk_name = django_field.related_model._meta.pk.name
-                        reverse_query = {django_field.field.name: instance.pk}
-                        field_data[field] = [
-                            {pk_name: related.pk}
-                            for related in django_field.related_model.objects.filter(**reverse_query)
-                        ]
-                else:
-                    field_data[field] = getattr(instance, field)
+            return cls(**plans_to_dict(cls.field_plans, instance))
 
-            return cls(**field_data)
+    # Fields which djantic leaves out of the schema do not need to be read.
+    SingleSchema.field_plans = tuple(plan for plan in field_plans if plan.name in SingleSchema.__fields__)
 
     return type(f"{django_model.__name__}", (SingleSchema,), {})
 
 
-def schema_for_new_instance(django_model, SingleSchema, fields):  # pylint: disable=invalid-name,too-many-statements
+def schema_for_new_instance(
+    django_model, SingleSchema, field_plans
+):  # pylint: disable=invalid-name,too-many-statements
+    fields = [plan.name for plan in field_plans]
+    plans_by_name = {plan.name: plan for plan in field_plans}
+
     class NewSchema(ModelSchema):
         class Config:  # pylint: disable=too-few-public-methods
             title = f"{django_model.__name__}"
@@ -108,99 +295,196 @@ def schema_for_new_instance(django_model, SingleSchema, fields):  # pylint: disa
             include = fields
             use_enum_values = True
 
-        def create_new(self, extra=None):  # pylint: disable=too-many-locals, too-many-branches
+        def related_values(self, plans):
+            """
+            Resolve the related objects of the given fields, with one in_bulk() query per field.
+            """
+            related_objects = fetch_related_objects(plans, [self])
+            values = {}
+            errors = []
+            for plan in plans:
+                if plan.related_model is None:
+                    continue
+                related = resolve_related(plan, self, related_objects, ["body"], errors)
+                if plan.kind == MANY_TO_MANY:
+                    values[plan.name] = related
+                else:
+                    values[plan.name] = related[0] if related else None
+
+            if errors:
+                raise ItemValidationError(errors)
+
+            return values
+
+        def create_new(self, extra=None):
             """
             Create a new Django model instance.
             """
+            related_values = self.related_values(field_plans)
             field_data = {}
-            many_to_many_fields = defaultdict(list)
-            for field in fields:
-                django_field = django_model._meta.get_field(field)
-
-                if django_field.is_relation:
-                    related_model = django_field.related_model
-                    if django_field.many_to_many:
-                        for related_data in getattr(self, field):
-                            identifier = related_data[related_model._meta.pk.name]
-                            related_object = related_model.objects.get(pk=identifier)
-                            many_to_many_fields[field].append(related_object)
-                    else:
-                        field_data[field] = related_model.objects.get(pk=getattr(self, field))
+            many_to_many_fields = {}
+            for plan in field_plans:
+                field = plan.name
+                if plan.kind == MANY_TO_MANY:
+                    many_to_many_fields[field] = related_values[field]
+                elif plan.related_model:
+                    field_data[field] = related_values[field]
                 else:
-                    value = getattr(self, field)
-                    # A value may be required by the model but not in specified API fields.
-                    # So we try to be helpful here and work out a sensible value to use.
-                    if not value:
-                        value_required = not django_field.null and django_field.blank
-                        if value_required and django_field.default == NOT_PROVIDED:
-                            # A value is required, but no default is set
-                            # Try to create a default - for now just an empty string
-                            value = django_field.to_python("")
-                            logger.warning("Setting %s on %s to %s", field, django_model, value)
-
-                        if isinstance(django_field, JSONField) and not isinstance(django_field, JSONDefaultField):
-                            value = {"error": f"JSONField not supported with value '{value}', use {json_field_str}"}
-
-                    field_data[field] = value
+                    field_data[field] = new_field_value(django_model, plan, getattr(self, field))
 
             if extra:
                 field_data.update(extra)
 
             new_object = django_model(**field_data)
             logger.debug(field_data)
-            new_object.full_clean()
-            new_object.save()
-            logger.debug(new_object)
+            # The related objects have just been loaded, so there is no need to check they exist again.
+            new_object.full_clean(exclude=list(related_values))
 
-            for many_to_many_field in many_to_many_fields:
-                ref_field = getattr(new_object, many_to_many_field)
-                for related_value in many_to_many_fields[many_to_many_field]:
-                    ref_field.add(related_value)
+            with transaction.atomic():
+                new_object.save()
+                for many_to_many_field, related in many_to_many_fields.items():
+                    getattr(new_object, many_to_many_field).add(*related)
 
+            logger.debug(new_object)
             return new_object
 
-        def update(self, instance: django_model, fields_to_update=None):
+        @classmethod
+        def build_new(cls, api_instances, extras, locations, validate_unique=True):  # pylint: disable=too-many-locals
             """
-            Update a Django model instance and return an SingleSchema instance.
+            Build unsaved Django model instances and their many to many links, raising ItemValidationError if any
+            are invalid.
+
+            The extras are the additional field values of each item, and the locations where its errors are reported.
+            """
+            related_objects = fetch_related_objects(field_plans, api_instances)
+            related_fields = [plan.name for plan in field_plans if plan.related_model]
+            errors = []
+            instances = []
+            many_to_many = []
+            for api_instance, extra, location in zip(api_instances, extras, locations):
+                field_data = {}
+                item_many_to_many = []
+                for plan in field_plans:
+                    if plan.related_model is None:
+                        field_data[plan.name] = new_field_value(django_model, plan, getattr(api_instance, plan.name))
+                        continue
+                    related = resolve_related(plan, api_instance, related_objects, location, errors)
+                    if plan.kind == MANY_TO_MANY:
+                        item_many_to_many.append((plan, related))
+                    else:
+                        field_data[plan.name] = related[0] if related else None
+
+                if extra:
+                    field_data.update(extra)
+
+                new_object = django_model(**field_data)
+                clean_instance(new_object, related_fields + list(extra or ()), location, errors)
+                instances.append(new_object)
+                many_to_many.extend((plan, new_object, related) for plan, related in item_many_to_many)
+
+            if validate_unique:
+                errors.extend(unique_errors(django_model, instances, locations))
+
+            if errors:
+                raise ItemValidationError(errors)
+
+            return instances, many_to_many
+
+        @classmethod
+        def bulk_create_new(cls, api_instances, extra=None, batch_size=None):
+            """
+            Create new Django model instances with bulk inserts, raising ItemValidationError if any are invalid.
             """
-            many_to_many_fields = defaultdict(list)
+            locations = [["body", index] for index in range(len(api_instances))]
+            instances, many_to_many = cls.build_new(api_instances, [extra] * len(api_instances), locations)
+            return bulk_insert(django_model, instances, many_to_many, batch_size=batch_size)
 
+        @classmethod
+        def bulk_upsert_new(  # pylint: disable=too-many-arguments
+            cls, api_instances, extras, locations, unique_field, batch_size=None
+        ):
+            """
+            Insert new Django model instances, or update the rows with the same unique_field value, with bulk upserts.
+            """
+            # Conflicting rows are updated, so uniqueness is left to the database.
+            instances, many_to_many = cls.build_new(api_instances, extras, locations, validate_unique=False)
+            update_fields = [plan.name for plan in field_plans if plan.kind != MANY_TO_MANY]
+            update_fields.extend(modification_field_names(django_model))
+            return bulk_upsert(
+                django_model, instances, many_to_many, unique_field, update_fields, batch_size=batch_size
+            )
+
+        @classmethod
+        def bulk_update_existing(cls, pks, api_instances, batch_size=None):
+            """
+            Update the fields set in each item with bulk updates, raising ItemValidationError if any are invalid.
+            """
+            groups = build_updates(django_model, plans_by_name, pks, api_instances)
+            return bulk_change(django_model, groups, batch_size=batch_size)
+
+        async def acreate_new(self, extra=None):
+            """
+            Create a new Django model instance from async code.
+            """
+            return await sync_to_async(self.create_new)(extra=extra)
+
+        def update_instance(self, instance: django_model, fields_to_update=None):
+            """
+            Update a Django model instance.
+            """
             if fields_to_update is None:
-                fields_to_update = fields
-
-            for field in fields_to_update:
-                django_field = django_model._meta.get_field(field)
-                if django_field.is_relation:
-                    related_model = django_field.related_model
-                    if django_field.many_to_many:
-                        for related_data in getattr(self, field):
-                            identifier = related_data[related_model._meta.pk.name]
-                            related_object = related_model.objects.get(pk=identifier)
-                            many_to_many_fields[field].append(related_object)
-                    else:
-                        current_field_value = related_model.objects.get(pk=getattr(self, field))
-                        setattr(instance, field, current_field_value)
-                else:
-                    current_field_value = getattr(self, field)
-                    setattr(instance, field, current_field_value)
+                plans_to_update = field_plans
+            else:
+                plans_to_update = [plans_by_name[field] for field in fields_to_update]
+
+            related_values = self.related_values(plans_to_update)
+            many_to_many_fields = {}
+            changed_fields = []
+            for plan in plans_to_update:
+                field = plan.name
+                if plan.kind == MANY_TO_MANY:
+                    many_to_many_fields[field] = related_values[field]
+                    continue
+                value = related_values[field] if plan.related_model else getattr(self, field)
+                if field_has_changed(instance, plan, value):
+                    setattr(instance, field, value)
+                    changed_fields.append(field)
+
+            with transaction.atomic():
+                # Only the links which have changed are deleted and inserted.
+                links_changed = False
+                for many_to_many_field, related in many_to_many_fields.items():
+                    links_changed = set_links(getattr(instance, many_to_many_field), related) or links_changed
+                # Only the changed columns are written, along with the auto_now fields they should touch, which are
+                # also touched by changed links so conditional requests see them.
+                if changed_fields or links_changed:
+                    instance.save(update_fields=changed_fields + modification_field_names(django_model))
 
-            instance.save()
+            return instance
 
-            for many_to_many_field in many_to_many_fields:
-                ref_field = getattr(instance, many_to_many_field)
-                ref_field.clear()
-                for related_value in many_to_many_fields[many_to_many_field]:
-                    ref_field.add(related_value)
+        async def aupdate_instance(self, instance: django_model, fields_to_update=None):
+            """
+            Update a Django model instance from async code.
+            """
+            return await sync_to_async(self.update_instance)(instance, fields_to_update=fields_to_update)
 
-            return SingleSchema.from_model(instance)
+        def update(self, instance: django_model, fields_to_update=None):
+            """
+            Update a Django model instance and return an SingleSchema instance.
+            """
+            return SingleSchema.from_model(self.update_instance(instance, fields_to_update=fields_to_update))
 
-    class_methods = {}
+        async def aupdate(self, instance: django_model, fields_to_update=None):
+            """
+            Update a Django model instance from async code and return an SingleSchema instance.
+            """
+            return await sync_to_async(self.update)(instance, fields_to_update=fields_to_update)
 
-    for field in fields:
+    class_methods = {}
 
-        def create_validation_function(field, django_model):
-            django_field = django_model._meta.get_field(field)
+    for plan in field_plans:
 
+        def create_validation_function(django_field):
             def func(cls, value):  # pylint: disable=unused-argument
                 errors = []
                 for field_validator in django_field.validators:
@@ -215,10 +499,14 @@ def schema_for_new_instance(django_model, SingleSchema, fields):  # pylint: disa
 
             return func
 
-        validation_function = create_validation_function(field, django_model)
-        class_methods[f"validate_{field}"] = validator(field, check_fields=False, allow_reuse=True)(validation_function)
+        validation_function = create_validation_function(plan.django_field)
+        class_methods[f"validate_{plan.name}"] = validator(plan.name, check_fields=False, allow_reuse=True)(
+            validation_function
+        )
 
-    return type(f"New{django_model.__name__}", (NewSchema,), class_methods)
+    NewModelSchema = type(f"New{django_model.__name__}", (NewSchema,), class_methods)  # pylint: disable=invalid-name
+    NewModelSchema.field_plans = tuple(field_plans)
+    return NewModelSchema
 
 
 def schema_for_updating_instance(django_model, NewSchema, optional_fields):  # pylint: disable=invalid-name
@@ -234,6 +522,45 @@ def schema_for_updating_instance(django_model, NewSchema, optional_fields):  # p
     return type(f"Partial{django_model.__name__}", (UpdatingSchema,), {})
 
 
+def schema_for_identified_item(django_model, FieldsSchema, identifier_class, kind):  # pylint: disable=invalid-name
+    class IdentifiedSchema(BaseModel):  # pylint: disable=too-few-public-methods
+        identifier: identifier_class
+        fields: FieldsSchema
+
+        class Config:  # pylint: disable=too-few-public-methods
+            title = f"{django_model.__name__}{kind}"
+
+    return type(f"{django_model.__name__}{kind}", (IdentifiedSchema,), {})
+
+
+class BulkUpdateResult(BaseModel):  # pylint: disable=too-few-public-methods
+    updated: int
+
+
+def schema_for_bulk_delete(django_model, UpdatingSchema, identifier_class):  # pylint: disable=invalid-name
+    class BulkDeleteSchema(BaseModel):  # pylint: disable=too-few-public-methods
+        identifiers: Optional[List[identifier_class]] = Field(None, description="The identifiers to delete.")
+        filter: Optional[UpdatingSchema] = Field(None, description="The field values to delete every match of.")
+
+        class Config:  # pylint: disable=too-few-public-methods
+            title = f"{django_model.__name__}BulkDelete"
+
+        @root_validator(skip_on_failure=True, allow_reuse=True)
+        def check_selection(cls, values):  # pylint: disable=no-self-argument
+            if (values["identifiers"] is None) == (values["filter"] is None):
+                raise ValueError("Either identifiers or filter must be given.")
+            if values["filter"] is not None and not values["filter"].dict(exclude_unset=True):
+                raise ValueError("The filter must have at least one field.")
+            return values
+
+    return type(f"{django_model.__name__}BulkDelete", (BulkDeleteSchema,), {})
+
+
+class BulkDeleteResult(BaseModel):  # pylint: disable=too-few-public-methods
+    deleted: int
+    objects: Dict[str, int] = Field(..., description="The number of objects deleted per model, including cascades.")
+
+
 def schema_for_multiple_models(django_model, SingleSchema):  # pylint: disable=invalid-name
     class MultipleSchema(BaseModel):  # pylint: disable=too-few-public-methods
         items: List[SingleSchema]
@@ -251,8 +578,25 @@ def schema_for_multiple_models(django_model, SingleSchema):  # pylint: disable=i
     return type(f"{django_model.__name__}List", (MultipleSchema,), {})
 
 
+def schema_for_page_of_models(django_model, SingleSchema, MultipleSchema):  # pylint: disable=invalid-name
+    class PageSchema(MultipleSchema):  # pylint: disable=too-few-public-methods
+        next: Optional[str] = Field(None, description="The cursor for the next page, if there is one.")
+
+        class Config:  # pylint: disable=too-few-public-methods
+            title = f"{django_model.__name__}Page"
+
+        @classmethod
+        def from_page(cls, page):
+            """
+            Convert a Page of Django model instances to a PageSchema instance.
+            """
+            return cls(items=[SingleSchema.from_model(i) for i in page.items], next=page.next)
+
+    return type(f"{django_model.__name__}Page", (PageSchema,), {})
+
+
 class RouteBuilder:  # pylint: disable=too-many-instance-attributes,too-many-public-methods
-    def __init__(  # pylint: disable=too-many-arguments
+    def __init__(  # pylint: disable=too-many-arguments,too-many-statements
         self,
         model: models.Model,
         config: dict = None,
@@ -295,10 +639,18 @@ class RouteBuilder:  # pylint: disable=too-many-instance-attributes,too-many-pub
         if owner_field in response_fields:
             response_fields.remove(owner_field)
 
-        self.instance_schema = schema_for_instance(model, response_fields)
+        self.instance_schema = schema_for_instance(model, compile_field_plans(model, response_fields))
+        self.prefetches = related_prefetches(self.instance_schema.field_plans)
+
+        if self.config.get("fast_serialization"):
+            self.values_serializer = ValuesSerializer(self.instance_schema.field_plans)
+        else:
+            self.values_serializer = None
 
         fields_for_new = request_fields
-        self.new_instance_schema = schema_for_new_instance(model, self.instance_schema, fields_for_new)
+        self.new_instance_schema = schema_for_new_instance(
+            model, self.instance_schema, compile_field_plans(model, fields_for_new)
+        )
         self.multiple_instance_schema = schema_for_multiple_models(model, self.instance_schema)
 
         optional_fields = {
@@ -309,13 +661,50 @@ class RouteBuilder:  # pylint: disable=too-many-instance-attributes,too-many-pub
         }
 
         self.updating_schema = schema_for_updating_instance(model, self.new_instance_schema, optional_fields)
+        self.bulk_update_schema = schema_for_identified_item(
+            model, self.updating_schema, self.model_identifier_class, "BulkUpdate"
+        )
+        self.upsert_schema = schema_for_identified_item(
+            model, self.new_instance_schema, self.model_identifier_class, "Upsert"
+        )
+        self.bulk_delete_schema = schema_for_bulk_delete(model, self.updating_schema, self.model_identifier_class)
+
+        self.paginator = self._get_paginator()
+        if self.paginator:
+            self.list_schema = schema_for_page_of_models(model, self.instance_schema, self.multiple_instance_schema)
+        else:
+            self.list_schema = self.multiple_instance_schema
+        self.rank_paginator = self._get_rank_paginator()
+
+        self.validate_streaming()
+        self.validate_upsert()
+        self.validate_filters()
+        self.validate_ordering()
+        self.validate_aggregate()
+        self.validate_search()
+        self.validate_return()
+        self.response_cache = self._get_response_cache()
+        self.modified_field = self._get_modified_field()
+        self.related_modified_fields = self._get_related_modified_fields()
+        self.idempotency_store = self._get_idempotency_store()
 
         if authentication is None:
             self.authentication = lambda: None
         else:
             self.authentication = authentication
 
+        self.fields_function = self.get_fields_function()
         self.get_function = self.get_identifier_function()
+        self.sparse_get_function = self.get_sparse_identifier_function()
+        self.pagination_function = self.get_pagination_function()
+        self.filter_function = self.get_filter_function()
+        self.ordering_function = self.get_ordering_function()
+        self.aggregate_function = self.get_aggregate_function()
+        self.search_function = self.get_search_function()
+        self.conditional_function = self.get_conditional_function()
+        self.idempotency_function = self.get_idempotency_function()
+        self.minimal_function = self.get_minimal_function()
+        self.write_get_function = self.get_write_identifier_function()
 
     def _get_request_fields(self):
         model_fields = self.model._meta.get_fields()
@@ -340,9 +729,255 @@ class RouteBuilder:  # pylint: disable=too-many-instance-attributes,too-many-pub
             if field.name == "id":
                 if self.model_identifier != "id":
                     continue
+            if self.search is not None and field.name == self.search_vector:
+                continue
             response_fields.append(field.name)
         return response_fields
 
+    def _get_paginator(self):
+        pagination = self.config.get("pagination")
+        if pagination is None:
+            return None
+
+        ordering = pagination.get("ordering", "pk")
+        field_name = ordering.lstrip("-")
+        if field_name != "pk":
+            try:
+                django_field = self.model._meta.get_field(field_name)
+            except FieldDoesNotExist as field_error:
+                raise InvalidPaginationException(
+                    f"Ordering field {field_name} not in {self.model.__name__}."
+                ) from field_error
+            if not django_field.concrete or django_field.many_to_many or django_field.null:
+                raise InvalidPaginationException(
+                    f"Ordering field {field_name} must be a concrete, non null, single valued field."
+                )
+
+        return CursorPaginator(
+            self.model,
+            ordering=ordering,
+            page_size=pagination.get("page_size", 100),
+            max_page_size=pagination.get("max_page_size", 1000),
+        )
+
+    def _get_rank_paginator(self):
+        if self.paginator is None or self.search is None:
+            return None
+
+        return self.paginator.ranked(RANK)
+
+    def validate_streaming(self):
+        if self.streaming is None:
+            return
+
+        if self.paginator:
+            raise InvalidStreamingException("Streaming can not be used with pagination.")
+
+        if self.streaming_format not in STREAMS:
+            raise InvalidStreamingException(f"Streaming format {self.streaming_format} not in {sorted(STREAMS)}.")
+
+    def validate_return(self):
+        if self.return_preference not in RETURN_PREFERENCES:
+            raise InvalidReturnException(
+                f"Return preference {self.return_preference} not in {sorted(RETURN_PREFERENCES)}."
+            )
+
+    def validate_upsert(self):
+        if self.upsert is None:
+            return
+
+        if not self.model._meta.get_field(self.model_identifier).unique:
+            raise InvalidIdentifierException(f"{self.model_identifier} must be unique to upsert {self.name_plural}.")
+
+    def validate_filter(self, field_name, lookups):
+        try:
+            django_field = self.model._meta.get_field(field_name)
+        except FieldDoesNotExist as field_error:
+            raise InvalidFiltersException(f"Filter field {field_name} not in {self.model.__name__}.") from field_error
+        if not django_field.concrete or django_field.many_to_many or isinstance(django_field, JSONField):
+            raise InvalidFiltersException(f"Filter field {field_name} must be a concrete, non JSON, field.")
+
+        allowed = ARRAY_LOOKUPS if isinstance(django_field, ArrayField) else LOOKUPS
+        invalid_lookups = sorted(set(lookups).difference(allowed))
+        if invalid_lookups or not lookups:
+            raise InvalidFiltersException(f"Filter lookups {invalid_lookups} of {field_name} not in {list(allowed)}.")
+
+        # Filters are applied to every row of the list, so each lookup must be able to use an index.
+        for lookup in lookups:
+            if not is_indexed(django_field, lookup):
+                index = "a GinIndex" if lookup == CONTAINS else "an index"
+                raise InvalidFiltersException(f"Filter {field_name}__{lookup} needs {index} on {field_name}.")
+
+    def validate_filters(self):
+        for field_name, lookups in (self.filters or {}).items():
+            self.validate_filter(field_name, lookups)
+
+    def validate_ordering_field(self, field_name):
+        try:
+            django_field = self.model._meta.get_field(field_name)
+        except FieldDoesNotExist as field_error:
+            raise InvalidOrderingException(
+                f"Ordering field {field_name} not in {self.model.__name__}."
+            ) from field_error
+        if not django_field.concrete or django_field.many_to_many:
+            raise InvalidOrderingException(f"Ordering field {field_name} must be a concrete field.")
+        if not is_indexed(django_field):
+            logger.warning("Ordering %s by %s can not use an index, so sorts every row.", self.name_plural, field_name)
+
+    def validate_ordering(self):
+        if self.ordering is None:
+            return
+
+        if self.paginator:
+            raise InvalidOrderingException("Ordering can not be used with pagination.")
+
+        for field_name in self.ordering_fields:
+            self.validate_ordering_field(field_name)
+
+        default = self.ordering_default
+        if default is not None and default.lstrip("-") not in self.ordering_fields:
+            raise InvalidOrderingException(f"Default ordering {default} not in {self.ordering_fields}.")
+
+    def validate_aggregate_field(self, field_name):
+        try:
+            django_field = self.model._meta.get_field(field_name)
+        except FieldDoesNotExist as field_error:
+            raise InvalidAggregateException(
+                f"Aggregate field {field_name} not in {self.model.__name__}."
+            ) from field_error
+        if not django_field.concrete or django_field.many_to_many:
+            raise InvalidAggregateException(f"Aggregate field {field_name} must be a concrete field.")
+        return django_field
+
+    def validate_aggregate(self):
+        if self.aggregate is None:
+            return
+
+        for field_name, functions in self.aggregate_fields.items():
+            django_field = self.validate_aggregate_field(field_name)
+            invalid_functions = sorted(set(functions).difference(FUNCTIONS))
+            if invalid_functions or not functions:
+                raise InvalidAggregateException(
+                    f"Aggregate functions {invalid_functions} of {field_name} not in {list(FUNCTIONS)}."
+                )
+            if "sum" in functions and not isinstance(django_field, SUMMABLE_FIELDS):
+                raise InvalidAggregateException(f"Aggregate {field_name}__sum needs a numeric field.")
+
+        for field_name in self.aggregate_group_by:
+            self.validate_aggregate_field(field_name)
+            if field_name == COUNT:
+                raise InvalidAggregateException(f"Group by field {COUNT} clashes with the row count.")
+
+        threshold = self.estimate_threshold
+        if threshold is not None and (not isinstance(threshold, int) or threshold < 1):
+            raise InvalidAggregateException(f"Estimate threshold {threshold} must be a positive integer.")
+
+    def validate_search(self):
+        if self.search is None:
+            return
+
+        vector = self.search_vector
+        try:
+            django_field = self.model._meta.get_field(vector)
+        except FieldDoesNotExist as field_error:
+            raise InvalidSearchException(f"Search vector {vector} not in {self.model.__name__}.") from field_error
+        if not has_search_index(self.model, vector):
+            raise InvalidSearchException(f"Search vector {vector} needs a GinIndex.")
+        if not isinstance(django_field, SearchVectorField):
+            raise InvalidSearchException(f"Search vector {vector} must be a SearchVectorField.")
+
+        if not self.search_fields:
+            raise InvalidSearchException(f"Search fields of {vector} must be given.")
+        for field_name in self.search_fields:
+            try:
+                search_field = self.model._meta.get_field(field_name)
+            except FieldDoesNotExist as field_error:
+                raise InvalidSearchException(
+                    f"Search field {field_name} not in {self.model.__name__}."
+                ) from field_error
+            if not isinstance(search_field, (models.CharField, models.TextField)):
+                raise InvalidSearchException(f"Search field {field_name} must be a text field.")
+
+    def search_trigger(self):
+        """
+        Return the migration operation adding the trigger which fills the search vector from the search fields, with
+        the text search config used by the searches.
+        """
+        columns = [self.model._meta.get_field(field_name).column for field_name in self.search_fields]
+        return search_trigger(self.model._meta.db_table, self.search_vector, columns, self.search_config)
+
+    def _get_response_cache(self):
+        cache = self.config.get("cache")
+        if cache is None:
+            return None
+
+        if self.streaming is not None:
+            raise InvalidCacheException("Caching can not be used with streaming.")
+
+        return ResponseCache(
+            self.model,
+            self.instance_schema.field_plans,
+            self.model_identifier,
+            alias=cache.get("alias", "default"),
+            timeout=cache.get("timeout", 300),
+        )
+
+    def _get_idempotency_store(self):
+        idempotency = self.config.get("idempotency")
+        if idempotency is None:
+            return None
+
+        return IdempotencyStore(
+            self.name_lower_plural,
+            alias=idempotency.get("alias", "default"),
+            timeout=idempotency.get("timeout", 86400),
+            lock_timeout=idempotency.get("lock_timeout", 10),
+        )
+
+    def _get_modified_field(self):
+        conditional = self.config.get("conditional")
+        if conditional is None:
+            return None
+
+        field_name = conditional.get("field")
+        if field_name is None:
+            modification_fields = modification_field_names(self.model)
+            if not modification_fields:
+                raise InvalidConditionalException(
+                    f"{self.model.__name__} has no auto_now field, set the conditional field."
+                )
+            return modification_fields[0]
+
+        try:
+            django_field = self.model._meta.get_field(field_name)
+        except FieldDoesNotExist as field_error:
+            raise InvalidConditionalException(
+                f"Conditional field {field_name} not in {self.model.__name__}."
+            ) from field_error
+        if not isinstance(django_field, models.DateTimeField):
+            raise InvalidConditionalException(f"Conditional field {field_name} must be a DateTimeField.")
+        return field_name
+
+    def _get_related_modified_fields(self):
+        """
+        Return the name and modification field of each related model listed in the response, whose changes the
+        validators must see as well as those of the instance.
+        """
+        if self.modified_field is None:
+            return []
+
+        related_fields = []
+        for plan in self.instance_schema.field_plans:
+            if plan.kind not in (MANY_TO_MANY, REVERSE):
+                continue
+            modification_fields = modification_field_names(plan.related_model)
+            if not modification_fields:
+                raise InvalidConditionalException(
+                    f"{plan.related_model.__name__} has no auto_now field, so {plan.name} can not be conditional."
+                )
+            related_fields.append((plan.name, modification_fields[0]))
+        return related_fields
+
     def validate_supported_fields(self):
         supported_json_fields = [JSONDefaultField]
         model_fields = self.model._meta.get_fields()
@@ -375,6 +1010,94 @@ class RouteBuilder:  # pylint: disable=too-many-instance-attributes,too-many-pub
     def model_identifier(self):
         return self.config.get("identifier", "id")
 
+    @property
+    def is_async(self):
+        return self.config.get("async", False)
+
+    @property
+    def streaming(self):
+        return self.config.get("streaming")
+
+    @property
+    def streaming_format(self):
+        return self.streaming.get("format", "ndjson")
+
+    @property
+    def streaming_chunk_size(self):
+        return self.streaming.get("chunk_size", 2000)
+
+    @property
+    def bulk(self):
+        return self.config.get("bulk")
+
+    @property
+    def bulk_batch_size(self):
+        return self.bulk.get("batch_size", 500)
+
+    @property
+    def return_preference(self):
+        return self.config.get("return", "representation")
+
+    @property
+    def upsert(self):
+        return self.config.get("upsert")
+
+    @property
+    def upsert_batch_size(self):
+        return self.upsert.get("batch_size", 500)
+
+    @property
+    def filters(self):
+        return self.config.get("filters")
+
+    @property
+    def ordering(self):
+        return self.config.get("ordering")
+
+    @property
+    def ordering_fields(self):
+        return self.ordering.get("fields", [])
+
+    @property
+    def ordering_default(self):
+        return self.ordering.get("default")
+
+    @property
+    def aggregate(self):
+        return self.config.get("aggregate")
+
+    @property
+    def aggregate_fields(self):
+        return self.aggregate.get("fields", {})
+
+    @property
+    def aggregate_group_by(self):
+        return self.aggregate.get("group_by", [])
+
+    @property
+    def estimate_threshold(self):
+        return self.aggregate.get("estimate_threshold")
+
+    @property
+    def search(self):
+        return self.config.get("search")
+
+    @property
+    def search_vector(self):
+        return self.search.get("vector", "search_vector")
+
+    @property
+    def search_fields(self):
+        return self.search.get("fields", [])
+
+    @property
+    def search_config(self):
+        return self.search.get("config", "english")
+
+    @property
+    def operations(self):
+        return self.config.get("operations")
+
     @property
     def name(self):
         return self.config.get("name", self.model.__name__)
@@ -403,32 +1126,407 @@ class RouteBuilder:  # pylint: disable=too-many-instance-attributes,too-many-pub
     def path_for_identifer(self):
         return self.path_prefix + "{identifier}/"
 
-    def check_query_filter(self, instance, user):
-        if not self.model.objects.filter(self.query_filter(user)).filter(pk=instance.pk).exists():
-            logger.warning("User %s tried to get %s and it is not allowed.", user, instance)
-            raise HTTPException(status_code=404, detail="Object not found.")
+    @property
+    def path_for_bulk(self):
+        return self.path_prefix + "bulk/"
 
-    def check_ownership(self, instance, user):
-        if not user == getattr(instance, self.owner_field):
-            owner = getattr(instance, self.owner_field)
-            logger.warning("User %s tried to update %s and is not the owner, owner is %s.", user, instance, owner)
-            raise HTTPException(status_code=404, detail="Object not found.")
+    @property
+    def path_for_upsert(self):
+        return self.path_prefix + "upsert/"
+
+    @property
+    def path_for_bulk_upsert(self):
+        return self.path_for_bulk + "upsert/"
+
+    @property
+    def path_for_count(self):
+        return self.path_prefix + "count/"
+
+    @property
+    def path_for_aggregate(self):
+        return self.path_prefix + "aggregate/"
+
+    @property
+    def path_for_operations(self):
+        return self.path_for_identifer + "operations/"
+
+    def instance_queryset(self, identifier, user, field_plans, prefetch):
+        queryset = self.get_queryset(user, field_plans).filter(**{self.model_identifier: identifier})
+        return queryset if prefetch else queryset.prefetch_related(None)
+
+    def get_instance(self, identifier, user=None, field_plans=None, prefetch=True):
+        # The query_filter and owner_field scope are part of the same query, so objects the user
+        # is not allowed to see are indistinguishable from ones that do not exist.
+        instance = self.instance_queryset(identifier, user, field_plans, prefetch).first()
+        if not instance:
+            raise HTTPException(status_code=404, detail=f"Object {identifier} not found.")
+        return instance
+
+    async def aget_instance(self, identifier, user=None, field_plans=None, prefetch=True):
+        instance = await self.instance_queryset(identifier, user, field_plans, prefetch).afirst()
+        if not instance:
+            raise HTTPException(status_code=404, detail=f"Object {identifier} not found.")
+        return instance
 
     def get_identifier_function(self):
+        if self.is_async:
+
+            async def afunc(
+                identifier: self.model_identifier_class = Path(..., description=f"The identifier of the {self.name}."),
+                user: User = Depends(self.authentication),
+            ):
+                """
+                Retrieve the instance from the given model identifier.
+                """
+                return await self.aget_instance(identifier, user)
+
+            return afunc
+
         def func(
             identifier: self.model_identifier_class = Path(..., description=f"The identifier of the {self.name}."),
+            user: User = Depends(self.authentication),
         ):
             """
             Retrieve the instance from the given model identifier.
             """
-            instance = self.model.objects.filter(**{self.model_identifier: identifier}).first()
-            if not instance:
-                raise HTTPException(status_code=404, detail=f"Object {identifier} not found.")
-            return instance
+            return self.get_instance(identifier, user)
 
         return func
 
+    def get_write_identifier_function(self):
+        if self.is_async:
+
+            async def afunc(
+                identifier: self.model_identifier_class = Path(..., description=f"The identifier of the {self.name}."),
+                user: User = Depends(self.authentication),
+                minimal: bool = Depends(self.minimal_function),
+            ):
+                """
+                Retrieve the instance to write from the given model identifier.
+                """
+                return await self.aget_instance(identifier, user, prefetch=not minimal)
+
+            return afunc
+
+        def func(
+            identifier: self.model_identifier_class = Path(..., description=f"The identifier of the {self.name}."),
+            user: User = Depends(self.authentication),
+            minimal: bool = Depends(self.minimal_function),
+        ):
+            """
+            Retrieve the instance to write from the given model identifier, without the related objects which are
+            only needed for the response when the client prefers a minimal one.
+            """
+            return self.get_instance(identifier, user, prefetch=not minimal)
+
+        return func
+
+    def get_sparse_identifier_function(self):
+        if self.is_async:
+
+            async def afunc(
+                identifier: self.model_identifier_class = Path(..., description=f"The identifier of the {self.name}."),
+                user: User = Depends(self.authentication),
+                field_plans=Depends(self.fields_function),
+            ):
+                """
+                Retrieve the instance from the given model identifier, loading only the requested fields.
+                """
+                return await self.aget_instance(identifier, user, field_plans)
+
+            return afunc
+
+        def func(
+            identifier: self.model_identifier_class = Path(..., description=f"The identifier of the {self.name}."),
+            user: User = Depends(self.authentication),
+            field_plans=Depends(self.fields_function),
+        ):
+            """
+            Retrieve the instance from the given model identifier, loading only the requested fields.
+            """
+            return self.get_instance(identifier, user, field_plans)
+
+        return func
+
+    def get_fields_function(self):
+        field_plans = {plan.name: plan for plan in self.instance_schema.field_plans}
+
+        def func(
+            fields: Optional[str] = Query(
+                None, description=f"Comma separated fields to return, from {', '.join(field_plans)}."
+            ),
+        ):
+            """
+            Retrieve the plans for the requested fields.
+            """
+            if fields is None:
+                return None
+
+            names = [name.strip() for name in fields.split(",") if name.strip()]
+            invalid_fields = sorted(set(names).difference(field_plans))
+            if invalid_fields or not names:
+                raise HTTPException(
+                    status_code=400, detail=f"Invalid fields {invalid_fields}, choose from {sorted(field_plans)}."
+                )
+            return tuple(field_plans[name] for name in dict.fromkeys(names))
+
+        return func
+
+    def get_pagination_function(self):
+        paginator = self.paginator
+        if paginator is None:
+            return lambda: None
+
+        def func(
+            cursor: Optional[str] = Query(None, description="The cursor returned as 'next' by the previous page."),
+            limit: int = Query(
+                paginator.page_size,
+                ge=1,
+                le=paginator.max_page_size,
+                description=f"The maximum number of {self.name_plural} to return.",
+            ),
+        ):
+            """
+            Retrieve the requested page position and size.
+            """
+            return cursor, limit
+
+        return func
+
+    def get_filter_function(self):
+        if self.filters is None:
+            return lambda: None
+        return filters_function(self.model, self.filters)
+
+    def get_ordering_function(self):
+        if self.ordering is None:
+            return lambda: None
+
+        fields = self.ordering_fields
+
+        def func(
+            ordering: Optional[str] = Query(
+                self.ordering_default,
+                description=f"Comma separated fields to order by, from {', '.join(fields)}, - first for descending.",
+            ),
+        ):
+            """
+            Retrieve the requested or default ordering, which is empty when there is neither.
+            """
+            names = [name.strip() for name in (ordering or "").split(",") if name.strip()]
+            invalid_fields = sorted({name.lstrip("-") for name in names}.difference(fields))
+            if invalid_fields:
+                raise HTTPException(
+                    status_code=400, detail=f"Invalid ordering {invalid_fields}, choose from {sorted(fields)}."
+                )
+            return tuple(dict.fromkeys(names))
+
+        return func
+
+    def get_search_function(self):
+        if self.search is None:
+            return lambda: None
+
+        def func(
+            search: Optional[str] = Query(
+                None, description="Only return objects matching these words, the most relevant first."
+            ),
+        ):
+            """
+            Retrieve the requested search, ignoring a blank one.
+            """
+            return (search or "").strip() or None
+
+        return func
+
+    def get_aggregate_function(self):
+        if self.aggregate is None:
+            return lambda: None
+
+        names = aggregate_names(self.aggregate_fields)
+        group_fields = self.aggregate_group_by
+
+        def func(
+            aggregates: Optional[str] = Query(
+                None, description=f"Comma separated aggregates to return, from {', '.join(names)}, or all of them."
+            ),
+            group_by: Optional[str] = Query(
+                None, description=f"Comma separated fields to group by, from {', '.join(group_fields)}."
+            ),
+        ):
+            """
+            Retrieve the requested aggregates and the fields to group them by.
+            """
+            requested = comma_separated_choices(aggregates, names, "aggregates") or tuple(names)
+            return requested, comma_separated_choices(group_by, group_fields, "group by fields")
+
+        return func
+
+    def get_conditional_function(self):
+        if self.modified_field is None:
+            return lambda: None
+
+        def func(
+            if_none_match: Optional[str] = Header(None, description="The ETag of the copy held by the client."),
+            if_modified_since: Optional[str] = Header(None, description="The Last-Modified date of the client copy."),
+        ):
+            """
+            Retrieve the conditional request headers.
+            """
+            return if_none_match, if_modified_since
+
+        return func
+
+    def get_minimal_function(self):
+        def func(
+            prefer: Optional[str] = Header(
+                None, description="return=minimal to only return the identifier of the objects written."
+            ),
+        ):
+            """
+            Return True if the response to a write should only contain the identifiers of the objects written.
+            """
+            return return_preference(prefer, default=self.return_preference) == MINIMAL
+
+        return func
+
+    def get_idempotency_function(self):
+        if self.idempotency_store is None:
+            return lambda: None
+
+        def func(
+            idempotency_key: Optional[str] = Header(
+                None, description="A unique key for the request, so retrying it does not repeat the change."
+            ),
+        ):
+            """
+            Retrieve the idempotency key header.
+            """
+            return idempotency_key
+
+        return func
+
+    def get_base_queryset(self, field_plans=None):
+        if field_plans is None:
+            return self.model.objects.prefetch_related(*self.prefetches)
+
+        columns = [self.model._meta.pk.name]
+        columns.extend(plan.name for plan in field_plans if plan.kind in (PLAIN, FOREIGN_KEY))
+        if self.paginator:
+            columns.append(self.paginator.field.name)
+        return self.model.objects.only(*columns).prefetch_related(*related_prefetches(field_plans))
+
+    def get_queryset(self, user, field_plans=None):
+        queryset = self.get_base_queryset(field_plans)
+
+        if self.query_filter:
+            queryset = queryset.filter(self.query_filter(user))
+
+        if self.owner_field:
+            queryset = queryset.filter(**{self.owner_field: user})
+
+        return queryset
+
+    def list_queryset(  # pylint: disable=too-many-arguments
+        self, user, filters, ordering=None, field_plans=None, search=None
+    ):
+        queryset = self.get_queryset(user, field_plans)
+        if filters:
+            queryset = queryset.filter(filters_q(filters))
+        # The matches are ranked unless an ordering was requested or defaulted.
+        ranked = bool(search) and not ordering
+        if search:
+            queryset = search_queryset(queryset, self.search_vector, search, self.search_config, ranked)
+        if ordering is not None and not ranked:
+            # The primary key comes last so the order is stable.
+            queryset = queryset.order_by(*ordering, "pk")
+        return queryset
+
+    def list_paginator(self, search=None):
+        # Searches are paged in rank order, so the cursor of a search only continues a search.
+        if search:
+            return self.rank_paginator
+        return self.paginator
+
+    def get_page(self, queryset, page_request, search=None):
+        cursor, limit = page_request
+        try:
+            return self.list_paginator(search).paginate(queryset, cursor=cursor, limit=limit)
+        except InvalidCursorException as cursor_error:
+            raise HTTPException(status_code=400, detail="Invalid cursor.") from cursor_error
+
+    async def aget_page(self, queryset, page_request, search=None):
+        cursor, limit = page_request
+        try:
+            return await self.list_paginator(search).apaginate(queryset, cursor=cursor, limit=limit)
+        except InvalidCursorException as cursor_error:
+            raise HTTPException(status_code=400, detail="Invalid cursor.") from cursor_error
+
+    def cursor_columns(self, search=None):
+        paginator = self.list_paginator(search)
+        if paginator:
+            return (paginator.field.attname, paginator.pk_field.attname)
+        return ()
+
+    def list_rows(self, queryset, field_plans, search=None):
+        """
+        Return the rows to fetch for a list and the function converting each row to a dict.
+
+        The function is None when the rows are model instances to be converted by the list schema.
+        """
+        if self.values_serializer:
+            serializer = self.values_serializer if field_plans is None else ValuesSerializer(field_plans)
+            return serializer.values_list(queryset, self.cursor_columns(search)), serializer.to_dict
+
+        if field_plans is not None:
+            return queryset, partial(plans_to_dict, field_plans)
+
+        return queryset, None
+
+    def row_to_json(self, to_dict):
+        if to_dict is None:
+            return lambda instance: self.instance_schema.from_model(instance).json()
+        return lambda row: dumps(to_dict(row)).decode("utf-8")
+
+    def list_response(self, rows, to_dict, next_cursor=None):
+        if to_dict is None:
+            if self.paginator:
+                return self.list_schema.from_page(Page(rows, next_cursor))
+            return self.multiple_instance_schema.from_qs(rows)
+
+        content = {"items": [to_dict(row) for row in rows]}
+        if self.paginator:
+            content["next"] = next_cursor
+        return Response(dumps(content), media_type="application/json")
+
+    def streaming_response(self, rows, to_json):
+        rows = rows.iterator(chunk_size=self.streaming_chunk_size)
+        stream = STREAMS[self.streaming_format](rows, to_json)
+        return StreamingResponse(stream, media_type=MEDIA_TYPES[self.streaming_format])
+
+    def astreaming_response(self, rows, to_json):
+        if rows._prefetch_related_lookups:  # pylint: disable=protected-access
+            # Django 4.1 can not prefetch from aiterator(), so let Starlette drain the sync iterator in a thread.
+            return self.streaming_response(rows, to_json)
+
+        rows = rows.aiterator(chunk_size=self.streaming_chunk_size)
+        stream = ASYNC_STREAMS[self.streaming_format](rows, to_json)
+        return StreamingResponse(stream, media_type=MEDIA_TYPES[self.streaming_format])
+
     def add_all_routes(self, router):
+        if self.bulk is not None:
+            # Registered first, so "bulk" is not taken for an identifier.
+            self.add_bulk_create_route_to_router(router)
+            self.add_bulk_update_route_to_router(router)
+            self.add_bulk_delete_route_to_router(router)
+        if self.upsert is not None:
+            self.add_upsert_route_to_router(router)
+            self.add_bulk_upsert_route_to_router(router)
+        if self.operations is not None:
+            self.add_operations_route_to_router(router)
+        if self.aggregate is not None:
+            self.add_count_route_to_router(router)
+            self.add_aggregate_route_to_router(router)
         self.add_list_route_to_router(router)
         self.add_get_route_to_router(router)
         self.add_create_route_to_router(router)
@@ -436,132 +1534,814 @@ class RouteBuilder:  # pylint: disable=too-many-instance-attributes,too-many-pub
         self.add_patch_route_to_router(router)
         self.add_delete_route_to_router(router)
 
+    def add_route(self, route, respond, arespond=None):
+        """
+        Add respond as a route, or when async, a coroutine with the same parameters which awaits arespond, or runs
+        respond in a thread when the route has no async version.
+        """
+        if not self.is_async:
+            return route(respond)
+
+        arespond = arespond or sync_to_async(respond)
+
+        # FastAPI reads the dependencies from the signature of respond, which wraps() exposes.
+        @wraps(respond)
+        async def _arespond(**kwargs):
+            return await arespond(**kwargs)
+
+        return route(_arespond)
+
+    def cache_scope(self, user):
+        # Responses only differ per user when the user limits which objects can be seen.
+        if self.owner_field or self.query_filter:
+            return getattr(user, "pk", None)
+        return None
+
+    def respond_list(  # pylint: disable=too-many-arguments
+        self, user, page_request, field_plans, filters=None, ordering=None, search=None
+    ):
+        queryset = self.list_queryset(user, filters, ordering, field_plans, search)
+        rows, to_dict = self.list_rows(queryset, field_plans, search)
+
+        if self.streaming is not None:
+            return self.streaming_response(rows, self.row_to_json(to_dict))
+
+        if page_request is None:
+            return self.list_response(rows, to_dict)
+
+        page = self.get_page(rows, page_request, search)
+        return self.list_response(page.items, to_dict, page.next)
+
+    async def arespond_list(  # pylint: disable=too-many-arguments
+        self, user, page_request, field_plans, filters=None, ordering=None, search=None
+    ):
+        queryset = self.list_queryset(user, filters, ordering, field_plans, search)
+        rows, to_dict = self.list_rows(queryset, field_plans, search)
+
+        if self.streaming is not None:
+            return self.astreaming_response(rows, self.row_to_json(to_dict))
+
+        if page_request is None:
+            return self.list_response([row async for row in rows], to_dict)
+
+        page = await self.aget_page(rows, page_request, search)
+        return self.list_response(page.items, to_dict, page.next)
+
+    def instance_response(self, instance, field_plans):
+        if field_plans is not None:
+            return Response(dumps(plans_to_dict(field_plans, instance)), media_type="application/json")
+
+        return self.instance_schema.from_model(instance)
+
+    def values_get_queryset(self, identifier, user, field_plans):
+        serializer = self.values_serializer if field_plans is None else ValuesSerializer(field_plans)
+        filter_models = self.get_queryset(user).filter(**{self.model_identifier: identifier})
+        return serializer, serializer.values_list(filter_models)
+
+    @staticmethod
+    def values_row_response(identifier, serializer, row):
+        if row is None:
+            raise HTTPException(status_code=404, detail=f"Object {identifier} not found.")
+        return Response(dumps(serializer.to_dict(row)), media_type="application/json")
+
+    def respond_get(self, identifier, user, field_plans):
+        if self.values_serializer:
+            serializer, rows = self.values_get_queryset(identifier, user, field_plans)
+            return self.values_row_response(identifier, serializer, rows.first())
+
+        return self.instance_response(self.get_instance(identifier, user, field_plans), field_plans)
+
+    async def arespond_get(self, identifier, user, field_plans):
+        if self.values_serializer:
+            serializer, rows = self.values_get_queryset(identifier, user, field_plans)
+            return self.values_row_response(identifier, serializer, await rows.afirst())
+
+        return self.instance_response(await self.aget_instance(identifier, user, field_plans), field_plans)
+
+    def list_validator_queryset(self, user, page_request, filters=None, search=None):
+        queryset = self.list_queryset(user, filters, search=search)
+        if page_request is None:
+            return queryset
+
+        cursor, limit = page_request
+        try:
+            return self.list_paginator(search).page_queryset(queryset, cursor=cursor, limit=limit)[1]
+        except InvalidCursorException as cursor_error:
+            raise HTTPException(status_code=400, detail="Invalid cursor.") from cursor_error
+
+    def get_validator_queryset(self, identifier, user):
+        return self.get_queryset(user).filter(**{self.model_identifier: identifier})
+
+    def list_validation(  # pylint: disable=too-many-arguments
+        self, user, page_request, field_plans, filters=None, ordering=None, search=None
+    ):
+        queryset = self.list_validator_queryset(user, page_request, filters, search)
+        return queryset, (plan_names(field_plans), page_request, filters, ordering, search)
+
+    def get_validation(self, identifier, user, field_plans):
+        return self.get_validator_queryset(identifier, user), (str(identifier), plan_names(field_plans))
+
+    @property
+    def validator_aggregates(self):
+        # Deletes do not change the latest modification time, but they do change the count. Related rows are joined,
+        # so every count is distinct.
+        distinct = bool(self.related_modified_fields)
+        aggregates = {"last_modified": Max(self.modified_field), "count": Count("pk", distinct=distinct)}
+        for field_name, modified_field in self.related_modified_fields:
+            aggregates[f"{field_name}__last_modified"] = Max(f"{field_name}__{modified_field}")
+            aggregates[f"{field_name}__count"] = Count(field_name, distinct=True)
+        return aggregates
+
+    def validated_response(self, conditions, validators, parts, single=False):
+        """
+        Return the validator headers, and a 304 response if the conditions show the client is up to date.
+
+        Deleting a row, or a related row, does not change the latest modification time, so only a single object
+        without related objects has a Last-Modified date. Everything else relies on the ETag, which includes the
+        counts.
+        """
+        last_modified = validators["last_modified"] if single and not self.related_modified_fields else None
+        etag = make_etag(*sorted(validators.items()), *parts)
+        headers = validator_headers(etag, last_modified)
+        if is_not_modified(etag, last_modified, *conditions):
+            return headers, not_modified_response(headers)
+        return headers, None
+
+    def conditional_response(  # pylint: disable=too-many-arguments
+        self, conditions, queryset, parts, respond, response, single=False
+    ):
+        validators = queryset.aggregate(**self.validator_aggregates)
+        if single and not validators["count"]:
+            # Let the response raise the 404, rather than matching "If-None-Match: *".
+            return respond()
+
+        headers, not_modified = self.validated_response(conditions, validators, parts, single)
+        return not_modified or add_headers(respond(), response, headers)
+
+    async def aconditional_response(  # pylint: disable=too-many-arguments
+        self, conditions, queryset, parts, arespond, response, single=False
+    ):
+        validators = await queryset.aaggregate(**self.validator_aggregates)
+        if single and not validators["count"]:
+            return await arespond()
+
+        headers, not_modified = self.validated_response(conditions, validators, parts, single)
+        return not_modified or add_headers(await arespond(), response, headers)
+
+    def list_responder(  # pylint: disable=too-many-arguments
+        self, user, page_request, field_plans, filters=None, ordering=None, search=None
+    ):
+        respond = partial(self.respond_list, user, page_request, field_plans, filters, ordering, search)
+        response_cache = self.response_cache
+        if response_cache is None:
+            return respond
+
+        def respond_from_cache():
+            key = response_cache.list_key(self.cache_scope(user), field_plans, page_request, filters, ordering, search)
+            return response_cache.fetch(key, respond)
+
+        return respond_from_cache
+
+    def alist_responder(  # pylint: disable=too-many-arguments
+        self, user, page_request, field_plans, filters=None, ordering=None, search=None
+    ):
+        arespond = partial(self.arespond_list, user, page_request, field_plans, filters, ordering, search)
+        response_cache = self.response_cache
+        if response_cache is None:
+            return arespond
+
+        async def arespond_from_cache():
+            key = await response_cache.alist_key(
+                self.cache_scope(user), field_plans, page_request, filters, ordering, search
+            )
+            return await response_cache.afetch(key, arespond)
+
+        return arespond_from_cache
+
+    def get_responder(self, identifier, user, field_plans):
+        respond = partial(self.respond_get, identifier, user, field_plans)
+        response_cache = self.response_cache
+        if response_cache is None:
+            return respond
+
+        def respond_from_cache():
+            key = response_cache.get_key(identifier, self.cache_scope(user), field_plans)
+            return response_cache.fetch(key, respond)
+
+        return respond_from_cache
+
+    def aget_responder(self, identifier, user, field_plans):
+        arespond = partial(self.arespond_get, identifier, user, field_plans)
+        response_cache = self.response_cache
+        if response_cache is None:
+            return arespond
+
+        async def arespond_from_cache():
+            key = await response_cache.aget_key(identifier, self.cache_scope(user), field_plans)
+            return await response_cache.afetch(key, arespond)
+
+        return arespond_from_cache
+
     def add_list_route_to_router(self, router):
-        @router.get(
+        route = router.get(
             self.path_for_list_and_post,
             summary=f"Retrieve a list of all the {self.name_plural}.",
             tags=[f"{self.name_plural}"],
-            response_model=self.multiple_instance_schema,
+            response_model=self.list_schema,
             name=f"{self.name_lower_plural}-get",
         )
-        def _get(user: User = Depends(self.authentication)) -> self.multiple_instance_schema:
-            filter_models = self.model.objects.all()
 
-            if self.query_filter:
-                filter_models = filter_models.filter(self.query_filter(user))
+        def _get(  # pylint: disable=too-many-arguments
+            response: Response,
+            user: User = Depends(self.authentication),
+            page_request=Depends(self.pagination_function),
+            field_plans=Depends(self.fields_function),
+            filters=Depends(self.filter_function),
+            ordering=Depends(self.ordering_function),
+            search=Depends(self.search_function),
+            conditions=Depends(self.conditional_function),
+        ) -> self.list_schema:
+            respond = self.list_responder(user, page_request, field_plans, filters, ordering, search)
+            if conditions is None:
+                return respond()
+
+            queryset, parts = self.list_validation(user, page_request, field_plans, filters, ordering, search)
+            return self.conditional_response(conditions, queryset, parts, respond, response)
+
+        async def _aget(  # pylint: disable=too-many-arguments
+            response, user, page_request, field_plans, filters, ordering, search, conditions
+        ):
+            arespond = self.alist_responder(user, page_request, field_plans, filters, ordering, search)
+            if conditions is None:
+                return await arespond()
+
+            queryset, parts = self.list_validation(user, page_request, field_plans, filters, ordering, search)
+            return await self.aconditional_response(conditions, queryset, parts, arespond, response)
 
-            if self.owner_field:
-                filter_models = filter_models.filter(**{self.owner_field: user})
+        return self.add_route(route, _get, _aget)
+
+    def count(self, user, filters):
+        # The same scope and filters as the list, counted by the database without loading any rows.
+        queryset = self.list_queryset(user, filters)
+        if self.estimate_threshold is None:
+            return CountResult(count=queryset.count())
+
+        count, approximate = estimated_count(queryset.prefetch_related(None), self.estimate_threshold)
+        return CountResult(count=count, approximate=approximate)
+
+    def add_count_route_to_router(self, router):
+        route = router.get(
+            self.path_for_count,
+            summary=f"Count the {self.name_plural}.",
+            tags=[f"{self.name_plural}"],
+            response_model=CountResult,
+            name=f"{self.name_lower_plural}-count",
+        )
 
-            return self.multiple_instance_schema.from_qs(filter_models)
+        def _get(user: User = Depends(self.authentication), filters=Depends(self.filter_function)) -> CountResult:
+            return self.count(user, filters)
 
-        return _get
+        return self.add_route(route, _get)
+
+    def aggregate_response(self, user, filters, aggregate_request):
+        names, group_by = aggregate_request
+        rows = aggregate_rows(self.list_queryset(user, filters), names, group_by)
+        return Response(dumps({"items": rows}), media_type="application/json")
+
+    def add_aggregate_route_to_router(self, router):
+        route = router.get(
+            self.path_for_aggregate,
+            summary=f"Aggregate the {self.name_plural}, optionally in groups.",
+            tags=[f"{self.name_plural}"],
+            response_model=AggregateResult,
+            name=f"{self.name_lower_plural}-aggregate",
+        )
+
+        def _get(
+            user: User = Depends(self.authentication),
+            filters=Depends(self.filter_function),
+            aggregate_request=Depends(self.aggregate_function),
+        ) -> AggregateResult:
+            return self.aggregate_response(user, filters, aggregate_request)
+
+        return self.add_route(route, _get)
 
     def add_get_route_to_router(self, router):
-        @router.get(
+        if self.values_serializer or self.response_cache or self.modified_field:
+            return self.add_identifier_get_route_to_router(router)
+
+        route = router.get(
             self.path_for_identifer,
             summary=f"Get a {self.name}.",
             tags=[f"{self.name_plural}"],
             response_model=self.instance_schema,
             name=f"{self.name_lower}-get",
         )
+
         def _get(
-            instance: self.model = Depends(self.get_function),
-            user: User = Depends(self.authentication),
+            instance: self.model = Depends(self.sparse_get_function),
+            field_plans=Depends(self.fields_function),
         ) -> self.instance_schema:
-            if self.query_filter:
-                self.check_query_filter(instance, user)
+            return self.instance_response(instance, field_plans)
 
-            if self.owner_field:
-                self.check_ownership(instance, user)
+        async def _aget(instance, field_plans):
+            # Related objects were prefetched along with the instance, so no more queries are needed.
+            return self.instance_response(instance, field_plans)
+
+        return self.add_route(route, _get, _aget)
 
-            return self.instance_schema.from_model(instance)
+    def add_identifier_get_route_to_router(self, router):
+        """
+        Add a get route which looks up the identifier itself, so cached or unmodified responses load no instance.
+        """
+        route = router.get(
+            self.path_for_identifer,
+            summary=f"Get a {self.name}.",
+            tags=[f"{self.name_plural}"],
+            response_model=self.instance_schema,
+            name=f"{self.name_lower}-get",
+        )
 
-        return _get
+        def _get(
+            response: Response,
+            identifier: self.model_identifier_class = Path(..., description=f"The identifier of the {self.name}."),
+            user: User = Depends(self.authentication),
+            field_plans=Depends(self.fields_function),
+            conditions=Depends(self.conditional_function),
+        ) -> self.instance_schema:
+            respond = self.get_responder(identifier, user, field_plans)
+            if conditions is None:
+                return respond()
+
+            queryset, parts = self.get_validation(identifier, user, field_plans)
+            return self.conditional_response(conditions, queryset, parts, respond, response, single=True)
+
+        async def _aget(response, identifier, user, field_plans, conditions):
+            arespond = self.aget_responder(identifier, user, field_plans)
+            if conditions is None:
+                return await arespond()
+
+            queryset, parts = self.get_validation(identifier, user, field_plans)
+            return await self.aconditional_response(conditions, queryset, parts, arespond, response, single=True)
+
+        return self.add_route(route, _get, _aget)
+
+    def idempotent_response(  # pylint: disable=too-many-arguments
+        self, idempotency_key, user, route_name, payload, respond
+    ):
+        if idempotency_key is None:
+            return respond()
+        key = self.idempotency_store.key(route_name, getattr(user, "pk", None), idempotency_key)
+        return self.idempotency_store.fetch(key, fingerprint(payload), respond)
+
+    async def aidempotent_response(  # pylint: disable=too-many-arguments
+        self, idempotency_key, user, route_name, payload, arespond
+    ):
+        if idempotency_key is None:
+            return await arespond()
+        key = self.idempotency_store.key(route_name, getattr(user, "pk", None), idempotency_key)
+        return await self.idempotency_store.afetch(key, fingerprint(payload), arespond)
+
+    def identifier_of(self, instance):
+        return {self.model_identifier: getattr(instance, self.model_identifier)}
+
+    def create(self, api_instance, user, minimal=False):
+        extra = {self.owner_field: user} if self.owner_field else None
+        with http_validation_errors():
+            instance = api_instance.create_new(extra=extra)
+        if minimal:
+            return minimal_response(201, self.identifier_of(instance))
+        return self.instance_schema.from_model(instance)
+
+    async def acreate(self, api_instance, user, minimal=False):
+        extra = {self.owner_field: user} if self.owner_field else None
+        with http_validation_errors():
+            instance = await api_instance.acreate_new(extra=extra)
+        if minimal:
+            return minimal_response(201, self.identifier_of(instance))
+        # Reading the related fields of a new instance queries the database.
+        return await sync_to_async(self.instance_schema.from_model)(instance)
 
     def add_create_route_to_router(self, router):
-        @router.post(
+        route = router.post(
             self.path_for_list_and_post,
             summary=f"Create a new {self.name}.",
             tags=[f"{self.name_plural}"],
             response_model=self.instance_schema,
             name=f"{self.name_lower_plural}-post",
         )
+
         def _post(
-            api_instance: self.new_instance_schema, user: User = Depends(self.authentication)
+            api_instance: self.new_instance_schema,
+            user: User = Depends(self.authentication),
+            idempotency_key: Optional[str] = Depends(self.idempotency_function),
+            minimal: bool = Depends(self.minimal_function),
         ) -> self.instance_schema:
-            extra = {self.owner_field: user} if self.owner_field else None
-            instance = api_instance.create_new(extra=extra)
-            return self.instance_schema.from_model(instance)
+            respond = partial(self.create, api_instance, user, minimal)
+            return self.idempotent_response(idempotency_key, user, "post", api_instance, respond)
+
+        async def _apost(api_instance, user, idempotency_key, minimal):
+            arespond = partial(self.acreate, api_instance, user, minimal)
+            return await self.aidempotent_response(idempotency_key, user, "post", api_instance, arespond)
+
+        return self.add_route(route, _post, _apost)
+
+    def bulk_create(self, api_instances, user, minimal=False):
+        extra = {self.owner_field: user} if self.owner_field else None
+        try:
+            with http_validation_errors():
+                instances = self.new_instance_schema.bulk_create_new(
+                    api_instances, extra=extra, batch_size=self.bulk_batch_size
+                )
+        except IntegrityError as integrity_error:
+            raise HTTPException(
+                status_code=409, detail=f"The {self.name_plural} conflict with existing {self.name_plural}."
+            ) from integrity_error
+
+        if self.response_cache:
+            # bulk_create() does not send post_save signals.
+            self.response_cache.invalidate_all()
+
+        if minimal:
+            return minimal_response(201, {"items": [self.identifier_of(instance) for instance in instances]})
+
+        prefetch_related_objects(instances, *self.prefetches)
+        return self.multiple_instance_schema.from_qs(instances)
+
+    def add_bulk_create_route_to_router(self, router):
+        route = router.post(
+            self.path_for_bulk,
+            summary=f"Create many new {self.name_plural}.",
+            tags=[f"{self.name_plural}"],
+            response_model=self.multiple_instance_schema,
+            name=f"{self.name_lower_plural}-bulk-post",
+        )
+
+        def _post(
+            api_instances: List[self.new_instance_schema],
+            user: User = Depends(self.authentication),
+            idempotency_key: Optional[str] = Depends(self.idempotency_function),
+            minimal: bool = Depends(self.minimal_function),
+        ) -> self.multiple_instance_schema:
+            respond = partial(self.bulk_create, api_instances, user, minimal)
+            return self.idempotent_response(idempotency_key, user, "bulk-post", api_instances, respond)
+
+        return self.add_route(route, _post)
+
+    def bulk_update(self, items, user):
+        identifier_field = self.model._meta.get_field(self.model_identifier)
+        with http_validation_errors():
+            identifiers = clean_identifiers(identifier_field, [item.identifier for item in items])
+
+        # One query checks every identifier against the query_filter and owner_field scope.
+        queryset = self.get_queryset(user).prefetch_related(None)
+        queryset = queryset.filter(**{f"{self.model_identifier}__in": identifiers})
+        pks = dict(queryset.values_list(self.model_identifier, "pk"))
+        missing = [str(identifier) for identifier in identifiers if identifier not in pks]
+        if missing:
+            raise HTTPException(status_code=404, detail=f"Objects {', '.join(missing)} not found.")
+
+        try:
+            with http_validation_errors():
+                updated = self.new_instance_schema.bulk_update_existing(
+                    [pks[identifier] for identifier in identifiers],
+                    [item.fields for item in items],
+                    batch_size=self.bulk_batch_size,
+                )
+        except IntegrityError as integrity_error:
+            raise HTTPException(
+                status_code=409, detail=f"The {self.name_plural} conflict with existing {self.name_plural}."
+            ) from integrity_error
+
+        if self.response_cache:
+            # bulk_update() does not send post_save signals.
+            self.response_cache.invalidate_all()
+
+        return BulkUpdateResult(updated=updated)
+
+    def add_bulk_update_route_to_router(self, router):
+        route = router.patch(
+            self.path_for_bulk,
+            summary=f"Partially update many {self.name_plural}.",
+            tags=[f"{self.name_plural}"],
+            response_model=BulkUpdateResult,
+            name=f"{self.name_lower_plural}-bulk-patch",
+        )
+
+        def _patch(items: List[self.bulk_update_schema], user: User = Depends(self.authentication)) -> BulkUpdateResult:
+            return self.bulk_update(items, user)
+
+        return self.add_route(route, _patch)
+
+    def bulk_delete_queryset(self, selection, user):
+        queryset = self.get_queryset(user).prefetch_related(None)
+        if selection.identifiers is not None:
+            identifier_field = self.model._meta.get_field(self.model_identifier)
+            with http_validation_errors():
+                identifiers = clean_identifiers(
+                    identifier_field,
+                    selection.identifiers,
+                    locations=[(["body", "identifiers"], index) for index in range(len(selection.identifiers))],
+                    unique=False,
+                )
+            return queryset.filter(**{f"{self.model_identifier}__in": identifiers})
+
+        lookups = selection.filter.dict(exclude_unset=True)
+        plans_by_name = {plan.name: plan for plan in self.new_instance_schema.field_plans}
+        errors = [
+            item_error(["body", "filter"], field, "Many to many fields can not be filtered on.")
+            for field in lookups
+            if plans_by_name[field].kind == MANY_TO_MANY
+        ]
+        if errors:
+            with http_validation_errors():
+                raise ItemValidationError(errors)
+        return queryset.filter(**lookups)
+
+    def bulk_delete(self, selection, user):
+        # The query_filter and owner_field scope are part of the DELETE, so only objects the user
+        # is allowed to see can be deleted.
+        deleted, objects = bulk_delete(self.bulk_delete_queryset(selection, user))
+        return BulkDeleteResult(deleted=deleted, objects=objects)
+
+    def add_bulk_delete_route_to_router(self, router):
+        route = router.delete(
+            self.path_for_bulk,
+            summary=f"Delete many {self.name_plural}.",
+            tags=[f"{self.name_plural}"],
+            response_model=BulkDeleteResult,
+            name=f"{self.name_lower_plural}-bulk-delete",
+        )
+
+        def _delete(selection: self.bulk_delete_schema, user: User = Depends(self.authentication)) -> BulkDeleteResult:
+            return self.bulk_delete(selection, user)
+
+        return self.add_route(route, _delete)
+
+    def check_upsert_scope(self, identifiers, user):
+        if not (self.owner_field or self.query_filter):
+            return
+
+        # ON CONFLICT can not be scoped, so existing objects the user is not allowed to change are rejected first, and
+        # are locked until the upsert commits so that they can not change scope in between.
+        scoped = self.get_queryset(user).prefetch_related(None).filter(pk=OuterRef("pk"))
+        queryset = (
+            self.model.objects.select_for_update()
+            .filter(**{f"{self.model_identifier}__in": identifiers})
+            .annotate(scoped=Exists(scoped))
+            .order_by("pk")
+        )
+        forbidden = [
+            str(identifier)
+            for identifier, allowed in queryset.values_list(self.model_identifier, "scoped")
+            if not allowed
+        ]
+        if forbidden:
+            raise HTTPException(status_code=404, detail=f"Objects {', '.join(forbidden)} not found.")
+
+    def check_upsert_owner(self, identifiers, user):
+        if not self.owner_field:
+            return
+
+        # Objects created by someone else after the scope check are updated by ON CONFLICT without changing their
+        # owner, so they are rejected and the whole upsert is rolled back.
+        queryset = self.model.objects.filter(**{f"{self.model_identifier}__in": identifiers})
+        forbidden = [
+            str(identifier)
+            for identifier in queryset.exclude(**{self.owner_field: user}).values_list(self.model_identifier, flat=True)
+        ]
+        if forbidden:
+            raise HTTPException(status_code=404, detail=f"Objects {', '.join(forbidden)} not found.")
+
+    def upsert_items(self, items, user, single=False):
+        if single:
+            identifier_locations = [(["body"], "identifier")]
+            locations = [["body", "fields"]]
+        else:
+            identifier_locations = None
+            locations = [["body", index, "fields"] for index in range(len(items))]
+
+        identifier_field = self.model._meta.get_field(self.model_identifier)
+        with http_validation_errors():
+            identifiers = clean_identifiers(
+                identifier_field, [item.identifier for item in items], locations=identifier_locations
+            )
+
+        extras = []
+        for identifier in identifiers:
+            extra = {self.model_identifier: identifier}
+            if self.owner_field:
+                extra[self.owner_field] = user
+            extras.append(extra)
+
+        try:
+            with transaction.atomic():
+                self.check_upsert_scope(identifiers, user)
+                with http_validation_errors():
+                    self.new_instance_schema.bulk_upsert_new(
+                        [item.fields for item in items],
+                        extras,
+                        locations,
+                        self.model_identifier,
+                        batch_size=self.upsert_batch_size,
+                    )
+                self.check_upsert_owner(identifiers, user)
+        except IntegrityError as integrity_error:
+            raise HTTPException(
+                status_code=409, detail=f"The {self.name_plural} conflict with existing {self.name_plural}."
+            ) from integrity_error
+
+        if self.response_cache:
+            # bulk_create() does not send post_save signals.
+            self.response_cache.invalidate_all()
+
+        # Rows which already existed keep the values of fields which are not in the request, so they are read back.
+        instances = self.get_base_queryset().in_bulk(identifiers, field_name=self.model_identifier)
+        return [instances[identifier] for identifier in identifiers]
+
+    def upsert_instance(self, item, user):
+        return self.instance_schema.from_model(self.upsert_items([item], user, single=True)[0])
+
+    def bulk_upsert(self, items, user):
+        return self.multiple_instance_schema.from_qs(self.upsert_items(items, user))
+
+    def add_upsert_route_to_router(self, router):
+        route = router.put(
+            self.path_for_upsert,
+            summary=f"Create a {self.name}, or update the {self.name} with the same identifier.",
+            tags=[f"{self.name_plural}"],
+            response_model=self.instance_schema,
+            name=f"{self.name_lower}-upsert",
+        )
+
+        def _put(item: self.upsert_schema, user: User = Depends(self.authentication)) -> self.instance_schema:
+            return self.upsert_instance(item, user)
 
-        return _post
+        return self.add_route(route, _put)
+
+    def add_bulk_upsert_route_to_router(self, router):
+        route = router.put(
+            self.path_for_bulk_upsert,
+            summary=f"Create many {self.name_plural}, or update the {self.name_plural} with the same identifiers.",
+            tags=[f"{self.name_plural}"],
+            response_model=self.multiple_instance_schema,
+            name=f"{self.name_lower_plural}-bulk-upsert",
+        )
+
+        def _put(
+            items: List[self.upsert_schema], user: User = Depends(self.authentication)
+        ) -> self.multiple_instance_schema:
+            return self.bulk_upsert(items, user)
+
+        return self.add_route(route, _put)
+
+    def validate_operation_results(self, queryset, field_names):
+        """
+        Validate the new values of the fields, which are only known once the database has applied the operations,
+        raising a 422 which rolls back the update if any are invalid.
+        """
+        if not field_names:
+            return
+
+        instance = queryset.only(*field_names).get()
+        exclude = [field.name for field in self.model._meta.fields if field.name not in field_names]
+        errors = []
+        clean_instance(instance, exclude, ["body"], errors)
+        if errors:
+            raise HTTPException(status_code=422, detail=errors)
+
+    def apply_operations(self, identifier, operations, user, minimal=False):
+        field_names = [plan.name for plan in self.new_instance_schema.field_plans if plan.kind == PLAIN]
+        with http_validation_errors():
+            updates = operation_updates(self.model, field_names, operations)
+
+        # QuerySet.update() does not call pre_save(), so auto_now fields are set here.
+        now = timezone.now()
+        updates.update({field: now for field in modification_field_names(self.model)})
+
+        # The query_filter and owner_field scope are part of the UPDATE, so the object is not read first.
+        queryset = self.get_queryset(user).prefetch_related(None).filter(**{self.model_identifier: identifier})
+        try:
+            with transaction.atomic():
+                updated = queryset.update(**updates)
+                if updated:
+                    self.validate_operation_results(queryset, validated_fields(self.model, updates))
+        except IntegrityError as integrity_error:
+            raise HTTPException(
+                status_code=409, detail=f"The {self.name} conflicts with existing {self.name_plural}."
+            ) from integrity_error
+        except DataError as data_error:
+            raise HTTPException(
+                status_code=422, detail=f"The operations can not be applied to {self.name} {identifier}."
+            ) from data_error
+
+        if not updated:
+            raise HTTPException(status_code=404, detail=f"Object {identifier} not found.")
+
+        if self.response_cache:
+            # QuerySet.update() does not send post_save signals.
+            self.response_cache.invalidate_all()
+
+        if minimal:
+            return minimal_response(204)
+        return self.instance_schema.from_model(self.get_instance(identifier, user))
+
+    def add_operations_route_to_router(self, router):
+        route = router.post(
+            self.path_for_operations,
+            summary=f"Change fields of a {self.name} in place.",
+            tags=[f"{self.name_plural}"],
+            response_model=self.instance_schema,
+            name=f"{self.name_lower}-operations",
+        )
+
+        def _post(
+            identifier: self.model_identifier_class = Path(..., description=f"The identifier of the {self.name}."),
+            operations: List[Operation] = Body(..., min_items=1),
+            user: User = Depends(self.authentication),
+            idempotency_key: Optional[str] = Depends(self.idempotency_function),
+            minimal: bool = Depends(self.minimal_function),
+        ) -> self.instance_schema:
+            respond = partial(self.apply_operations, identifier, operations, user, minimal)
+            return self.idempotent_response(idempotency_key, user, f"operations:{identifier}", operations, respond)
+
+        return self.add_route(route, _post)
+
+    def update(self, instance, api_instance, minimal=False, fields_to_update=None):
+        with http_validation_errors():
+            if minimal:
+                api_instance.update_instance(instance, fields_to_update=fields_to_update)
+                return minimal_response(204)
+            return api_instance.update(instance, fields_to_update=fields_to_update)
+
+    async def aupdate(self, instance, api_instance, minimal=False, fields_to_update=None):
+        with http_validation_errors():
+            if minimal:
+                await api_instance.aupdate_instance(instance, fields_to_update=fields_to_update)
+                return minimal_response(204)
+            return await api_instance.aupdate(instance, fields_to_update=fields_to_update)
 
     def add_patch_route_to_router(self, router):
-        @router.patch(
+        route = router.patch(
             self.path_for_identifer,
             summary=f"Partially update a {self.name}.",
             tags=[f"{self.name_plural}"],
             response_model=self.instance_schema,
             name=f"{self.name_lower}-patch",
         )
+
         def _patch(
-            instance: self.model = Depends(self.get_function),
+            instance: self.model = Depends(self.write_get_function),
             api_instance: self.updating_schema = Body(...),
-            user: User = Depends(self.authentication),
+            minimal: bool = Depends(self.minimal_function),
         ) -> self.instance_schema:
-            if self.query_filter:
-                self.check_query_filter(instance, user)
+            return self.update(instance, api_instance, minimal, api_instance.dict(exclude_unset=True))
 
-            if self.owner_field:
-                self.check_ownership(instance, user)
+        async def _apatch(instance, api_instance, minimal):
+            return await self.aupdate(instance, api_instance, minimal, api_instance.dict(exclude_unset=True))
 
-            fields_to_update = api_instance.dict(exclude_unset=True)
-            return api_instance.update(instance, fields_to_update=fields_to_update)
-
-        return _patch
+        return self.add_route(route, _patch, _apatch)
 
     def add_update_route_to_router(self, router):
-        @router.put(
+        route = router.put(
             self.path_for_identifer,
             summary=f"Update a {self.name}.",
             tags=[f"{self.name_plural}"],
             response_model=self.instance_schema,
             name=f"{self.name_lower}-put",
         )
+
         def _put(
-            instance: self.model = Depends(self.get_function),
+            instance: self.model = Depends(self.write_get_function),
             api_instance: self.new_instance_schema = Body(...),
-            user: User = Depends(self.authentication),
+            minimal: bool = Depends(self.minimal_function),
         ) -> self.instance_schema:
-            if self.query_filter:
-                self.check_query_filter(instance, user)
+            return self.update(instance, api_instance, minimal)
 
-            if self.owner_field:
-                self.check_ownership(instance, user)
+        return self.add_route(route, _put, self.aupdate)
 
-            return api_instance.update(instance)
+    def delete(self, instance, minimal=False):
+        api_instance = None if minimal else self.instance_schema.from_model(instance)
+        instance.delete()
+        return minimal_response(204) if minimal else api_instance
 
-        return _put
+    async def adelete(self, instance, minimal=False):
+        api_instance = None if minimal else self.instance_schema.from_model(instance)
+        await self.model.objects.filter(pk=instance.pk).adelete()
+        return minimal_response(204) if minimal else api_instance
 
     def add_delete_route_to_router(self, router):
-        @router.delete(
+        route = router.delete(
             self.path_for_identifer,
             summary=f"Delete a {self.name}.",
             tags=[f"{self.name_plural}"],
             response_model=self.instance_schema,
             name=f"{self.name_lower}-delete",
         )
+
         def _delete(
-            instance: self.model = Depends(self.get_function), user: User = Depends(self.authentication)
+            instance: self.model = Depends(self.write_get_function), minimal: bool = Depends(self.minimal_function)
         ) -> self.instance_schema:
-            if self.query_filter:
-                self.check_query_filter(instance, user)
-
-            if self.owner_field:
-                self.check_ownership(instance, user)
-
-            api_instance = self.instance_schema.from_model(instance)
-            instance.delete()
-            return api_instance
+            return self.delete(instance, minimal)
 
-        return _delete
+        return self.add_route(route, _delete, self.adelete)
@@ -0,0 +1,98 @@
+import inspect
+from typing import List, Optional
+
+from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.indexes import BTreeIndex, GinIndex, PostgresIndex
+from django.db.models import Q
+from djantic.fields import ModelSchemaField
+from fastapi import Query
+
+EXACT = "exact"
+IN = "in"
+GTE = "gte"
+LTE = "lte"
+CONTAINS = "contains"
+ISNULL = "isnull"
+LOOKUPS = (EXACT, IN, GTE, LTE, CONTAINS, ISNULL)
+ARRAY_LOOKUPS = (CONTAINS, ISNULL)
+
+
+def btree_index_fields(django_model):
+    """
+    Return the names of the fields which lead a B-tree index, so can be looked up by value or range.
+    """
+    opts = django_model._meta
+    names = {field.name for field in opts.concrete_fields if field.primary_key or field.unique or field.db_index}
+    for index in opts.indexes:
+        if index.fields and (isinstance(index, BTreeIndex) or not isinstance(index, PostgresIndex)):
+            names.add(index.fields[0].lstrip("-"))
+    names.update(fields[0] for fields in opts.unique_together)
+    names.update(constraint.fields[0] for constraint in opts.total_unique_constraints)
+    return names
+
+
+def gin_index_fields(django_model):
+    """
+    Return the names of the fields in a GIN index, so can be looked up by containment.
+    """
+    return {field for index in django_model._meta.indexes if isinstance(index, GinIndex) for field in index.fields}
+
+
+def is_indexed(django_field, lookup=EXACT):
+    if lookup == CONTAINS:
+        return django_field.name in gin_index_fields(django_field.model)
+    return django_field.name in btree_index_fields(django_field.model)
+
+
+def parameter_name(field_name, lookup):
+    return field_name if lookup == EXACT else f"{field_name}__{lookup}"
+
+
+def lookup_annotation(django_field, lookup):
+    """
+    Return the type of the query parameter of a lookup on the field.
+    """
+    if lookup == ISNULL:
+        return bool
+    model_name = django_field.model.__name__
+    if isinstance(django_field, ArrayField):
+        return List[ModelSchemaField(django_field.base_field, model_name)[0]]
+    python_type = ModelSchemaField(django_field, model_name)[0]
+    return List[python_type] if lookup == IN else python_type
+
+
+def filters_function(django_model, filters):
+    """
+    Return a dependency with a typed query parameter for each field and its lookups, which returns the lookups
+    given as a tuple of (lookup, value) pairs, so it can be part of a cache key.
+    """
+    parameters = []
+    lookup_paths = {}
+    for field_name, lookups in filters.items():
+        django_field = django_model._meta.get_field(field_name)
+        for lookup in lookups:
+            name = parameter_name(field_name, lookup)
+            lookup_paths[name] = f"{field_name}__{lookup}"
+            query = Query(None, description=f"Only return objects where {field_name}__{lookup} is this value.")
+            annotation = Optional[lookup_annotation(django_field, lookup)]
+            parameters.append(
+                inspect.Parameter(name, inspect.Parameter.KEYWORD_ONLY, default=query, annotation=annotation)
+            )
+
+    def func(**values):
+        """
+        Retrieve the requested filters.
+        """
+        return tuple(
+            (lookup_paths[name], tuple(value) if isinstance(value, list) else value)
+            for name, value in values.items()
+            if value is not None
+        )
+
+    func.__signature__ = inspect.Signature(parameters)
+    return func
+
+
+def filters_q(filters):
+    # Lists are kept as tuples so the filters can be hashed, but arrays are compared with lists.
+    return Q(*[(lookup, list(value) if isinstance(value, tuple) else value) for lookup, value in filters])
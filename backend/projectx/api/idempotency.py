@@ -0,0 +1,122 @@
+import asyncio
+import hashlib
+import time
+from contextlib import asynccontextmanager, contextmanager
+
+from django.core.cache import caches
+from fastapi import HTTPException, Response
+
+from projectx.api.caching import render
+
+REPLAYED_HEADER = "Idempotent-Replayed"
+POLL_INTERVAL = 0.05
+
+
+def fingerprint(payload):
+    """
+    Return a digest of the request body, which is a pydantic model or a list of them.
+    """
+    items = payload if isinstance(payload, list) else [payload]
+    return hashlib.sha1("\n".join(item.json() for item in items).encode("utf-8")).hexdigest()
+
+
+def status_code(response):
+    return response.status_code if isinstance(response, Response) else 200
+
+
+def replayed_response(status, body):
+    return Response(body, status_code=status, media_type="application/json", headers={REPLAYED_HEADER: "true"})
+
+
+class IdempotencyStore:
+    """
+    Stores the first response to each Idempotency-Key, so retried requests are answered without running them again.
+
+    Requests with the same key wait on a short lock held while the first one runs, which with the django_redis
+    backend is a Redis SET NX with an expiry.
+    """
+
+    def __init__(self, name, alias="default", timeout=86400, lock_timeout=10):
+        self.prefix = f"routebuilder:idempotency:{name}"
+        self.alias = alias
+        self.timeout = timeout
+        self.lock_timeout = lock_timeout
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    def key(self, route_name, scope, idempotency_key):
+        digest = hashlib.sha1(idempotency_key.encode("utf-8")).hexdigest()
+        return f"{self.prefix}:{route_name}:{scope}:{digest}"
+
+    def lock_timed_out(self, deadline):
+        if time.monotonic() > deadline:
+            raise HTTPException(status_code=409, detail="A request with this Idempotency-Key is already in progress.")
+
+    @contextmanager
+    def lock(self, key):
+        lock_key = f"{key}:lock"
+        deadline = time.monotonic() + self.lock_timeout
+        while not self.cache.add(lock_key, 1, timeout=self.lock_timeout):
+            self.lock_timed_out(deadline)
+            time.sleep(POLL_INTERVAL)
+        try:
+            yield
+        finally:
+            self.cache.delete(lock_key)
+
+    @asynccontextmanager
+    async def alock(self, key):
+        lock_key = f"{key}:lock"
+        deadline = time.monotonic() + self.lock_timeout
+        while not await self.cache.aadd(lock_key, 1, timeout=self.lock_timeout):
+            self.lock_timed_out(deadline)
+            await asyncio.sleep(POLL_INTERVAL)
+        try:
+            yield
+        finally:
+            await self.cache.adelete(lock_key)
+
+    @staticmethod
+    def replay(stored, request_fingerprint):
+        stored_fingerprint, status, body = stored
+        if stored_fingerprint != request_fingerprint:
+            raise HTTPException(
+                status_code=422, detail="The Idempotency-Key has already been used for a different request."
+            )
+        return replayed_response(status, body)
+
+    def fetch(self, key, request_fingerprint, respond):
+        """
+        Return the stored response for the key, or call respond and store what it returns if it succeeds.
+        """
+        stored = self.cache.get(key)
+        if stored is not None:
+            return self.replay(stored, request_fingerprint)
+
+        with self.lock(key):
+            # The request holding the lock may have just stored its response.
+            stored = self.cache.get(key)
+            if stored is not None:
+                return self.replay(stored, request_fingerprint)
+
+            response = respond()
+            stored = (request_fingerprint, status_code(response), render(response))
+            self.cache.set(key, stored, timeout=self.timeout)
+            return response
+
+    async def afetch(self, key, request_fingerprint, arespond):
+        stored = await self.cache.aget(key)
+        if stored is not None:
+            return self.replay(stored, request_fingerprint)
+
+        async with self.alock(key):
+            stored = await self.cache.aget(key)
+            if stored is not None:
+                return self.replay(stored, request_fingerprint)
+
+            response = await arespond()
+            stored = (request_fingerprint, status_code(response), render(response))
+            await self.cache.aset(key, stored, timeout=self.timeout)
+            return response
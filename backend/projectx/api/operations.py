@@ -0,0 +1,164 @@
+import json
+from typing import Any, List, Literal
+
+from django.contrib.postgres.fields import ArrayField
+from django.core.exceptions import ValidationError
+from django.core.validators import MaxValueValidator, MinValueValidator
+from django.db import connection, models
+from django.db.models import F, Func, Value
+from django.db.models.functions import Cast, Coalesce
+from pydantic import BaseModel, Field  # pylint: disable=no-name-in-module
+
+from projectx.api.bulk import ItemValidationError, item_error
+
+MERGE = "merge"
+SET = "set"
+APPEND = "append"
+REMOVE = "remove"
+INCREMENT = "increment"
+
+NUMERIC_FIELDS = (models.IntegerField, models.FloatField, models.DecimalField)
+
+
+class Operation(BaseModel):  # pylint: disable=too-few-public-methods
+    """
+    An in place change to one field, applied by the database without reading the stored value.
+    """
+
+    op: Literal[MERGE, SET, APPEND, REMOVE, INCREMENT] = Field(
+        ...,
+        description=(
+            "merge the keys of a JSON object, set the value at a path of a JSON object, append a value to or remove "
+            "every copy of a value from an array, or increment a number."
+        ),
+    )
+    field: str = Field(..., description="The field to change.")
+    path: List[str] = Field([], description="The keys leading to the JSON value to set.")
+    value: Any = Field(None, description="The JSON object to merge, value to set, array item or increment.")
+
+
+class JSONBMerge(Func):  # pylint: disable=abstract-method
+    arg_joiner = " || "
+    template = "(%(expressions)s)"
+    output_field = models.JSONField()
+
+
+class JSONBSet(Func):  # pylint: disable=abstract-method
+    function = "jsonb_set"
+    output_field = models.JSONField()
+
+
+def supports(operation, django_field):
+    if operation.op in (MERGE, SET):
+        return isinstance(django_field, models.JSONField)
+    if operation.op in (APPEND, REMOVE):
+        return isinstance(django_field, ArrayField)
+    return isinstance(django_field, NUMERIC_FIELDS)
+
+
+def json_value(value):
+    # A JSON null bound as a JSONField value is an SQL NULL, which would make the whole result NULL.
+    return Cast(Value(json.dumps(value)), models.JSONField())
+
+
+def json_expression(expression, operation, location, errors):
+    # A NULL column is changed as if it were an empty object.
+    target = Coalesce(expression, json_value({}))
+    if operation.op == MERGE:
+        if not isinstance(operation.value, dict):
+            errors.append(item_error(location, "value", "The value to merge must be an object."))
+            return expression
+        return JSONBMerge(target, json_value(operation.value))
+
+    if not operation.path:
+        errors.append(item_error(location, "path", "The path to set must not be empty."))
+        return expression
+    path = Value(operation.path, output_field=ArrayField(models.TextField()))
+    return JSONBSet(target, path, json_value(operation.value))
+
+
+def clean_value(django_field, operation, location, errors):
+    """
+    Return the array item or increment of the operation as a python value, or None with an error if it is invalid.
+    """
+    if operation.value is None:
+        errors.append(item_error(location, "value", "This field cannot be null."))
+        return None
+
+    try:
+        if operation.op == INCREMENT:
+            return django_field.to_python(operation.value)
+        return django_field.base_field.clean(operation.value, None)
+    except ValidationError as validation_error:
+        errors.extend(item_error(location, "value", message) for message in validation_error.messages)
+        return None
+
+
+def operation_expression(expression, django_field, operation, location, errors):
+    """
+    Return the expression applying the operation to the expression of the field, adding errors if it is invalid.
+    """
+    if operation.op in (MERGE, SET):
+        return json_expression(expression, operation, location, errors)
+
+    value = clean_value(django_field, operation, location, errors)
+    if value is None:
+        return expression
+
+    if operation.op == INCREMENT:
+        return expression + Value(value, output_field=django_field)
+
+    function = "array_append" if operation.op == APPEND else "array_remove"
+    return Func(
+        expression, Value(value, output_field=django_field.base_field), function=function, output_field=django_field
+    )
+
+
+def is_integer_range(django_field, field_validator):
+    if not isinstance(django_field, models.IntegerField):
+        return False
+    min_value, max_value = connection.ops.integer_field_range(django_field.get_internal_type())
+    if isinstance(field_validator, MinValueValidator):
+        return field_validator.limit_value == min_value
+    return isinstance(field_validator, MaxValueValidator) and field_validator.limit_value == max_value
+
+
+def validated_fields(django_model, updates):
+    """
+    Return the names of the updated fields with validators, whose new values must be read back and validated.
+
+    The range of an integer column is left out, as the database raises a DataError when it is exceeded.
+    """
+    names = []
+    for field_name in updates:
+        django_field = django_model._meta.get_field(field_name)
+        if any(not is_integer_range(django_field, field_validator) for field_validator in django_field.validators):
+            names.append(field_name)
+    return names
+
+
+def operation_updates(django_model, field_names, operations):
+    """
+    Return the update expression of each field changed by the operations, raising ItemValidationError if any are
+    invalid. Operations on the same field are applied in order.
+    """
+    errors = []
+    updates = {}
+    for index, operation in enumerate(operations):
+        location = ["body", index]
+        if operation.field not in field_names:
+            errors.append(item_error(location, "field", f"{operation.field} not in {sorted(field_names)}."))
+            continue
+
+        django_field = django_model._meta.get_field(operation.field)
+        if not supports(operation, django_field):
+            errors.append(item_error(location, "op", f"{operation.op} can not be applied to {operation.field}."))
+            continue
+
+        expression = updates.get(operation.field, F(operation.field))
+        updates[operation.field] = operation_expression(expression, django_field, operation, location, errors)
+
+    if errors:
+        raise ItemValidationError(errors)
+
+    return updates
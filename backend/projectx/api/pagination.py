@@ -0,0 +1,133 @@
+import base64
+import binascii
+import json
+from typing import Any, List, NamedTuple, Optional
+
+from django.core.exceptions import ValidationError
+from django.db.models import FloatField, Q
+
+
+class InvalidCursorException(Exception):
+    pass
+
+
+class Page(NamedTuple):
+    items: List[Any]
+    next: Optional[str]
+
+
+class CursorPaginator:
+    """
+    Keyset pagination over an (ordering field, pk) pair.
+
+    Pages are selected with a WHERE clause on the last seen row rather than an OFFSET,
+    so fetching a page deep into a large table costs the same as fetching the first one.
+    """
+
+    def __init__(self, model, ordering="pk", page_size=100, max_page_size=1000):
+        self.ordering = ordering
+        self.descending = ordering.startswith("-")
+        self.field_name = ordering.lstrip("-")
+        self.page_size = page_size
+        self.max_page_size = max_page_size
+
+        pk_field = model._meta.pk
+        self.field = pk_field if self.field_name in ("pk", pk_field.name) else model._meta.get_field(self.field_name)
+        self.pk_field = pk_field
+
+    def ranked(self, rank):
+        """
+        Return a paginator with the same page sizes over the rank annotated on the queryset.
+        """
+        return RankPaginator(self.pk_field.model, rank, page_size=self.page_size, max_page_size=self.max_page_size)
+
+    @property
+    def order_by(self):
+        if self.field == self.pk_field:
+            return ("-pk",) if self.descending else ("pk",)
+        return (self.ordering, "-pk" if self.descending else "pk")
+
+    def encode_cursor(self, instance):
+        """
+        Create an opaque cursor pointing just after the given instance.
+        """
+        value = self.field.value_to_string(instance)
+        pk = self.pk_field.value_to_string(instance)
+        payload = json.dumps([self.ordering, value, pk]).encode("utf-8")
+        return base64.urlsafe_b64encode(payload).decode("ascii")
+
+    def decode_cursor(self, cursor):
+        """
+        Convert an opaque cursor back to the (ordering value, pk) it was created from.
+        """
+        try:
+            ordering, value, pk = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+            if ordering != self.ordering:
+                raise ValueError(f"Cursor ordering {ordering} does not match {self.ordering}")
+            return self.field.to_python(value), self.pk_field.to_python(pk)
+        except (binascii.Error, TypeError, ValueError, ValidationError) as cursor_error:
+            raise InvalidCursorException(f"Invalid cursor '{cursor}'.") from cursor_error
+
+    def filter_after(self, queryset, cursor):
+        value, pk = self.decode_cursor(cursor)
+        lookup = "lt" if self.descending else "gt"
+        if self.field == self.pk_field:
+            return queryset.filter(**{f"pk__{lookup}": pk})
+        after_value = Q(**{f"{self.field_name}__{lookup}": value})
+        after_pk = Q(**{self.field_name: value, f"pk__{lookup}": pk})
+        return queryset.filter(after_value | after_pk)
+
+    def page_queryset(self, queryset, cursor=None, limit=None):
+        """
+        Return the page size and the queryset of rows for a single page, starting after the given cursor.
+        """
+        limit = min(limit or self.page_size, self.max_page_size)
+        queryset = queryset.order_by(*self.order_by)
+        if cursor:
+            queryset = self.filter_after(queryset, cursor)
+
+        # Fetch one extra row to find out if there is a next page without a COUNT.
+        return limit, queryset[: limit + 1]
+
+    def page_from_rows(self, rows, limit):
+        next_cursor = self.encode_cursor(rows[limit - 1]) if len(rows) > limit else None
+        return Page(rows[:limit], next_cursor)
+
+    def paginate(self, queryset, cursor=None, limit=None):
+        """
+        Return a single Page of the queryset, starting after the given cursor.
+        """
+        limit, queryset = self.page_queryset(queryset, cursor, limit)
+        return self.page_from_rows(list(queryset), limit)
+
+    async def apaginate(self, queryset, cursor=None, limit=None):
+        """
+        Return a single Page of the queryset, fetching the rows with the async ORM.
+        """
+        limit, queryset = self.page_queryset(queryset, cursor, limit)
+        return self.page_from_rows([row async for row in queryset], limit)
+
+
+class RankPaginator(CursorPaginator):
+    """
+    Keyset pagination over a (rank DESC, pk) pair, where the rank is annotated on the queryset.
+
+    The most relevant rows come first on every page, and rows of the same rank are in primary key order.
+    """
+
+    def __init__(self, model, rank, page_size=100, max_page_size=1000):
+        super().__init__(model, page_size=page_size, max_page_size=max_page_size)
+        self.ordering = f"-{rank}"
+        self.field_name = rank
+        self.field = FloatField()
+        self.field.set_attributes_from_name(rank)
+
+    @property
+    def order_by(self):
+        return (self.ordering, "pk")
+
+    def filter_after(self, queryset, cursor):
+        rank, pk = self.decode_cursor(cursor)
+        after_rank = Q(**{f"{self.field_name}__lt": rank})
+        after_pk = Q(**{self.field_name: rank, "pk__gt": pk})
+        return queryset.filter(after_rank | after_pk)
@@ -0,0 +1,26 @@
+from fastapi import Response
+
+from projectx.api.serialization import dumps
+
+MINIMAL = "minimal"
+REPRESENTATION = "representation"
+RETURN_PREFERENCES = (MINIMAL, REPRESENTATION)
+
+
+def return_preference(prefer, default=REPRESENTATION):
+    """
+    Return the return preference of a Prefer header, as described in RFC 7240, or the default if it has none.
+    """
+    for preference in (prefer or "").split(","):
+        token, _, value = preference.split(";")[0].partition("=")
+        value = value.strip().strip('"').lower()
+        if token.strip().lower() == "return" and value in RETURN_PREFERENCES:
+            return value
+    return default
+
+
+def minimal_response(status_code, content=None):
+    headers = {"Preference-Applied": f"return={MINIMAL}"}
+    if content is None:
+        return Response(status_code=status_code, headers=headers)
+    return Response(dumps(content), status_code=status_code, media_type="application/json", headers=headers)
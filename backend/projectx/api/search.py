@@ -0,0 +1,56 @@
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db import migrations
+from django.db.models import F, FloatField
+from django.db.models.functions import Cast
+
+from projectx.api.filters import gin_index_fields
+
+SEARCH_TYPE = "websearch"
+RANK = "search_rank"
+
+
+def trigger_name(db_table, vector):
+    return f"{db_table}_{vector}_trigger"
+
+
+def search_trigger_sql(db_table, vector, fields, config="english"):
+    """
+    Return the SQL creating a trigger which keeps the vector column up to date with the text fields on every insert
+    and update, including bulk and QuerySet.update() writes, then fills the vector of the existing rows.
+    """
+    columns = ", ".join(f'"{field}"' for field in fields)
+    name = trigger_name(db_table, vector)
+    return [
+        f'DROP TRIGGER IF EXISTS "{name}" ON "{db_table}"',
+        (
+            f'CREATE TRIGGER "{name}" BEFORE INSERT OR UPDATE ON "{db_table}" FOR EACH ROW '
+            f"EXECUTE FUNCTION tsvector_update_trigger(\"{vector}\", 'pg_catalog.{config}', {columns})"
+        ),
+        f'UPDATE "{db_table}" SET "{vector}" = NULL',
+    ]
+
+
+def search_trigger(db_table, vector, fields, config="english"):
+    """
+    Return a migration operation adding the search trigger to a table, which removes it when reversed.
+    """
+    reverse_sql = f'DROP TRIGGER IF EXISTS "{trigger_name(db_table, vector)}" ON "{db_table}"'
+    return migrations.RunSQL(search_trigger_sql(db_table, vector, fields, config), reverse_sql)
+
+
+def has_search_index(django_model, vector):
+    return vector in gin_index_fields(django_model)
+
+
+def search_queryset(queryset, vector, search, config="english", ranked=True):
+    """
+    Return the queryset of the rows matching the search, which the GIN index of the vector finds without a sequential
+    scan, annotated with and ordered by their rank when ranked.
+    """
+    query = SearchQuery(search, config=config, search_type=SEARCH_TYPE)
+    queryset = queryset.filter(**{vector: query})
+    if ranked:
+        # ts_rank() returns a real, which is cast so that the rank in a page cursor compares equal to it.
+        rank = Cast(SearchRank(F(vector), query), FloatField())
+        queryset = queryset.annotate(**{RANK: rank}).order_by(f"-{RANK}", "pk")
+    return queryset
@@ -0,0 +1,142 @@
+import datetime
+import decimal
+import json
+import uuid
+from operator import attrgetter
+from typing import Any, Callable, NamedTuple, Optional, Tuple
+
+from django.contrib.postgres.expressions import ArraySubquery
+from django.db.models import Field, Model, OuterRef
+
+PLAIN = "plain"
+FOREIGN_KEY = "foreign_key"
+MANY_TO_MANY = "many_to_many"
+REVERSE = "reverse"
+
+
+def json_default(value):
+    """
+    Encode the values returned by the database the same way pydantic would.
+    """
+    if isinstance(value, (datetime.datetime, datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    if isinstance(value, decimal.Decimal):
+        return float(value)
+    if isinstance(value, datetime.timedelta):
+        return value.total_seconds()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(data):
+    return json.dumps(data, default=json_default, separators=(",", ":")).encode("utf-8")
+
+
+def related_accessor_name(django_field):
+    if django_field.many_to_many and not django_field.auto_created:
+        return django_field.name
+    return django_field.get_accessor_name()
+
+
+def related_query_name(django_field):
+    if django_field.many_to_many and not django_field.auto_created:
+        return django_field.related_query_name()
+    return django_field.field.name
+
+
+def read_related_pks(accessor, pk_name):
+    def read(instance):
+        return [{pk_name: related.pk} for related in getattr(instance, accessor).all()]
+
+    return read
+
+
+class FieldPlan(NamedTuple):
+    """
+    Everything needed to read or write one field of a model instance, worked out once per RouteBuilder.
+    """
+
+    name: str
+    django_field: Field
+    kind: str
+    column: str
+    read: Callable[[Model], Any]
+    related_model: Optional[type] = None
+    pk_name: Optional[str] = None
+    accessor: Optional[str] = None
+
+
+def compile_field_plan(django_model, field):
+    django_field = django_model._meta.get_field(field)
+    if not django_field.is_relation:
+        return FieldPlan(field, django_field, PLAIN, field, attrgetter(field))
+
+    related_model = django_field.related_model
+    pk_name = related_model._meta.pk.name
+    if django_field.many_to_one:
+        # Read the foreign key column rather than loading the related object.
+        read = attrgetter(django_field.attname)
+        return FieldPlan(field, django_field, FOREIGN_KEY, django_field.attname, read, related_model, pk_name)
+
+    kind = MANY_TO_MANY if django_field.many_to_many else REVERSE
+    accessor = related_accessor_name(django_field)
+    read = read_related_pks(accessor, pk_name)
+    return FieldPlan(field, django_field, kind, field, read, related_model, pk_name, accessor)
+
+
+def compile_field_plans(django_model, fields) -> Tuple[FieldPlan, ...]:
+    return tuple(compile_field_plan(django_model, field) for field in fields)
+
+
+def plan_names(field_plans):
+    if field_plans is None:
+        return None
+    return tuple(plan.name for plan in field_plans)
+
+
+def plans_to_dict(field_plans, instance):
+    return {plan.name: plan.read(instance) for plan in field_plans}
+
+
+class ValuesSerializer:
+    """
+    Serialize rows straight from values_list() tuples, without creating model or schema instances.
+
+    Related fields are fetched as arrays of primary keys by a subquery per relation.
+    """
+
+    def __init__(self, field_plans):
+        self.columns = []
+        self.related_columns = []
+        self.annotations = {}
+
+        for plan in field_plans:
+            if plan.kind in (PLAIN, FOREIGN_KEY):
+                self.columns.append((plan.name, plan.column))
+            else:
+                annotation = f"{plan.name}_pks"
+                lookup = related_query_name(plan.django_field)
+                related_pks = plan.related_model.objects.filter(**{lookup: OuterRef("pk")}).values("pk")
+                self.annotations[annotation] = ArraySubquery(related_pks)
+                self.related_columns.append((plan.name, annotation, plan.pk_name))
+
+    def values_list(self, queryset, extra_columns=()):
+        """
+        Convert a queryset to one returning named tuples with the columns needed by to_dict.
+        """
+        columns = [column for _, column in self.columns]
+        for column in extra_columns:
+            if column not in columns:
+                columns.append(column)
+        return (
+            queryset.prefetch_related(None)
+            .annotate(**self.annotations)
+            .values_list(*columns, *self.annotations, named=True)
+        )
+
+    def to_dict(self, row):
+        data = {field: getattr(row, column) for field, column in self.columns}
+        for field, annotation, pk_name in self.related_columns:
+            data[field] = [{pk_name: pk} for pk in getattr(row, annotation)]
+        return data
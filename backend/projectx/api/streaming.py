@@ -0,0 +1,58 @@
+NDJSON = "ndjson"
+JSON = "json"
+
+MEDIA_TYPES = {
+    NDJSON: "application/x-ndjson",
+    JSON: "application/json",
+}
+
+
+def stream_ndjson(rows, to_json):
+    """
+    Yield each row as a single line of JSON.
+    """
+    for row in rows:
+        yield to_json(row) + "\n"
+
+
+def stream_json(rows, to_json):
+    """
+    Yield the rows as a JSON list object, one row at a time.
+    """
+    yield '{"items": ['
+    separator = ""
+    for row in rows:
+        yield separator + to_json(row)
+        separator = ", "
+    yield "]}"
+
+
+async def astream_ndjson(rows, to_json):
+    """
+    Yield each row from an async iterator as a single line of JSON.
+    """
+    async for row in rows:
+        yield to_json(row) + "\n"
+
+
+async def astream_json(rows, to_json):
+    """
+    Yield the rows from an async iterator as a JSON list object, one row at a time.
+    """
+    yield '{"items": ['
+    separator = ""
+    async for row in rows:
+        yield separator + to_json(row)
+        separator = ", "
+    yield "]}"
+
+
+STREAMS = {
+    NDJSON: stream_ndjson,
+    JSON: stream_json,
+}
+
+ASYNC_STREAMS = {
+    NDJSON: astream_ndjson,
+    JSON: astream_json,
+}
@@ -50,31 +50,45 @@ def create_access_token(data: dict, expires_delta: timedelta):
     return encoded_jwt
 
 
-def get_current_user_func(get_user):
-    def inner(token: str = Depends(oauth2_scheme)):
-        try:
-            payload = jwt.decode(token, JWT_SECRET, algorithms=[ALGORITHM])
-            username: str = payload.get("sub")
-            if not username:
-                raise HTTPException(
-                    status_code=status.HTTP_401_UNAUTHORIZED,
-                    detail="Could not validate credentials - empty username",
-                    headers={"WWW-Authenticate": "Bearer"},
-                )
-        except JWTError as jwt_error:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Could not validate credentials - bad token",
-                headers={"WWW-Authenticate": "Bearer"},
-            ) from jwt_error
-        user = get_user(username=username)
-        if user is None:
+def username_from_token(token):
+    try:
+        payload = jwt.decode(token, JWT_SECRET, algorithms=[ALGORITHM])
+        username: str = payload.get("sub")
+        if not username:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Could not validate credentials - no such user",
+                detail="Could not validate credentials - empty username",
                 headers={"WWW-Authenticate": "Bearer"},
             )
-        return user
+    except JWTError as jwt_error:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials - bad token",
+            headers={"WWW-Authenticate": "Bearer"},
+        ) from jwt_error
+    return username
+
+
+def check_user(user):
+    if user is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials - no such user",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return user
+
+
+def get_current_user_func(get_user):
+    def inner(token: str = Depends(oauth2_scheme)):
+        return check_user(get_user(username=username_from_token(token)))
+
+    return inner
+
+
+def get_current_user_async_func(aget_user):
+    async def inner(token: str = Depends(oauth2_scheme)):
+        return check_user(await aget_user(username=username_from_token(token)))
 
     return inner
 
@@ -94,6 +108,14 @@ def get_user_authentication():
     return get_current_user_func(get_user_func)
 
 
+def get_async_user_authentication():
+    async def aget_user_func(username: str):
+        User = get_user_model()  # pylint: disable=invalid-name
+        return await User.objects.filter(username=username).afirst()
+
+    return get_current_user_async_func(aget_user_func)
+
+
 class UsersConfig(AppConfig):
     name = "projectx.users"
 
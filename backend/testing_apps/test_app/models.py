@@ -2,11 +2,13 @@ import uuid
 
 from django.contrib.auth import get_user_model
 from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.core.exceptions import ValidationError
 from django.db import models
 
 from projectx.common.fields import JSONDefaultField
-from projectx.common.models import UUIDModel
+from projectx.common.models import IndexedTimeStampedModel, UUIDModel
 
 
 class SimpleModel(models.Model):
@@ -24,6 +26,9 @@ class SimpleModelWithArray(models.Model):
     name = models.CharField(max_length=50)
     an_array = ArrayField(models.CharField(max_length=10), blank=True, null=True)
 
+    class Meta:
+        indexes = [GinIndex(fields=["an_array"]), models.Index(fields=["-name"])]
+
     def __str__(self):
         return str(self.name)
 
@@ -79,6 +84,22 @@ class GoodJSONModel(models.Model):
         return str(self.data)
 
 
+class NullableJSONModel(models.Model):
+    uuid = models.UUIDField(default=uuid.uuid4, editable=False, unique=True)
+    data = JSONDefaultField(default=dict, null=True, blank=True)
+
+    def __str__(self):
+        return str(self.data)
+
+
+class SizedArrayModel(models.Model):
+    uuid = models.UUIDField(default=uuid.uuid4, editable=False, unique=True)
+    an_array = ArrayField(models.CharField(max_length=10), size=2, default=list, blank=True)
+
+    def __str__(self):
+        return str(self.an_array)
+
+
 def validate_not_greater_than_1(value):
     if value > 1:
         raise ValidationError(
@@ -161,3 +182,94 @@ class Pizza(models.Model):
 
     def __str__(self):
         return str(self.name)
+
+
+class Ingredient(models.Model):
+    uuid = models.UUIDField(default=uuid.uuid4, editable=False, unique=True)
+    name = models.CharField(max_length=50)
+    last_updated = models.DateTimeField(auto_now=True, editable=False)
+
+    def __str__(self):
+        return str(self.name)
+
+
+class Recipe(models.Model):
+    uuid = models.UUIDField(default=uuid.uuid4, editable=False, unique=True)
+    name = models.CharField(max_length=50)
+    last_updated = models.DateTimeField(auto_now=True, editable=False)
+    ingredients = models.ManyToManyField(Ingredient, blank=True, related_name="recipes")
+    toppings = models.ManyToManyField(Topping, blank=True, related_name="+")
+
+    def __str__(self):
+        return str(self.name)
+
+
+class Step(models.Model):
+    uuid = models.UUIDField(default=uuid.uuid4, editable=False, unique=True)
+    name = models.CharField(max_length=50)
+    last_updated = models.DateTimeField(auto_now=True, editable=False)
+    recipe = models.ForeignKey(Recipe, on_delete=models.CASCADE, related_name="steps")
+
+    def __str__(self):
+        return str(self.name)
+
+
+class SimpleTimeStampedModel(IndexedTimeStampedModel):
+    uuid = models.UUIDField(default=uuid.uuid4, editable=False, unique=True)
+    name = models.CharField(max_length=50)
+
+    def __str__(self):
+        return str(self.name)
+
+
+class WideModel(models.Model):
+    external_uuid = models.UUIDField(default=uuid.uuid4)
+    uuid = models.UUIDField(default=uuid.uuid4, editable=False, unique=True)
+    name = models.CharField(max_length=50)
+    title = models.CharField(max_length=50, default="title")
+    description = models.CharField(max_length=250, default="description")
+    status = models.CharField(max_length=20, default="status")
+    category = models.CharField(max_length=50, default="category")
+    code = models.CharField(max_length=20, default="code")
+    colour = models.CharField(max_length=20, default="colour")
+    size = models.CharField(max_length=20, default="size")
+    count = models.IntegerField(default=1)
+    position = models.IntegerField(default=2)
+    priority = models.IntegerField(default=3)
+    width = models.IntegerField(default=4)
+    height = models.IntegerField(default=5)
+    depth = models.IntegerField(default=6)
+    enabled = models.BooleanField(default=True)
+    created = models.DateTimeField(auto_now_add=True)
+    last_updated = models.DateTimeField(auto_now=True)
+    config = JSONDefaultField(default=dict)
+
+    def __str__(self):
+        return str(self.name)
+
+
+class UniqueModel(models.Model):
+    uuid = models.UUIDField(default=uuid.uuid4, editable=False, unique=True)
+    code = models.CharField(max_length=20, unique=True)
+    name = models.CharField(max_length=50)
+    group = models.CharField(max_length=20)
+
+    class Meta:
+        unique_together = [("name", "group")]
+
+    def __str__(self):
+        return str(self.name)
+
+
+class SearchableModel(models.Model):
+    uuid = models.UUIDField(default=uuid.uuid4, editable=False, unique=True)
+    name = models.CharField(max_length=50)
+    description = models.TextField(blank=True, default="")
+    last_updated = models.DateTimeField(auto_now=True, editable=False)
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    class Meta:
+        indexes = [GinIndex(fields=["search_vector"])]
+
+    def __str__(self):
+        return str(self.name)
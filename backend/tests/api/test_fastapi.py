@@ -1,3 +1,5 @@
+import logging
+
 import pytest
 from fastapi import APIRouter
 from fastapi.testclient import TestClient
@@ -5,9 +7,17 @@ from test_app import models
 
 from projectx.api.asgi import application
 from projectx.api.fastapi import (
+    InvalidAggregateException,
     InvalidAuthenticationException,
+    InvalidCacheException,
+    InvalidConditionalException,
     InvalidFieldsException,
+    InvalidFiltersException,
     InvalidIdentifierException,
+    InvalidOrderingException,
+    InvalidPaginationException,
+    InvalidSearchException,
+    InvalidStreamingException,
     RouteBuilder,
 )
 
@@ -60,6 +70,13 @@ def test_route_builder_bad_identifier_field():
     assert str(invalid_ex.value) == "BAD_FIELD not in ['id', 'uuid', 'name', 'last_updated', 'created', 'config']."
 
 
+def test_route_builder_upsert_with_non_unique_identifier():
+    with pytest.raises(InvalidIdentifierException) as invalid_ex:
+        RouteBuilder(models.WideModel, config={"identifier": "external_uuid", "upsert": {}})
+
+    assert str(invalid_ex.value) == "external_uuid must be unique to upsert WideModels."
+
+
 def test_route_builder_owner_field_but_no_auth():
     with pytest.raises(InvalidAuthenticationException) as invalid_ex:
         RouteBuilder(models.SimpleModel, owner_field="user_field")
@@ -72,3 +89,176 @@ def test_route_builder_invalid_fields():
         RouteBuilder(models.SimpleModel, request_fields=["invalid"])
 
     assert str(invalid_ex.value) == "['invalid'] not in ['config', 'created', 'id', 'last_updated', 'name', 'uuid']"
+
+
+def test_route_builder_invalid_pagination_field():
+    with pytest.raises(InvalidPaginationException) as invalid_ex:
+        RouteBuilder(models.SimpleModel, config={"pagination": {"ordering": "-invalid"}})
+
+    assert str(invalid_ex.value) == "Ordering field invalid not in SimpleModel."
+
+
+@pytest.mark.parametrize(
+    "model, ordering, identifier",
+    [
+        (models.SimpleModelWithArray, "an_array", "id"),
+        (models.Question, "choices", "uuid"),
+        (models.Pizza, "toppings", "uuid"),
+    ],
+)
+def test_route_builder_unsupported_pagination_field(model, ordering, identifier):
+    with pytest.raises(InvalidPaginationException) as invalid_ex:
+        RouteBuilder(model, config={"identifier": identifier, "pagination": {"ordering": ordering}})
+
+    assert str(invalid_ex.value) == f"Ordering field {ordering} must be a concrete, non null, single valued field."
+
+
+def test_route_builder_streaming_with_pagination():
+    with pytest.raises(InvalidStreamingException) as invalid_ex:
+        RouteBuilder(models.SimpleModel, config={"pagination": {}, "streaming": {}})
+
+    assert str(invalid_ex.value) == "Streaming can not be used with pagination."
+
+
+def test_route_builder_invalid_streaming_format():
+    with pytest.raises(InvalidStreamingException) as invalid_ex:
+        RouteBuilder(models.SimpleModel, config={"streaming": {"format": "xml"}})
+
+    assert str(invalid_ex.value) == "Streaming format xml not in ['json', 'ndjson']."
+
+
+def test_route_builder_cache_with_streaming():
+    with pytest.raises(InvalidCacheException) as invalid_ex:
+        RouteBuilder(models.SimpleModel, config={"cache": {}, "streaming": {}})
+
+    assert str(invalid_ex.value) == "Caching can not be used with streaming."
+
+
+@pytest.mark.parametrize(
+    "model, conditional, message",
+    [
+        (models.SimpleIDModel, {}, "SimpleIDModel has no auto_now field, set the conditional field."),
+        (models.SimpleModel, {"field": "missing"}, "Conditional field missing not in SimpleModel."),
+        (models.SimpleModel, {"field": "name"}, "Conditional field name must be a DateTimeField."),
+    ],
+)
+def test_route_builder_invalid_conditional_field(model, conditional, message):
+    with pytest.raises(InvalidConditionalException) as invalid_ex:
+        RouteBuilder(model, config={"conditional": conditional})
+
+    assert str(invalid_ex.value) == message
+
+
+def test_route_builder_conditional_related_without_modified_field():
+    with pytest.raises(InvalidConditionalException) as invalid_ex:
+        RouteBuilder(models.Recipe, response_fields=["name", "toppings"], config={"conditional": {}})
+
+    assert str(invalid_ex.value) == "Topping has no auto_now field, so toppings can not be conditional."
+
+
+@pytest.mark.parametrize(
+    "model, filters, message",
+    [
+        (models.SimpleModel, {"missing": ["exact"]}, "Filter field missing not in SimpleModel."),
+        (models.SimpleModel, {"config": ["exact"]}, "Filter field config must be a concrete, non JSON, field."),
+        (models.Pizza, {"toppings": ["exact"]}, "Filter field toppings must be a concrete, non JSON, field."),
+        (models.Question, {"choices": ["exact"]}, "Filter field choices must be a concrete, non JSON, field."),
+        (
+            models.SimpleModel,
+            {"uuid": ["exact", "like"]},
+            "Filter lookups ['like'] of uuid not in ['exact', 'in', 'gte', 'lte', 'contains', 'isnull'].",
+        ),
+        (
+            models.SimpleModel,
+            {"uuid": []},
+            "Filter lookups [] of uuid not in ['exact', 'in', 'gte', 'lte', 'contains', 'isnull'].",
+        ),
+        (
+            models.SimpleModelWithArray,
+            {"an_array": ["in"]},
+            "Filter lookups ['in'] of an_array not in ['contains', 'isnull'].",
+        ),
+        (models.SimpleModelWithArray, {"an_array": ["isnull"]}, "Filter an_array__isnull needs an index on an_array."),
+        (models.SimpleModel, {"name": ["exact"]}, "Filter name__exact needs an index on name."),
+        (models.SimpleModel, {"uuid": ["contains"]}, "Filter uuid__contains needs a GinIndex on uuid."),
+    ],
+)
+def test_route_builder_invalid_filters(model, filters, message):
+    with pytest.raises(InvalidFiltersException) as invalid_ex:
+        RouteBuilder(model, config={"identifier": model._meta.pk.name, "filters": filters})
+
+    assert str(invalid_ex.value) == message
+
+
+@pytest.mark.parametrize(
+    "config, message",
+    [
+        ({"ordering": {"fields": ["missing"]}}, "Ordering field missing not in SimpleModel."),
+        ({"ordering": {"fields": ["uuid"], "default": "-name"}}, "Default ordering -name not in ['uuid']."),
+        ({"ordering": {}, "pagination": {}}, "Ordering can not be used with pagination."),
+    ],
+)
+def test_route_builder_invalid_ordering(config, message):
+    with pytest.raises(InvalidOrderingException) as invalid_ex:
+        RouteBuilder(models.SimpleModel, config=config)
+
+    assert str(invalid_ex.value) == message
+
+
+def test_route_builder_ordering_many_to_many():
+    with pytest.raises(InvalidOrderingException) as invalid_ex:
+        RouteBuilder(models.Pizza, config={"identifier": "uuid", "ordering": {"fields": ["toppings"]}})
+
+    assert str(invalid_ex.value) == "Ordering field toppings must be a concrete field."
+
+
+def test_route_builder_ordering_without_index(caplog):
+    with caplog.at_level(logging.WARNING, logger="projectx.api.fastapi"):
+        RouteBuilder(models.SimpleTimeStampedModel, config={"ordering": {"fields": ["created", "name"]}})
+
+    assert caplog.messages == ["Ordering SimpleTimeStampedModels by name can not use an index, so sorts every row."]
+
+
+@pytest.mark.parametrize(
+    "aggregate, message",
+    [
+        ({"fields": {"missing": ["max"]}}, "Aggregate field missing not in WideModel."),
+        ({"fields": {"count": ["avg"]}}, "Aggregate functions ['avg'] of count not in ['sum', 'min', 'max']."),
+        ({"fields": {"count": []}}, "Aggregate functions [] of count not in ['sum', 'min', 'max']."),
+        ({"fields": {"name": ["sum"]}}, "Aggregate name__sum needs a numeric field."),
+        ({"group_by": ["missing"]}, "Aggregate field missing not in WideModel."),
+        ({"group_by": ["count"]}, "Group by field count clashes with the row count."),
+        ({"estimate_threshold": 0}, "Estimate threshold 0 must be a positive integer."),
+        ({"estimate_threshold": "many"}, "Estimate threshold many must be a positive integer."),
+    ],
+)
+def test_route_builder_invalid_aggregate(aggregate, message):
+    with pytest.raises(InvalidAggregateException) as invalid_ex:
+        RouteBuilder(models.WideModel, config={"aggregate": aggregate})
+
+    assert str(invalid_ex.value) == message
+
+
+@pytest.mark.parametrize(
+    "model, search, message",
+    [
+        (models.SearchableModel, {"vector": "missing"}, "Search vector missing not in SearchableModel."),
+        (models.SimpleModelWithArray, {"vector": "name"}, "Search vector name needs a GinIndex."),
+        (models.SimpleModelWithArray, {"vector": "an_array"}, "Search vector an_array must be a SearchVectorField."),
+        (models.SearchableModel, {}, "Search fields of search_vector must be given."),
+        (models.SearchableModel, {"fields": ["missing"]}, "Search field missing not in SearchableModel."),
+        (models.SearchableModel, {"fields": ["last_updated"]}, "Search field last_updated must be a text field."),
+    ],
+)
+def test_route_builder_invalid_search(model, search, message):
+    with pytest.raises(InvalidSearchException) as invalid_ex:
+        RouteBuilder(model, config={"search": search})
+
+    assert str(invalid_ex.value) == message
+
+
+def test_route_builder_aggregate_many_to_many():
+    with pytest.raises(InvalidAggregateException) as invalid_ex:
+        RouteBuilder(models.Pizza, config={"identifier": "uuid", "aggregate": {"group_by": ["toppings"]}})
+
+    assert str(invalid_ex.value) == "Aggregate field toppings must be a concrete field."
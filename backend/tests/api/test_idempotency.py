@@ -0,0 +1,71 @@
+import asyncio
+import threading
+import time
+
+import pytest
+from django.core.cache import caches
+from test_app.models import SimpleModel
+
+from projectx.api.fastapi import RouteBuilder
+from projectx.api.idempotency import IdempotencyStore, fingerprint
+
+
+@pytest.fixture(name="store")
+def store_fixture(settings):
+    settings.CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+    yield IdempotencyStore("models", lock_timeout=5)
+    caches["default"].clear()
+
+
+@pytest.fixture(name="payload")
+def payload_fixture():
+    return RouteBuilder(SimpleModel).new_instance_schema(name="name")
+
+
+def test_waits_for_the_request_holding_the_lock(store, payload, mocker):
+    key = store.key("post", None, "key")
+    store.cache.add(f"{key}:lock", 1)
+    blocked = threading.Event()
+    sleep = time.sleep
+
+    def wait(seconds):
+        blocked.set()
+        sleep(seconds)
+
+    mocker.patch("projectx.api.idempotency.time.sleep", side_effect=wait)
+    responses = []
+    waiting = threading.Thread(target=lambda: responses.append(store.fetch(key, fingerprint(payload), payload.json)))
+    waiting.start()
+    assert blocked.wait(timeout=5)
+
+    # The request holding the lock stores its response and releases the lock while the other one waits for it.
+    store.cache.set(key, (fingerprint(payload), 200, b'{"name": "first"}'))
+    store.cache.delete(f"{key}:lock")
+    waiting.join()
+
+    assert responses[0].body == b'{"name": "first"}'
+    assert responses[0].headers["Idempotent-Replayed"] == "true"
+
+
+def test_async_waits_for_the_request_holding_the_lock(store, payload):
+    key = store.key("post", None, "key")
+    store.cache.add(f"{key}:lock", 1)
+
+    async def respond():
+        return payload
+
+    async def first_request():
+        await asyncio.sleep(0.1)
+        await store.cache.aset(key, (fingerprint(payload), 200, b'{"name": "first"}'))
+        await store.cache.adelete(f"{key}:lock")
+
+    async def requests():
+        return await asyncio.gather(store.afetch(key, fingerprint(payload), respond), first_request())
+
+    response, _ = asyncio.run(requests())
+    assert response.body == b'{"name": "first"}'
+
+
+def test_fingerprint(payload):
+    assert fingerprint(payload) == fingerprint([payload])
+    assert fingerprint([payload]) != fingerprint([payload, payload])
@@ -0,0 +1,30 @@
+import datetime
+import decimal
+import uuid
+
+import pytest
+
+from projectx.api.serialization import dumps
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [
+        (datetime.datetime(2020, 1, 2, 3, 4, 5, 6), b'"2020-01-02T03:04:05.000006"'),
+        (datetime.date(2020, 1, 2), b'"2020-01-02"'),
+        (datetime.time(3, 4, 5), b'"03:04:05"'),
+        (uuid.UUID("ab1c1b5b-d8e3-4b8d-8c8b-1b1b1b1b1b1b"), b'"ab1c1b5b-d8e3-4b8d-8c8b-1b1b1b1b1b1b"'),
+        (decimal.Decimal("1.5"), b"1.5"),
+        (datetime.timedelta(minutes=1), b"60.0"),
+        ({"key": [1, None]}, b'{"key":[1,null]}'),
+    ],
+)
+def test_dumps(value, expected):
+    assert dumps(value) == expected
+
+
+def test_dumps_unsupported_type():
+    with pytest.raises(TypeError) as type_error:
+        dumps(object())
+
+    assert str(type_error.value) == "Object of type object is not JSON serializable"
@@ -0,0 +1,61 @@
+"""
+Micro-benchmark of the per row cost of serializing a 20 field model.
+
+Run with `make benchmark` to see the timings.
+"""
+import timeit
+import uuid
+
+import pytest
+from django.utils import timezone
+from test_app.models import WideModel
+
+from projectx.api.fastapi import RouteBuilder
+
+ROWS = 2000
+
+pytestmark = pytest.mark.benchmark
+
+
+def field_data_with_meta_lookups(django_model, fields, instance):
+    """
+    How field data was read before field plans, looking up and branching on each field for every row.
+    """
+    field_data = {}
+    for field in fields:
+        django_field = django_model._meta.get_field(field)
+        if django_field.is_relation:
+            if django_field.many_to_one:
+                field_data[field] = getattr(instance, field).pk
+            else:
+                field_data[field] = [related.pk for related in getattr(instance, field).all()]
+        else:
+            field_data[field] = getattr(instance, field)
+    return field_data
+
+
+def field_data_with_plans(field_plans, instance):
+    return {plan.name: plan.read(instance) for plan in field_plans}
+
+
+def per_row_microseconds(function):
+    return min(timeit.repeat(function, number=ROWS, repeat=5)) / ROWS * 1_000_000
+
+
+def test_field_plans_benchmark():
+    route_builder = RouteBuilder(WideModel, config={"identifier": "uuid"})
+    schema = route_builder.instance_schema
+    fields = [plan.name for plan in schema.field_plans]
+    instance = WideModel(uuid=uuid.uuid4(), name="name", created=timezone.now(), last_updated=timezone.now())
+
+    assert len(fields) == 20
+    assert field_data_with_plans(schema.field_plans, instance) == field_data_with_meta_lookups(
+        WideModel, fields, instance
+    )
+
+    before = per_row_microseconds(lambda: field_data_with_meta_lookups(WideModel, fields, instance))
+    after = per_row_microseconds(lambda: field_data_with_plans(schema.field_plans, instance))
+    from_model = per_row_microseconds(lambda: schema.from_model(instance))
+
+    print(f"\nReading {len(fields)} fields per row: {before:.2f}us with _meta lookups, {after:.2f}us with field plans")
+    print(f"Full from_model per row: {from_model:.2f}us")
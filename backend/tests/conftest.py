@@ -1,5 +1,6 @@
 import pytest
 from fastapi import APIRouter, FastAPI
+from fastapi.testclient import TestClient
 
 
 @pytest.fixture()
@@ -10,3 +11,12 @@ def app():
 @pytest.fixture()
 def router():
     return APIRouter()
+
+
+@pytest.fixture(name="client")
+def get_client(app, router, route_builders):  # pylint: disable=redefined-outer-name
+    # Modules declare their RouteBuilders in a route_builders fixture, and the client serves all of their routes.
+    for route_builder in route_builders.values():
+        route_builder.add_all_routes(router)
+    app.include_router(router)
+    return TestClient(app)
@@ -0,0 +1,238 @@
+import asyncio
+from datetime import timedelta
+from uuid import UUID
+
+import pytest
+from fastapi.testclient import TestClient
+from test_app.models import (
+    Pizza,
+    SimpleIDModel,
+    SimpleJWTModel,
+    SimpleModel,
+    SimpleTimeStampedModel,
+    Topping,
+)
+
+from projectx.api.fastapi import RouteBuilder, acheck_api_key
+from projectx.users.apps import create_access_token, get_async_user_authentication
+from projectx.users.models import ApiKey, User
+
+PIZZA_PATH = "/pizzas/"
+STREAMED_PIZZA_PATH = "/streamedpizzas/"
+STREAMED_MODEL_PATH = "/streamedmodels/"
+JSON_STREAMED_MODEL_PATH = "/jsonstreamedmodels/"
+ID_PATH = "/simpleidmodels/"
+TIMESTAMPED_PATH = "/simpletimestampedmodels/"
+API_KEY_PATH = "/simplemodels/"
+JWT_PATH = "/simplejwtmodels/"
+
+
+@pytest.mark.django_db(transaction=True)
+@pytest.fixture(name="client")
+def get_client(app, router):
+    uuid_config = {"identifier": "uuid", "identifier_class": UUID, "async": True}
+    RouteBuilder(Pizza, config=uuid_config).add_all_routes(router)
+    RouteBuilder(
+        Pizza, config={**uuid_config, "name": "StreamedPizza", "streaming": {"format": "json"}}
+    ).add_list_route_to_router(router)
+    RouteBuilder(
+        SimpleModel,
+        response_fields=["name"],
+        config={**uuid_config, "name": "StreamedModel", "streaming": {}, "fast_serialization": True},
+    ).add_list_route_to_router(router)
+    RouteBuilder(
+        SimpleModel,
+        response_fields=["name"],
+        config={
+            **uuid_config,
+            "name": "JSONStreamedModel",
+            "streaming": {"format": "json"},
+            "fast_serialization": True,
+        },
+    ).add_list_route_to_router(router)
+    RouteBuilder(
+        SimpleIDModel, response_fields=["name"], config={"async": True, "pagination": {"page_size": 2}}
+    ).add_all_routes(router)
+    RouteBuilder(
+        SimpleTimeStampedModel,
+        request_fields=["name"],
+        response_fields=["name", "uuid"],
+        config={**uuid_config, "pagination": {"page_size": 2}, "fast_serialization": True},
+    ).add_all_routes(router)
+    RouteBuilder(
+        SimpleModel, response_fields=["name"], config=uuid_config, authentication=acheck_api_key
+    ).add_all_routes(router)
+    RouteBuilder(
+        SimpleJWTModel,
+        request_fields=["name"],
+        response_fields=["name"],
+        config=uuid_config,
+        authentication=get_async_user_authentication(),
+    ).add_all_routes(router)
+    app.include_router(router)
+    return TestClient(app)
+
+
+@pytest.mark.django_db(transaction=True)
+@pytest.fixture(name="toppings")
+def create_toppings():
+    return [Topping.objects.create(name=f"topping{i}") for i in range(2)]
+
+
+@pytest.mark.django_db(transaction=True)
+def test_async_create_list_update_get_and_delete(client, toppings, mocker):
+    topping, topping2 = toppings
+    response = client.post(PIZZA_PATH, json={"name": "name", "toppings": [{"uuid": str(topping.pk)}]})
+    assert response.status_code == 200, response.content.decode("utf-8")
+    assert response.json() == {"uuid": mocker.ANY, "name": "name", "toppings": [{"uuid": str(topping.pk)}]}
+
+    uuid = response.json()["uuid"]
+
+    response = client.get(PIZZA_PATH)
+    assert response.status_code == 200, response.content.decode("utf-8")
+    assert response.json() == {"items": [{"uuid": uuid, "name": "name", "toppings": [{"uuid": str(topping.pk)}]}]}
+
+    response = client.get(f"{PIZZA_PATH}{uuid}/")
+    assert response.status_code == 200, response.content.decode("utf-8")
+    assert response.json() == {"uuid": uuid, "name": "name", "toppings": [{"uuid": str(topping.pk)}]}
+
+    response = client.put(f"{PIZZA_PATH}{uuid}/", json={"name": "name2", "toppings": [{"uuid": str(topping2.pk)}]})
+    assert response.status_code == 200, response.content.decode("utf-8")
+    assert response.json() == {"uuid": uuid, "name": "name2", "toppings": [{"uuid": str(topping2.pk)}]}
+
+    response = client.patch(f"{PIZZA_PATH}{uuid}/", json={"name": "name3"})
+    assert response.status_code == 200, response.content.decode("utf-8")
+    assert response.json() == {"uuid": uuid, "name": "name3", "toppings": [{"uuid": str(topping2.pk)}]}
+
+    response = client.delete(f"{PIZZA_PATH}{uuid}/")
+    assert response.status_code == 200, response.content.decode("utf-8")
+    assert response.json() == {"uuid": uuid, "name": "name3", "toppings": [{"uuid": str(topping2.pk)}]}
+    assert not Pizza.objects.exists()
+
+    response = client.get(f"{PIZZA_PATH}{uuid}/")
+    assert response.status_code == 404, response.content.decode("utf-8")
+    assert response.json() == {"detail": f"Object {uuid} not found."}
+
+
+@pytest.mark.django_db(transaction=True)
+def test_async_sparse_fields(client, toppings):
+    pizza = Pizza.objects.create(name="name")
+    pizza.toppings.set(toppings)
+
+    response = client.get(PIZZA_PATH, params={"fields": "name"})
+    assert response.status_code == 200, response.content.decode("utf-8")
+    assert response.json() == {"items": [{"name": "name"}]}
+
+    response = client.get(f"{PIZZA_PATH}{pizza.uuid}/", params={"fields": "toppings"})
+    assert response.status_code == 200, response.content.decode("utf-8")
+    assert sorted(topping["uuid"] for topping in response.json()["toppings"]) == sorted(
+        str(topping.pk) for topping in toppings
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+def test_async_streaming(client, toppings):
+    pizza = Pizza.objects.create(name="pizza")
+    pizza.toppings.set(toppings[:1])
+    SimpleModel.objects.create(name="name0")
+    SimpleModel.objects.create(name="name1")
+
+    response = client.get(STREAMED_PIZZA_PATH)
+    assert response.status_code == 200, response.content.decode("utf-8")
+    assert response.json() == {
+        "items": [{"uuid": str(pizza.pk), "name": "pizza", "toppings": [{"uuid": str(toppings[0].pk)}]}]
+    }
+
+    response = client.get(STREAMED_MODEL_PATH)
+    assert response.status_code == 200, response.content.decode("utf-8")
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert response.content.decode("utf-8").splitlines() == ['{"name":"name0"}', '{"name":"name1"}']
+
+    response = client.get(JSON_STREAMED_MODEL_PATH)
+    assert response.status_code == 200, response.content.decode("utf-8")
+    assert response.json() == {"items": [{"name": "name0"}, {"name": "name1"}]}
+
+
+@pytest.mark.django_db(transaction=True)
+def test_async_pagination(client):
+    for i in range(3):
+        SimpleIDModel.objects.create(name=f"name{i}")
+
+    response = client.get(ID_PATH)
+    assert response.status_code == 200, response.content.decode("utf-8")
+    assert response.json()["items"] == [{"name": "name0"}, {"name": "name1"}]
+
+    response = client.get(ID_PATH, params={"cursor": response.json()["next"]})
+    assert response.status_code == 200, response.content.decode("utf-8")
+    assert response.json() == {"items": [{"name": "name2"}], "next": None}
+
+    response = client.get(ID_PATH, params={"cursor": "not-base64!"})
+    assert response.status_code == 400, response.content.decode("utf-8")
+    assert response.json() == {"detail": "Invalid cursor."}
+
+
+@pytest.mark.django_db(transaction=True)
+def test_async_fast_serialization(client):
+    instances = [SimpleTimeStampedModel.objects.create(name=f"name{i}") for i in range(3)]
+
+    response = client.get(TIMESTAMPED_PATH)
+    assert response.status_code == 200, response.content.decode("utf-8")
+    assert response.json()["items"] == [
+        {"name": "name0", "uuid": str(instances[0].uuid)},
+        {"name": "name1", "uuid": str(instances[1].uuid)},
+    ]
+
+    response = client.get(TIMESTAMPED_PATH, params={"cursor": response.json()["next"], "fields": "name"})
+    assert response.status_code == 200, response.content.decode("utf-8")
+    assert response.json() == {"items": [{"name": "name2"}], "next": None}
+
+    response = client.get(f"{TIMESTAMPED_PATH}{instances[0].uuid}/")
+    assert response.status_code == 200, response.content.decode("utf-8")
+    assert response.json() == {"name": "name0", "uuid": str(instances[0].uuid)}
+
+    instances[0].delete()
+    response = client.get(f"{TIMESTAMPED_PATH}{instances[0].uuid}/")
+    assert response.status_code == 404, response.content.decode("utf-8")
+    assert response.json() == {"detail": f"Object {instances[0].uuid} not found."}
+
+
+@pytest.mark.django_db(transaction=True)
+def test_async_api_key(client):
+    user = User.objects.create_user(email="apikeyuser@tempurl.com", first_name="API", last_name="Test User")
+    api_key = ApiKey.objects.create(user=user, key="api_key")
+
+    response = client.post(API_KEY_PATH, headers={"X-API-Key": api_key.key}, json={"name": "name"})
+    assert response.status_code == 200, response.content.decode("utf-8")
+    assert response.json() == {"name": "name"}
+
+    response = client.get(API_KEY_PATH, headers={"X-API-Key": "BAD_API_KEY"})
+    assert response.status_code == 400, response.content.decode("utf-8")
+    assert response.json() == {"detail": "X-API-Key header invalid."}
+
+
+@pytest.mark.django_db(transaction=True)
+def test_async_jwt_user(client):
+    user = User.objects.create_user(email="jwt_user@tempurl.com", first_name="JWT", last_name="Test User")
+    token = create_access_token({"sub": user.username}, timedelta(minutes=30))
+
+    response = client.post(JWT_PATH, headers={"Authorization": f"Bearer {token}"}, json={"name": "name"})
+    assert response.status_code == 200, response.content.decode("utf-8")
+    assert response.json() == {"name": "name"}
+
+    token = create_access_token({"sub": "unknown"}, timedelta(minutes=30))
+    response = client.get(JWT_PATH, headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 401, response.content.decode("utf-8")
+    assert response.json() == {"detail": "Could not validate credentials - no such user"}
+
+
+@pytest.mark.django_db(transaction=True)
+def test_async_get_function(toppings, django_assert_num_queries):
+    pizza = Pizza.objects.create(name="pizza")
+    pizza.toppings.set(toppings)
+    route_builder = RouteBuilder(Pizza, config={"identifier": "uuid", "identifier_class": UUID, "async": True})
+
+    instance = asyncio.run(route_builder.get_function(identifier=pizza.uuid, user=None))
+    assert instance == pizza
+    # The related objects are prefetched, so they can be read without querying from async code.
+    with django_assert_num_queries(0):
+        assert len(route_builder.instance_schema.from_model(instance).toppings) == 2
@@ -0,0 +1,124 @@
+import json
+from uuid import UUID
+
+import pytest
+from django.db.models import Q
+from fastapi.testclient import TestClient
+from test_app import models
+
+from projectx.api.fastapi import RouteBuilder
+
+UUID_CONFIG = {"identifier": "uuid", "identifier_class": UUID}
+
+
+@pytest.mark.django_db(transaction=True)
+@pytest.fixture(name="client")
+def get_client(app, router):
+    def filter_by_name(_):
+        return Q(name__contains="XXX")
+
+    for model, config in [
+        (models.SimpleModel, UUID_CONFIG),
+        (models.SimpleModelWithArray, {}),
+        (models.Pizza, UUID_CONFIG),
+        (models.Topping, UUID_CONFIG),
+        (models.Question, UUID_CONFIG),
+        (models.Choice, UUID_CONFIG),
+    ]:
+        RouteBuilder(model, config=config).add_all_routes(router)
+        fast_config = {**config, "name": f"Fast{model.__name__}", "fast_serialization": True}
+        RouteBuilder(model, config=fast_config).add_all_routes(router)
+
+    RouteBuilder(
+        models.SimpleModel,
+        response_fields=["name"],
+        query_filter=filter_by_name,
+        config={"name": "Filtered", "fast_serialization": True, "pagination": {"page_size": 2}},
+    ).add_all_routes(router)
+    RouteBuilder(
+        models.SimpleModel,
+        response_fields=["name"],
+        config={"name": "Streamed", "fast_serialization": True, "streaming": {"format": "ndjson"}},
+    ).add_all_routes(router)
+    app.include_router(router)
+    return TestClient(app)
+
+
+def sort_related(data):
+    for item in data.get("items", [data]):
+        for value in item.values():
+            if isinstance(value, list) and value and isinstance(value[0], dict):
+                value.sort(key=lambda related: related["uuid"])
+    return data
+
+
+def assert_same_responses(client, path, fast_path):
+    response = client.get(path)
+    fast_response = client.get(fast_path)
+    assert fast_response.status_code == response.status_code == 200, fast_response.content.decode("utf-8")
+    assert fast_response.headers["content-type"] == "application/json"
+    assert sort_related(fast_response.json()) == sort_related(response.json())
+
+
+@pytest.mark.django_db(transaction=True)
+def test_fast_serialization_plain_fields(client):
+    simple_model = models.SimpleModel.objects.create(name="name", config={"key": ["value"]})
+    models.SimpleModelWithArray.objects.create(name="name", an_array=["a", "b"])
+    models.SimpleModelWithArray.objects.create(name="name")
+
+    assert_same_responses(client, "/simplemodels/", "/fastsimplemodels/")
+    assert_same_responses(client, f"/simplemodels/{simple_model.uuid}/", f"/fastsimplemodels/{simple_model.uuid}/")
+    assert_same_responses(client, "/simplemodelwitharrays/", "/fastsimplemodelwitharrays/")
+
+
+@pytest.mark.django_db(transaction=True)
+def test_fast_serialization_related_fields(client):
+    toppings = [models.Topping.objects.create(name=f"topping{i}") for i in range(2)]
+    pizza = models.Pizza.objects.create(name="pizza")
+    pizza.toppings.set(toppings)
+    models.Pizza.objects.create(name="no toppings")
+    question = models.Question.objects.create(name="question")
+    models.Choice.objects.create(name="choice", question=question)
+
+    for path in ["pizzas", "toppings", "questions", "choices"]:
+        assert_same_responses(client, f"/{path}/", f"/fast{path}/")
+
+    assert_same_responses(client, f"/pizzas/{pizza.uuid}/", f"/fastpizzas/{pizza.uuid}/")
+    assert_same_responses(client, f"/questions/{question.uuid}/", f"/fastquestions/{question.uuid}/")
+
+
+@pytest.mark.django_db(transaction=True)
+def test_fast_serialization_get_not_found(client):
+    response = client.get("/fastsimplemodels/ab1c1b5b-d8e3-4b8d-8c8b-1b1b1b1b1b1b/")
+    assert response.status_code == 404, response.content.decode("utf-8")
+    assert response.json() == {"detail": "Object ab1c1b5b-d8e3-4b8d-8c8b-1b1b1b1b1b1b not found."}
+
+    simple_model = models.SimpleModel.objects.create(name="YYY - filtered out")
+    response = client.get(f"/filtereds/{simple_model.pk}/")
+    assert response.status_code == 404, response.content.decode("utf-8")
+
+
+@pytest.mark.django_db(transaction=True)
+def test_fast_serialization_with_pagination(client):
+    for i in range(3):
+        models.SimpleModel.objects.create(name=f"XXX{i}")
+    models.SimpleModel.objects.create(name="YYY - filtered out")
+
+    response = client.get("/filtereds/")
+    assert response.status_code == 200, response.content.decode("utf-8")
+    assert response.json()["items"] == [{"name": "XXX0"}, {"name": "XXX1"}]
+
+    response = client.get("/filtereds/", params={"cursor": response.json()["next"]})
+    assert response.status_code == 200, response.content.decode("utf-8")
+    assert response.json() == {"items": [{"name": "XXX2"}], "next": None}
+
+
+@pytest.mark.django_db(transaction=True)
+def test_fast_serialization_with_streaming(client):
+    for i in range(3):
+        models.SimpleModel.objects.create(name=f"name{i}")
+
+    response = client.get("/streameds/")
+    assert response.status_code == 200, response.content.decode("utf-8")
+    lines = response.content.decode("utf-8").splitlines()
+    assert sorted(json.loads(line)["name"] for line in lines) == ["name0", "name1", "name2"]
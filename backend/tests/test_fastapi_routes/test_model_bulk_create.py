@@ -0,0 +1,187 @@
+from uuid import UUID, uuid4
+
+import pytest
+from django.db import IntegrityError
+from test_app.models import (
+    Choice,
+    Pizza,
+    Question,
+    SimpleModel,
+    SimpleModelWithOwner,
+    Topping,
+    UniqueModel,
+)
+
+from projectx.api.fastapi import RouteBuilder, check_api_key
+from projectx.users.models import ApiKey, User
+
+PIZZAS_PATH = "/pizzas/bulk/"
+ASYNC_PIZZAS_PATH = "/asyncpizzas/bulk/"
+CHOICES_PATH = "/choices/bulk/"
+SIMPLE_PATH = "/simplemodels/bulk/"
+OWNER_PATH = "/simplemodelwithowners/bulk/"
+UNIQUE_PATH = "/uniquemodels/bulk/"
+
+
+@pytest.fixture(name="route_builders")
+def get_route_builders():
+    config = {"identifier": "uuid", "identifier_class": UUID, "bulk": {"batch_size": 2}}
+    return {
+        "pizza": RouteBuilder(Pizza, config=config),
+        "async_pizza": RouteBuilder(Pizza, config={**config, "name": "AsyncPizza", "async": True}),
+        "choice": RouteBuilder(Choice, config=config),
+        "simple": RouteBuilder(SimpleModel, response_fields=["name"], config={**config, "cache": {}}),
+        "unique": RouteBuilder(UniqueModel, request_fields=["code", "name", "group"], config=config),
+        "owner": RouteBuilder(
+            SimpleModelWithOwner,
+            request_fields=["name"],
+            response_fields=["name"],
+            owner_field="owner",
+            config=config,
+            authentication=check_api_key,
+        ),
+    }
+
+
+@pytest.mark.django_db(transaction=True)
+@pytest.fixture(name="toppings")
+def create_toppings():
+    return [Topping.objects.create(name=f"topping{i}") for i in range(2)]
+
+
+@pytest.mark.parametrize("path", [PIZZAS_PATH, ASYNC_PIZZAS_PATH])
+@pytest.mark.django_db(transaction=True)
+def test_bulk_create_with_many_to_many(client, toppings, path, mocker):
+    toppings_json = [{"uuid": str(topping.uuid)} for topping in toppings]
+    response = client.post(
+        path,
+        json=[
+            {"name": "pizza0", "toppings": toppings_json},
+            {"name": "pizza1", "toppings": toppings_json[:1]},
+            {"name": "pizza2", "toppings": []},
+        ],
+    )
+    assert response.status_code == 200, response.content.decode("utf-8")
+    items = response.json()["items"]
+    assert [item["name"] for item in items] == ["pizza0", "pizza1", "pizza2"]
+    assert sorted(items[0]["toppings"], key=lambda topping: topping["uuid"]) == sorted(
+        toppings_json, key=lambda topping: topping["uuid"]
+    )
+    assert items[1] == {"uuid": mocker.ANY, "name": "pizza1", "toppings": toppings_json[:1]}
+    assert items[2]["toppings"] == []
+
+    assert Pizza.objects.count() == 3
+    assert Pizza.toppings.through.objects.count() == 3
+
+
+@pytest.mark.django_db(transaction=True)
+def test_bulk_create_queries(route_builders, toppings, django_assert_num_queries):
+    schema = route_builders["pizza"].new_instance_schema
+    toppings_json = [{"uuid": str(topping.uuid)} for topping in toppings]
+    api_instances = [schema(name=f"pizza{i}", toppings=toppings_json) for i in range(3)]
+
+    # One in_bulk() for the toppings, one unique check of the primary keys, two batches of pizzas, three batches of
+    # links and one prefetch.
+    with django_assert_num_queries(8):
+        route_builders["pizza"].bulk_create(api_instances, None)
+
+    assert Pizza.toppings.through.objects.count() == 6
+
+
+@pytest.mark.django_db(transaction=True)
+def test_bulk_create_with_foreign_key(client):
+    question = Question.objects.create(name="question")
+    missing = uuid4()
+
+    response = client.post(CHOICES_PATH, json=[{"name": "choice0", "question": str(question.uuid)}])
+    assert response.status_code == 200, response.content.decode("utf-8")
+    assert response.json()["items"][0]["question"] == str(question.uuid)
+
+    response = client.post(
+        CHOICES_PATH,
+        json=[{"name": "choice1", "question": str(question.uuid)}, {"name": "choice2", "question": str(missing)}],
+    )
+    assert response.status_code == 422, response.content.decode("utf-8")
+    assert response.json() == {
+        "detail": [
+            {"loc": ["body", 1, "question"], "msg": f"Question {missing} does not exist.", "type": "value_error"}
+        ]
+    }
+    assert list(Choice.objects.values_list("name", flat=True)) == ["choice0"]
+
+
+@pytest.mark.django_db(transaction=True)
+def test_bulk_create_model_validation(client, route_builders):
+    response = client.post(SIMPLE_PATH, json=[{"name": "name", "config": {}}, {"name": "", "config": {}}])
+    assert response.status_code == 422, response.content.decode("utf-8")
+    assert response.json() == {
+        "detail": [{"loc": ["body", 1, "name"], "msg": "This field cannot be blank.", "type": "value_error"}]
+    }
+    assert not SimpleModel.objects.exists()
+
+    response = client.post(SIMPLE_PATH, json=[{"name": "name", "config": {}}])
+    assert response.status_code == 200, response.content.decode("utf-8")
+    assert response.json() == {"items": [{"name": "name"}]}
+    assert route_builders["simple"].response_cache
+
+
+@pytest.mark.django_db(transaction=True)
+def test_bulk_create_conflict(client, mocker):
+    mocker.patch("projectx.api.fastapi.bulk_insert", side_effect=IntegrityError)
+
+    response = client.post(SIMPLE_PATH, json=[{"name": "name", "config": {}}])
+    assert response.status_code == 409, response.content.decode("utf-8")
+    assert response.json() == {"detail": "The SimpleModels conflict with existing SimpleModels."}
+
+
+@pytest.mark.django_db(transaction=True)
+def test_bulk_create_with_owner(client):
+    user = User.objects.create_user(email="apikeyuser@tempurl.com", first_name="API", last_name="Test User")
+    api_key = ApiKey.objects.create(user=user, key="api_key")
+
+    response = client.post(OWNER_PATH, headers={"X-API-Key": api_key.key}, json=[{"name": "name0"}, {"name": "name1"}])
+    assert response.status_code == 200, response.content.decode("utf-8")
+    assert response.json() == {"items": [{"name": "name0"}, {"name": "name1"}]}
+    assert SimpleModelWithOwner.objects.filter(owner=user).count() == 2
+
+
+@pytest.mark.django_db(transaction=True)
+def test_bulk_create_unique_validation(client):
+    UniqueModel.objects.create(code="code0", name="name0", group="group0")
+
+    response = client.post(
+        UNIQUE_PATH,
+        json=[
+            {"code": "code0", "name": "name1", "group": "group0"},
+            {"code": "code1", "name": "name0", "group": "group0"},
+            {"code": "code2", "name": "name2", "group": "group0"},
+            {"code": "code2", "name": "name2", "group": "group0"},
+            {"code": "code3", "name": "name2", "group": "group1"},
+        ],
+    )
+    assert response.status_code == 422, response.content.decode("utf-8")
+    assert response.json() == {
+        "detail": [
+            {"loc": ["body", 3, "code"], "msg": "Duplicate code code2.", "type": "value_error"},
+            {"loc": ["body", 0, "code"], "msg": "Unique model with this Code already exists.", "type": "value_error"},
+            {"loc": ["body", 3, "__all__"], "msg": "Duplicate name, group name2, group0.", "type": "value_error"},
+            {
+                "loc": ["body", 1, "__all__"],
+                "msg": "Unique model with this Name and Group already exists.",
+                "type": "value_error",
+            },
+        ]
+    }
+    assert UniqueModel.objects.count() == 1
+
+
+@pytest.mark.django_db(transaction=True)
+def test_bulk_create_unique_validation_queries(route_builders, django_assert_num_queries):
+    schema = route_builders["unique"].new_instance_schema
+    api_instances = [schema(code=f"code{i}", name=f"name{i}", group="group") for i in range(5)]
+
+    # One query for each of the uuid, code and name and group constraints, and three batches of inserts.
+    with django_assert_num_queries(6):
+        route_builders["unique"].bulk_create(api_instances, None)
+
+    assert UniqueModel.objects.count() == 5
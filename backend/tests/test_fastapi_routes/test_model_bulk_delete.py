@@ -0,0 +1,170 @@
+from uuid import UUID, uuid4
+
+import pytest
+from django.core.cache import caches
+from test_app.models import (
+    Choice,
+    Pizza,
+    Question,
+    SimpleIDModel,
+    SimpleModel,
+    SimpleModelWithOwner,
+)
+
+from projectx.api.fastapi import RouteBuilder, check_api_key
+from projectx.users.models import ApiKey, User
+
+SIMPLE_PATH = "/simplemodels/bulk/"
+ASYNC_PATH = "/asyncmodels/bulk/"
+CACHED_PATH = "/cachedmodels/bulk/"
+ID_PATH = "/simpleidmodels/bulk/"
+QUESTIONS_PATH = "/questions/bulk/"
+PIZZAS_PATH = "/pizzas/bulk/"
+OWNER_PATH = "/simplemodelwithowners/bulk/"
+
+
+@pytest.fixture(name="route_builders")
+def get_route_builders():
+    config = {"identifier": "uuid", "identifier_class": UUID, "bulk": {}}
+    return {
+        "simple": RouteBuilder(SimpleModel, config=config),
+        "async": RouteBuilder(SimpleModel, config={**config, "name": "AsyncModel", "async": True}),
+        "cached": RouteBuilder(
+            SimpleModel, response_fields=["name"], config={**config, "name": "CachedModel", "cache": {}}
+        ),
+        "id": RouteBuilder(SimpleIDModel, config={"identifier": "id", "bulk": {}}),
+        "question": RouteBuilder(Question, config=config),
+        "pizza": RouteBuilder(Pizza, config=config),
+        "owner": RouteBuilder(
+            SimpleModelWithOwner,
+            request_fields=["name"],
+            response_fields=["name"],
+            owner_field="owner",
+            config=config,
+            authentication=check_api_key,
+        ),
+    }
+
+
+@pytest.mark.parametrize("path", [SIMPLE_PATH, ASYNC_PATH])
+@pytest.mark.django_db(transaction=True)
+def test_bulk_delete_identifiers(client, path):
+    instances = [SimpleModel.objects.create(name=f"name{i}") for i in range(3)]
+
+    response = client.request(
+        "DELETE", path, json={"identifiers": [str(instances[0].uuid), str(instances[1].uuid), str(uuid4())]}
+    )
+    assert response.status_code == 200, response.content.decode("utf-8")
+    assert response.json() == {"deleted": 2, "objects": {"test_app.SimpleModel": 2}}
+    assert list(SimpleModel.objects.values_list("name", flat=True)) == ["name2"]
+
+
+@pytest.mark.django_db(transaction=True)
+def test_bulk_delete_filter(client):
+    for name in ["keep", "delete", "delete"]:
+        SimpleModel.objects.create(name=name)
+
+    response = client.request("DELETE", SIMPLE_PATH, json={"filter": {"name": "delete"}})
+    assert response.status_code == 200, response.content.decode("utf-8")
+    assert response.json() == {"deleted": 2, "objects": {"test_app.SimpleModel": 2}}
+    assert list(SimpleModel.objects.values_list("name", flat=True)) == ["keep"]
+
+
+@pytest.mark.django_db(transaction=True)
+def test_bulk_delete_is_one_query(route_builders, django_assert_num_queries):
+    instances = [SimpleIDModel.objects.create(name=f"name{i}") for i in range(3)]
+    selection = route_builders["id"].bulk_delete_schema(identifiers=[instance.id for instance in instances])
+
+    # Nothing cascades from SimpleIDModel or receives its signals, so the objects are not loaded.
+    with django_assert_num_queries(1):
+        assert route_builders["id"].bulk_delete(selection, None).deleted == 3
+
+
+@pytest.mark.django_db(transaction=True)
+def test_bulk_delete_with_cascades(client):
+    questions = [Question.objects.create(name=f"question{i}") for i in range(2)]
+    for question in questions:
+        Choice.objects.create(name="choice", question=question)
+
+    response = client.request("DELETE", QUESTIONS_PATH, json={"identifiers": [str(questions[0].uuid)]})
+    assert response.status_code == 200, response.content.decode("utf-8")
+    assert response.json() == {"deleted": 2, "objects": {"test_app.Choice": 1, "test_app.Question": 1}}
+    assert list(Choice.objects.values_list("question", flat=True)) == [questions[1].uuid]
+
+
+@pytest.mark.django_db(transaction=True)
+def test_bulk_delete_invalidates_cache(client, settings):
+    settings.CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+    caches["default"].clear()
+    instance = SimpleModel.objects.create(name="name")
+
+    response = client.get("/cachedmodels/")
+    assert response.json() == {"items": [{"name": "name"}]}
+
+    # The cache receives post_delete signals, so the objects are loaded and deleted with QuerySet.delete().
+    response = client.request("DELETE", CACHED_PATH, json={"identifiers": [str(instance.uuid)]})
+    assert response.status_code == 200, response.content.decode("utf-8")
+    assert response.json() == {"deleted": 1, "objects": {"test_app.SimpleModel": 1}}
+
+    response = client.get("/cachedmodels/")
+    assert response.json() == {"items": []}
+
+
+@pytest.mark.parametrize(
+    "body, message",
+    [
+        ({}, "Either identifiers or filter must be given."),
+        ({"identifiers": [], "filter": {"name": "name"}}, "Either identifiers or filter must be given."),
+        ({"filter": {}}, "The filter must have at least one field."),
+    ],
+)
+@pytest.mark.django_db(transaction=True)
+def test_bulk_delete_invalid_selection(client, body, message):
+    SimpleModel.objects.create(name="name")
+
+    response = client.request("DELETE", SIMPLE_PATH, json=body)
+    assert response.status_code == 422, response.content.decode("utf-8")
+    assert response.json()["detail"][0]["msg"] == message
+    assert SimpleModel.objects.exists()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_bulk_delete_errors(client):
+    pizza = Pizza.objects.create(name="pizza")
+
+    response = client.request("DELETE", PIZZAS_PATH, json={"filter": {"toppings": []}})
+    assert response.status_code == 422, response.content.decode("utf-8")
+    assert response.json() == {
+        "detail": [
+            {
+                "loc": ["body", "filter", "toppings"],
+                "msg": "Many to many fields can not be filtered on.",
+                "type": "value_error",
+            }
+        ]
+    }
+
+    response = client.request("DELETE", ID_PATH, json={"identifiers": ["1", "one"]})
+    assert response.status_code == 422, response.content.decode("utf-8")
+    assert response.json() == {
+        "detail": [{"loc": ["body", "identifiers", 1], "msg": "“one” value must be an integer.", "type": "value_error"}]
+    }
+    assert Pizza.objects.get() == pizza
+
+
+@pytest.mark.django_db(transaction=True)
+def test_bulk_delete_with_owner(client):
+    users = [
+        User.objects.create_user(email=f"apikeyuser{i}@tempurl.com", first_name="API", last_name="Test User")
+        for i in range(2)
+    ]
+    api_key = ApiKey.objects.create(user=users[0], key="api_key")
+    for user in users:
+        SimpleModelWithOwner.objects.create(name="name", owner=user)
+
+    response = client.request(
+        "DELETE", OWNER_PATH, headers={"X-API-Key": api_key.key}, json={"filter": {"name": "name"}}
+    )
+    assert response.status_code == 200, response.content.decode("utf-8")
+    assert response.json() == {"deleted": 1, "objects": {"test_app.SimpleModelWithOwner": 1}}
+    assert list(SimpleModelWithOwner.objects.values_list("owner", flat=True)) == [users[1].pk]
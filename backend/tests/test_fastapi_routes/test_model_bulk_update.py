@@ -0,0 +1,271 @@
+from uuid import UUID, uuid4
+
+import pytest
+from django.core.cache import caches
+from django.db import IntegrityError
+from test_app.models import (
+    Choice,
+    Pizza,
+    Question,
+    SimpleIDModel,
+    SimpleModel,
+    SimpleModelWithOwner,
+    SimpleTimeStampedModel,
+)
+
+from projectx.api.fastapi import RouteBuilder, check_api_key
+from projectx.users.models import ApiKey, User
+
+SIMPLE_PATH = "/simplemodels/bulk/"
+ASYNC_PATH = "/asyncmodels/bulk/"
+ID_PATH = "/simpleidmodels/bulk/"
+TIMESTAMPED_PATH = "/simpletimestampedmodels/bulk/"
+CHOICES_PATH = "/choices/bulk/"
+PIZZAS_PATH = "/pizzas/bulk/"
+OWNER_PATH = "/simplemodelwithowners/bulk/"
+
+
+@pytest.fixture(name="route_builders")
+def get_route_builders():
+    config = {"identifier": "uuid", "identifier_class": UUID, "bulk": {"batch_size": 2}}
+    return {
+        "simple": RouteBuilder(SimpleModel, response_fields=["name"], config={**config, "cache": {}}),
+        "async": RouteBuilder(SimpleModel, config={**config, "name": "AsyncModel", "async": True}),
+        "id": RouteBuilder(SimpleIDModel, config={"identifier": "id", "bulk": {}}),
+        "timestamped": RouteBuilder(SimpleTimeStampedModel, request_fields=["name"], config=config),
+        "choice": RouteBuilder(Choice, config=config),
+        "pizza": RouteBuilder(Pizza, config=config),
+        "owner": RouteBuilder(
+            SimpleModelWithOwner,
+            request_fields=["name"],
+            response_fields=["name"],
+            owner_field="owner",
+            config=config,
+            authentication=check_api_key,
+        ),
+    }
+
+
+@pytest.mark.parametrize("path", [SIMPLE_PATH, ASYNC_PATH])
+@pytest.mark.django_db(transaction=True)
+def test_bulk_update(client, path):
+    instances = [SimpleModel.objects.create(name=f"name{i}", config={"i": i}) for i in range(3)]
+    last_updated = instances[0].last_updated
+
+    response = client.patch(
+        path,
+        json=[
+            {"identifier": str(instances[0].uuid), "fields": {"name": "new0"}},
+            {"identifier": str(instances[1].uuid), "fields": {"name": "new1", "config": {"new": 1}}},
+            {"identifier": str(instances[2].uuid), "fields": {}},
+        ],
+    )
+    assert response.status_code == 200, response.content.decode("utf-8")
+    assert response.json() == {"updated": 2}
+
+    instances = SimpleModel.objects.order_by("id")
+    assert [(instance.name, instance.config) for instance in instances] == [
+        ("new0", {"i": 0}),
+        ("new1", {"new": 1}),
+        ("name2", {"i": 2}),
+    ]
+    assert instances[0].last_updated > last_updated
+
+    response = client.patch(path, json=[])
+    assert response.status_code == 200, response.content.decode("utf-8")
+    assert response.json() == {"updated": 0}
+
+
+@pytest.mark.django_db(transaction=True)
+def test_bulk_update_with_integer_identifiers(client):
+    instance = SimpleIDModel.objects.create(name="name")
+
+    response = client.patch(ID_PATH, json=[{"identifier": str(instance.id), "fields": {"name": "new"}}])
+    assert response.status_code == 200, response.content.decode("utf-8")
+    assert SimpleIDModel.objects.get().name == "new"
+
+    response = client.patch(ID_PATH, json=[{"identifier": "one", "fields": {"name": "new"}}])
+    assert response.status_code == 422, response.content.decode("utf-8")
+    assert response.json() == {
+        "detail": [{"loc": ["body", 0, "identifier"], "msg": "“one” value must be an integer.", "type": "value_error"}]
+    }
+
+
+@pytest.mark.django_db(transaction=True)
+def test_bulk_update_modified_field(client):
+    instance = SimpleTimeStampedModel.objects.create(name="name")
+
+    response = client.patch(TIMESTAMPED_PATH, json=[{"identifier": str(instance.uuid), "fields": {"name": "new"}}])
+    assert response.status_code == 200, response.content.decode("utf-8")
+
+    updated = SimpleTimeStampedModel.objects.get()
+    assert updated.name == "new"
+    assert updated.modified > instance.modified
+    assert updated.created == instance.created
+
+
+@pytest.mark.django_db(transaction=True)
+def test_bulk_update_errors(client):
+    instances = [SimpleModel.objects.create(name=f"name{i}") for i in range(2)]
+    missing = uuid4()
+
+    response = client.patch(
+        SIMPLE_PATH,
+        json=[
+            {"identifier": str(instances[0].uuid), "fields": {"name": "new0"}},
+            {"identifier": str(instances[0].uuid), "fields": {"name": "new1"}},
+        ],
+    )
+    assert response.status_code == 422, response.content.decode("utf-8")
+    assert response.json() == {
+        "detail": [
+            {
+                "loc": ["body", 1, "identifier"],
+                "msg": f"Duplicate identifier {instances[0].uuid}.",
+                "type": "value_error",
+            }
+        ]
+    }
+
+    response = client.patch(
+        SIMPLE_PATH,
+        json=[
+            {"identifier": str(instances[0].uuid), "fields": {"name": "new0"}},
+            {"identifier": str(missing), "fields": {"name": "new1"}},
+        ],
+    )
+    assert response.status_code == 404, response.content.decode("utf-8")
+    assert response.json() == {"detail": f"Objects {missing} not found."}
+
+    response = client.patch(
+        SIMPLE_PATH,
+        json=[
+            {"identifier": str(instances[0].uuid), "fields": {"name": "new0"}},
+            {"identifier": str(instances[1].uuid), "fields": {"name": ""}},
+        ],
+    )
+    assert response.status_code == 422, response.content.decode("utf-8")
+    assert response.json() == {
+        "detail": [{"loc": ["body", 1, "fields", "name"], "msg": "This field cannot be blank.", "type": "value_error"}]
+    }
+
+    assert list(SimpleModel.objects.order_by("id").values_list("name", flat=True)) == ["name0", "name1"]
+
+
+@pytest.mark.django_db(transaction=True)
+def test_bulk_update_conflict(client, mocker):
+    instance = SimpleModel.objects.create(name="name")
+    mocker.patch("projectx.api.fastapi.bulk_change", side_effect=IntegrityError)
+
+    response = client.patch(SIMPLE_PATH, json=[{"identifier": str(instance.uuid), "fields": {"name": "new"}}])
+    assert response.status_code == 409, response.content.decode("utf-8")
+    assert response.json() == {"detail": "The SimpleModels conflict with existing SimpleModels."}
+
+
+@pytest.mark.django_db(transaction=True)
+def test_bulk_update_invalidates_cache(client, settings):
+    settings.CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+    caches["default"].clear()
+    instance = SimpleModel.objects.create(name="name")
+
+    response = client.get("/simplemodels/")
+    assert response.json() == {"items": [{"name": "name"}]}
+
+    response = client.patch(SIMPLE_PATH, json=[{"identifier": str(instance.uuid), "fields": {"name": "new"}}])
+    assert response.status_code == 200, response.content.decode("utf-8")
+
+    response = client.get("/simplemodels/")
+    assert response.json() == {"items": [{"name": "new"}]}
+    assert response.headers["X-Cache"] == "MISS"
+
+
+@pytest.mark.django_db(transaction=True)
+def test_bulk_update_with_foreign_key(client):
+    questions = [Question.objects.create(name=f"question{i}") for i in range(2)]
+    choice = Choice.objects.create(name="choice", question=questions[0])
+    missing = uuid4()
+
+    response = client.patch(
+        CHOICES_PATH, json=[{"identifier": str(choice.uuid), "fields": {"question": str(questions[1].uuid)}}]
+    )
+    assert response.status_code == 200, response.content.decode("utf-8")
+    assert Choice.objects.get().question == questions[1]
+
+    response = client.patch(CHOICES_PATH, json=[{"identifier": str(choice.uuid), "fields": {"question": str(missing)}}])
+    assert response.status_code == 422, response.content.decode("utf-8")
+    assert response.json() == {
+        "detail": [
+            {
+                "loc": ["body", 0, "fields", "question"],
+                "msg": f"Question {missing} does not exist.",
+                "type": "value_error",
+            }
+        ]
+    }
+
+
+@pytest.mark.django_db(transaction=True)
+def test_bulk_update_many_to_many(client):
+    pizza = Pizza.objects.create(name="pizza")
+
+    response = client.patch(PIZZAS_PATH, json=[{"identifier": str(pizza.uuid), "fields": {"toppings": []}}])
+    assert response.status_code == 422, response.content.decode("utf-8")
+    assert response.json() == {
+        "detail": [
+            {
+                "loc": ["body", 0, "fields", "toppings"],
+                "msg": "Many to many fields can not be updated in bulk.",
+                "type": "value_error",
+            }
+        ]
+    }
+
+
+@pytest.mark.django_db(transaction=True)
+def test_bulk_update_with_owner(client):
+    users = [
+        User.objects.create_user(email=f"apikeyuser{i}@tempurl.com", first_name="API", last_name="Test User")
+        for i in range(2)
+    ]
+    api_key = ApiKey.objects.create(user=users[0], key="api_key")
+    owned = SimpleModelWithOwner.objects.create(name="owned", owner=users[0])
+    other = SimpleModelWithOwner.objects.create(name="other", owner=users[1])
+
+    response = client.patch(
+        OWNER_PATH,
+        headers={"X-API-Key": api_key.key},
+        json=[
+            {"identifier": str(owned.uuid), "fields": {"name": "new"}},
+            {"identifier": str(other.uuid), "fields": {"name": "new"}},
+        ],
+    )
+    assert response.status_code == 404, response.content.decode("utf-8")
+    assert response.json() == {"detail": f"Objects {other.uuid} not found."}
+
+    response = client.patch(
+        OWNER_PATH,
+        headers={"X-API-Key": api_key.key},
+        json=[{"identifier": str(owned.uuid), "fields": {"name": "new"}}],
+    )
+    assert response.status_code == 200, response.content.decode("utf-8")
+    assert dict(SimpleModelWithOwner.objects.values_list("name", "owner")) == {"new": users[0].pk, "other": users[1].pk}
+
+
+@pytest.mark.django_db(transaction=True)
+def test_bulk_update_queries(route_builders, django_assert_num_queries):
+    instances = [SimpleModel.objects.create(name=f"name{i}") for i in range(5)]
+    schema = route_builders["simple"].bulk_update_schema
+    items = [schema(identifier=instance.uuid, fields={"name": f"new{i}"}) for i, instance in enumerate(instances)]
+    items[4] = schema(identifier=instances[4].uuid, fields={"config": {"new": 4}})
+
+    # One scoped query, two batches of the name updates and one config update.
+    with django_assert_num_queries(4):
+        assert route_builders["simple"].bulk_update(items, None).updated == 5
+
+    assert list(SimpleModel.objects.order_by("id").values_list("name", flat=True)) == [
+        "new0",
+        "new1",
+        "new2",
+        "new3",
+        "name4",
+    ]
@@ -0,0 +1,293 @@
+from uuid import UUID, uuid4
+
+import pytest
+from django.core.cache import caches
+from django.db import IntegrityError
+from django.db.models import Q
+from test_app.models import (
+    ModelWithValidation,
+    NullableJSONModel,
+    SimpleModel,
+    SimpleModelWithArray,
+    SizedArrayModel,
+    WideModel,
+)
+
+from projectx.api.fastapi import RouteBuilder
+from projectx.api.operations import Operation
+
+SIMPLE_PATH = "/simplemodels/{}/operations/"
+ASYNC_PATH = "/asyncmodels/{}/operations/"
+FILTERED_PATH = "/filteredmodels/{}/operations/"
+ARRAY_PATH = "/simplemodelwitharrays/{}/operations/"
+WIDE_PATH = "/widemodels/{}/operations/"
+NULLABLE_PATH = "/nullablejsonmodels/{}/operations/"
+VALIDATED_PATH = "/modelwithvalidations/{}/operations/"
+SIZED_PATH = "/sizedarraymodels/{}/operations/"
+
+
+def filter_by_name(_):
+    return Q(name__contains="XXX")
+
+
+@pytest.fixture(name="route_builders")
+def get_route_builders():
+    config = {"identifier": "uuid", "identifier_class": UUID, "operations": {}}
+    return {
+        "simple": RouteBuilder(SimpleModel, response_fields=["name", "config"], config={**config, "cache": {}}),
+        "async": RouteBuilder(
+            SimpleModel, response_fields=["name", "config"], config={**config, "name": "AsyncModel", "async": True}
+        ),
+        "filtered": RouteBuilder(SimpleModel, query_filter=filter_by_name, config={**config, "name": "FilteredModel"}),
+        "array": RouteBuilder(SimpleModelWithArray, config={"operations": {}}),
+        "wide": RouteBuilder(WideModel, response_fields=["name", "count"], config={**config, "idempotency": {}}),
+        "nullable": RouteBuilder(NullableJSONModel, response_fields=["data"], config=config),
+        "validated": RouteBuilder(ModelWithValidation, config={"operations": {}}),
+        "sized": RouteBuilder(SizedArrayModel, response_fields=["an_array"], config=config),
+    }
+
+
+@pytest.mark.parametrize("path", [SIMPLE_PATH, ASYNC_PATH])
+@pytest.mark.django_db(transaction=True)
+def test_json_operations(client, path):
+    instance = SimpleModel.objects.create(name="name", config={"a": 1, "nested": {"b": 2, "c": 3}})
+
+    response = client.post(
+        path.format(instance.uuid),
+        json=[
+            {"op": "merge", "field": "config", "value": {"a": 2, "d": [4]}},
+            {"op": "set", "field": "config", "path": ["nested", "b"], "value": {"e": 5}},
+        ],
+    )
+    assert response.status_code == 200, response.content.decode("utf-8")
+    config = {"a": 2, "d": [4], "nested": {"b": {"e": 5}, "c": 3}}
+    assert response.json() == {"name": "name", "config": config}
+
+    updated = SimpleModel.objects.get()
+    assert updated.config == config
+    assert updated.last_updated > instance.last_updated
+
+
+@pytest.mark.django_db(transaction=True)
+def test_set_json_null(client):
+    instance = SimpleModel.objects.create(name="name", config={"a": 1, "b": 2})
+
+    response = client.post(
+        SIMPLE_PATH.format(instance.uuid),
+        json=[
+            {"op": "set", "field": "config", "path": ["a"], "value": None},
+            {"op": "set", "field": "config", "path": ["c"]},
+        ],
+    )
+    assert response.status_code == 200, response.content.decode("utf-8")
+    assert response.json() == {"name": "name", "config": {"a": None, "b": 2, "c": None}}
+    assert SimpleModel.objects.get().config == {"a": None, "b": 2, "c": None}
+
+
+@pytest.mark.django_db(transaction=True)
+def test_json_operations_on_null_column(client):
+    instances = [NullableJSONModel.objects.create(data=None) for _ in range(2)]
+
+    response = client.post(
+        NULLABLE_PATH.format(instances[0].uuid), json=[{"op": "merge", "field": "data", "value": {"a": 1}}]
+    )
+    assert response.status_code == 200, response.content.decode("utf-8")
+    assert response.json() == {"data": {"a": 1}}
+
+    response = client.post(
+        NULLABLE_PATH.format(instances[1].uuid), json=[{"op": "set", "field": "data", "path": ["a"], "value": [1]}]
+    )
+    assert response.status_code == 200, response.content.decode("utf-8")
+    assert response.json() == {"data": {"a": [1]}}
+
+
+@pytest.mark.django_db(transaction=True)
+def test_array_operations(client):
+    instance = SimpleModelWithArray.objects.create(name="name", an_array=["a", "b", "a"])
+
+    response = client.post(
+        ARRAY_PATH.format(instance.id),
+        headers={"Prefer": "return=minimal"},
+        json=[{"op": "remove", "field": "an_array", "value": "a"}, {"op": "append", "field": "an_array", "value": "c"}],
+    )
+    assert response.status_code == 204, response.content.decode("utf-8")
+    assert response.headers["Preference-Applied"] == "return=minimal"
+    assert SimpleModelWithArray.objects.get().an_array == ["b", "c"]
+
+
+@pytest.mark.django_db(transaction=True)
+def test_increment_operation(client):
+    instance = WideModel.objects.create(name="name", count=1)
+
+    response = client.post(WIDE_PATH.format(instance.uuid), json=[{"op": "increment", "field": "count", "value": 2}])
+    assert response.status_code == 200, response.content.decode("utf-8")
+    assert response.json() == {"name": "name", "count": 3}
+
+    response = client.post(
+        WIDE_PATH.format(instance.uuid), json=[{"op": "increment", "field": "count", "value": 2**31}]
+    )
+    assert response.status_code == 422, response.content.decode("utf-8")
+    assert response.json() == {"detail": f"The operations can not be applied to WideModel {instance.uuid}."}
+    assert WideModel.objects.get().count == 3
+
+
+@pytest.mark.django_db(transaction=True)
+def test_operation_results_are_validated(client):
+    instance = ModelWithValidation.objects.create(number=0)
+
+    response = client.post(
+        VALIDATED_PATH.format(instance.id), json=[{"op": "increment", "field": "number", "value": 4}]
+    )
+    assert response.status_code == 422, response.content.decode("utf-8")
+    assert response.json() == {
+        "detail": [{"loc": ["body", "number"], "msg": "4 is greater than 1", "type": "value_error"}]
+    }
+    assert ModelWithValidation.objects.get().number == 0
+
+    response = client.post(
+        VALIDATED_PATH.format(instance.id), json=[{"op": "increment", "field": "number", "value": 1}]
+    )
+    assert response.status_code == 200, response.content.decode("utf-8")
+    assert response.json() == {"id": instance.id, "number": 1}
+
+    sized_instance = SizedArrayModel.objects.create(an_array=["a", "b"])
+    response = client.post(
+        SIZED_PATH.format(sized_instance.uuid), json=[{"op": "append", "field": "an_array", "value": "c"}]
+    )
+    assert response.status_code == 422, response.content.decode("utf-8")
+    assert response.json()["detail"][0]["loc"] == ["body", "an_array"]
+    assert SizedArrayModel.objects.get().an_array == ["a", "b"]
+
+
+@pytest.mark.django_db(transaction=True)
+def test_operations_are_one_query(route_builders, django_assert_num_queries):
+    instance = WideModel.objects.create(name="name", count=1)
+    operations = [Operation(op="increment", field="count", value=1), Operation(op="increment", field="count", value=2)]
+
+    # Both increments and the last_updated change are made by one UPDATE, without reading the object.
+    with django_assert_num_queries(1):
+        route_builders["wide"].apply_operations(instance.uuid, operations, None, minimal=True)
+
+    assert WideModel.objects.get().count == 4
+
+
+@pytest.mark.django_db(transaction=True)
+def test_operation_errors(client):
+    instance = SimpleModel.objects.create(name="name")
+    array_instance = SimpleModelWithArray.objects.create(name="name")
+    wide_instance = WideModel.objects.create(name="name")
+
+    response = client.post(
+        SIMPLE_PATH.format(instance.uuid),
+        json=[
+            {"op": "merge", "field": "uuid", "value": {}},
+            {"op": "increment", "field": "config", "value": 1},
+            {"op": "merge", "field": "config", "value": [1]},
+            {"op": "set", "field": "config", "value": 1},
+        ],
+    )
+    assert response.status_code == 422, response.content.decode("utf-8")
+    assert response.json() == {
+        "detail": [
+            {"loc": ["body", 0, "field"], "msg": "uuid not in ['config', 'name'].", "type": "value_error"},
+            {"loc": ["body", 1, "op"], "msg": "increment can not be applied to config.", "type": "value_error"},
+            {"loc": ["body", 2, "value"], "msg": "The value to merge must be an object.", "type": "value_error"},
+            {"loc": ["body", 3, "path"], "msg": "The path to set must not be empty.", "type": "value_error"},
+        ]
+    }
+
+    response = client.post(
+        ARRAY_PATH.format(array_instance.id),
+        json=[{"op": "append", "field": "an_array"}, {"op": "append", "field": "an_array", "value": "a" * 11}],
+    )
+    assert response.status_code == 422, response.content.decode("utf-8")
+    assert response.json() == {
+        "detail": [
+            {"loc": ["body", 0, "value"], "msg": "This field cannot be null.", "type": "value_error"},
+            {
+                "loc": ["body", 1, "value"],
+                "msg": "Ensure this value has at most 10 characters (it has 11).",
+                "type": "value_error",
+            },
+        ]
+    }
+
+    response = client.post(
+        WIDE_PATH.format(wide_instance.uuid), json=[{"op": "increment", "field": "count", "value": "one"}]
+    )
+    assert response.status_code == 422, response.content.decode("utf-8")
+    assert response.json() == {
+        "detail": [{"loc": ["body", 0, "value"], "msg": "“one” value must be an integer.", "type": "value_error"}]
+    }
+
+    response = client.post(SIMPLE_PATH.format(instance.uuid), json=[])
+    assert response.status_code == 422, response.content.decode("utf-8")
+    assert response.json()["detail"][0]["loc"] == ["body"]
+
+    response = client.post(SIMPLE_PATH.format(instance.uuid), json=[{"op": "replace", "field": "config"}])
+    assert response.status_code == 422, response.content.decode("utf-8")
+    assert response.json()["detail"][0]["loc"] == ["body", 0, "op"]
+
+    assert SimpleModel.objects.get().last_updated == instance.last_updated
+
+
+@pytest.mark.django_db(transaction=True)
+def test_operations_not_found(client):
+    instance = SimpleModel.objects.create(name="name")
+    operations = [{"op": "merge", "field": "config", "value": {"a": 1}}]
+
+    for path, identifier in [(SIMPLE_PATH, uuid4()), (FILTERED_PATH, instance.uuid)]:
+        response = client.post(path.format(identifier), json=operations)
+        assert response.status_code == 404, response.content.decode("utf-8")
+        assert response.json() == {"detail": f"Object {identifier} not found."}
+
+    assert SimpleModel.objects.get().config == {}
+
+
+@pytest.mark.django_db(transaction=True)
+def test_operations_conflict(client, mocker):
+    instance = SimpleModel.objects.create(name="name")
+    mocker.patch("django.db.models.query.QuerySet.update", side_effect=IntegrityError)
+
+    response = client.post(
+        SIMPLE_PATH.format(instance.uuid), json=[{"op": "merge", "field": "config", "value": {"a": 1}}]
+    )
+    assert response.status_code == 409, response.content.decode("utf-8")
+    assert response.json() == {"detail": "The SimpleModel conflicts with existing SimpleModels."}
+
+
+@pytest.mark.django_db(transaction=True)
+def test_operations_invalidate_cache(client, settings):
+    settings.CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+    caches["default"].clear()
+    instance = SimpleModel.objects.create(name="name")
+
+    response = client.get("/simplemodels/")
+    assert response.json() == {"items": [{"name": "name", "config": {}}]}
+
+    response = client.post(
+        SIMPLE_PATH.format(instance.uuid), json=[{"op": "merge", "field": "config", "value": {"a": 1}}]
+    )
+    assert response.status_code == 200, response.content.decode("utf-8")
+
+    response = client.get("/simplemodels/")
+    assert response.json() == {"items": [{"name": "name", "config": {"a": 1}}]}
+    assert response.headers["X-Cache"] == "MISS"
+
+
+@pytest.mark.django_db(transaction=True)
+def test_idempotent_operations(client, settings):
+    settings.CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+    caches["default"].clear()
+    instances = [WideModel.objects.create(name=f"name{i}", count=1) for i in range(2)]
+    operations = [{"op": "increment", "field": "count", "value": 1}]
+
+    for _ in range(2):
+        response = client.post(WIDE_PATH.format(instances[0].uuid), headers={"Idempotency-Key": "key"}, json=operations)
+        assert response.status_code == 200, response.content.decode("utf-8")
+        assert response.json() == {"name": "name0", "count": 2}
+
+    # The key is scoped to the object, so it can be reused for another one.
+    response = client.post(WIDE_PATH.format(instances[1].uuid), headers={"Idempotency-Key": "key"}, json=operations)
+    assert response.status_code == 200, response.content.decode("utf-8")
+    assert response.json() == {"name": "name1", "count": 2}
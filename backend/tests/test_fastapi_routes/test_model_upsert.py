@@ -0,0 +1,275 @@
+from uuid import UUID, uuid4
+
+import pytest
+from django.db import IntegrityError
+from django.db.models import QuerySet
+from test_app.models import (
+    Choice,
+    Pizza,
+    Question,
+    SimpleModel,
+    SimpleModelWithOwner,
+    Topping,
+)
+
+from projectx.api.fastapi import RouteBuilder, check_api_key
+from projectx.users.models import ApiKey, User
+
+SIMPLE_PATH = "/simplemodels/upsert/"
+ASYNC_PATH = "/asyncmodels/upsert/"
+SIMPLE_BULK_PATH = "/simplemodels/bulk/upsert/"
+ASYNC_BULK_PATH = "/asyncmodels/bulk/upsert/"
+QUESTIONS_PATH = "/questions/bulk/upsert/"
+CHOICES_PATH = "/choices/bulk/upsert/"
+PIZZAS_PATH = "/pizzas/bulk/upsert/"
+OWNER_PATH = "/simplemodelwithowners/bulk/upsert/"
+
+
+@pytest.fixture(name="route_builders")
+def get_route_builders():
+    config = {"identifier": "uuid", "identifier_class": UUID, "upsert": {"batch_size": 2}}
+    return {
+        "simple": RouteBuilder(SimpleModel, response_fields=["uuid", "name", "config"], config={**config, "cache": {}}),
+        "async": RouteBuilder(
+            SimpleModel,
+            response_fields=["uuid", "name", "config"],
+            config={**config, "name": "AsyncModel", "async": True},
+        ),
+        "question": RouteBuilder(Question, config=config),
+        "choice": RouteBuilder(Choice, config=config),
+        "pizza": RouteBuilder(Pizza, config=config),
+        "owner": RouteBuilder(
+            SimpleModelWithOwner,
+            request_fields=["name"],
+            response_fields=["uuid", "name"],
+            owner_field="owner",
+            config=config,
+            authentication=check_api_key,
+        ),
+    }
+
+
+@pytest.mark.parametrize("path", [SIMPLE_PATH, ASYNC_PATH])
+@pytest.mark.django_db(transaction=True)
+def test_upsert(client, path):
+    uuid = str(uuid4())
+
+    response = client.put(path, json={"identifier": uuid, "fields": {"name": "name", "config": {"k": "v"}}})
+    assert response.status_code == 200, response.content.decode("utf-8")
+    assert response.json() == {"uuid": uuid, "name": "name", "config": {"k": "v"}}
+    instance = SimpleModel.objects.get()
+
+    response = client.put(path, json={"identifier": uuid, "fields": {"name": "name2", "config": {}}})
+    assert response.status_code == 200, response.content.decode("utf-8")
+    assert response.json() == {"uuid": uuid, "name": "name2", "config": {}}
+
+    updated = SimpleModel.objects.get()
+    assert updated.pk == instance.pk
+    assert updated.created == instance.created
+    assert updated.last_updated > instance.last_updated
+
+    response = client.put(path, json={"identifier": uuid, "fields": {"name": ""}})
+    assert response.status_code == 422, response.content.decode("utf-8")
+    assert response.json() == {
+        "detail": [{"loc": ["body", "fields", "name"], "msg": "This field cannot be blank.", "type": "value_error"}]
+    }
+
+
+@pytest.mark.parametrize("path", [SIMPLE_BULK_PATH, ASYNC_BULK_PATH])
+@pytest.mark.django_db(transaction=True)
+def test_bulk_upsert(client, path):
+    existing = SimpleModel.objects.create(name="existing")
+    uuids = [str(existing.uuid), str(uuid4()), str(uuid4())]
+
+    response = client.put(
+        path, json=[{"identifier": uuid, "fields": {"name": f"name{i}"}} for i, uuid in enumerate(uuids)]
+    )
+    assert response.status_code == 200, response.content.decode("utf-8")
+    assert response.json() == {
+        "items": [{"uuid": uuid, "name": f"name{i}", "config": {}} for i, uuid in enumerate(uuids)]
+    }
+    assert SimpleModel.objects.count() == 3
+    assert SimpleModel.objects.get(uuid=existing.uuid).pk == existing.pk
+
+    response = client.put(
+        path,
+        json=[
+            {"identifier": uuids[0], "fields": {"name": "name"}},
+            {"identifier": uuids[0], "fields": {"name": "name"}},
+        ],
+    )
+    assert response.status_code == 422, response.content.decode("utf-8")
+    assert response.json() == {
+        "detail": [
+            {"loc": ["body", 1, "identifier"], "msg": f"Duplicate identifier {uuids[0]}.", "type": "value_error"}
+        ]
+    }
+
+
+@pytest.mark.django_db(transaction=True)
+def test_bulk_upsert_queries(route_builders, django_assert_num_queries):
+    SimpleModel.objects.create(name="existing", uuid=UUID(int=0))
+    schema = route_builders["simple"].upsert_schema
+    items = [schema(identifier=UUID(int=i), fields={"name": f"name{i}"}) for i in range(3)]
+
+    # Two batches of INSERT ... ON CONFLICT in a savepoint of the upsert's transaction, then the rows are read back.
+    with django_assert_num_queries(5):
+        route_builders["simple"].bulk_upsert(items, None)
+
+    assert list(SimpleModel.objects.order_by("uuid").values_list("name", flat=True)) == ["name0", "name1", "name2"]
+
+
+@pytest.mark.django_db(transaction=True)
+def test_bulk_upsert_primary_key_identifier(client):
+    question = Question.objects.create(name="question")
+    uuid = str(uuid4())
+
+    response = client.put(
+        QUESTIONS_PATH,
+        json=[
+            {"identifier": str(question.uuid), "fields": {"name": "updated"}},
+            {"identifier": uuid, "fields": {"name": "new"}},
+        ],
+    )
+    assert response.status_code == 200, response.content.decode("utf-8")
+    assert dict(Question.objects.values_list("uuid", "name")) == {question.uuid: "updated", UUID(uuid): "new"}
+
+
+@pytest.mark.django_db(transaction=True)
+def test_bulk_upsert_with_foreign_key(client):
+    question = Question.objects.create(name="question")
+    missing = uuid4()
+
+    response = client.put(
+        CHOICES_PATH, json=[{"identifier": str(uuid4()), "fields": {"name": "choice", "question": str(missing)}}]
+    )
+    assert response.status_code == 422, response.content.decode("utf-8")
+    assert response.json() == {
+        "detail": [
+            {
+                "loc": ["body", 0, "fields", "question"],
+                "msg": f"Question {missing} does not exist.",
+                "type": "value_error",
+            }
+        ]
+    }
+
+    response = client.put(
+        CHOICES_PATH,
+        json=[{"identifier": str(uuid4()), "fields": {"name": "choice", "question": str(question.uuid)}}],
+    )
+    assert response.status_code == 200, response.content.decode("utf-8")
+    assert Choice.objects.get().question == question
+
+
+@pytest.mark.django_db(transaction=True)
+def test_bulk_upsert_replaces_many_to_many(client):
+    toppings = [Topping.objects.create(name=f"topping{i}") for i in range(3)]
+    pizza = Pizza.objects.create(name="pizza")
+    pizza.toppings.set(toppings[:2])
+    other = Pizza.objects.create(name="other")
+    other.toppings.set(toppings[:1])
+    uuid = str(uuid4())
+
+    response = client.put(
+        PIZZAS_PATH,
+        json=[
+            {"identifier": str(pizza.uuid), "fields": {"name": "pizza", "toppings": [{"uuid": str(toppings[2].uuid)}]}},
+            {"identifier": uuid, "fields": {"name": "new", "toppings": [{"uuid": str(toppings[0].uuid)}]}},
+        ],
+    )
+    assert response.status_code == 200, response.content.decode("utf-8")
+    assert [item["toppings"] for item in response.json()["items"]] == [
+        [{"uuid": str(toppings[2].uuid)}],
+        [{"uuid": str(toppings[0].uuid)}],
+    ]
+    assert list(pizza.toppings.all()) == [toppings[2]]
+    assert list(other.toppings.all()) == [toppings[0]]
+
+
+@pytest.mark.django_db(transaction=True)
+def test_bulk_upsert_conflict(client, mocker):
+    mocker.patch("projectx.api.fastapi.bulk_upsert", side_effect=IntegrityError)
+
+    response = client.put(SIMPLE_BULK_PATH, json=[{"identifier": str(uuid4()), "fields": {"name": "name"}}])
+    assert response.status_code == 409, response.content.decode("utf-8")
+    assert response.json() == {"detail": "The SimpleModels conflict with existing SimpleModels."}
+
+
+@pytest.mark.django_db(transaction=True)
+def test_bulk_upsert_with_owner(client):
+    users = [
+        User.objects.create_user(email=f"apikeyuser{i}@tempurl.com", first_name="API", last_name="Test User")
+        for i in range(2)
+    ]
+    api_key = ApiKey.objects.create(user=users[0], key="api_key")
+    owned = SimpleModelWithOwner.objects.create(name="owned", owner=users[0])
+    other = SimpleModelWithOwner.objects.create(name="other", owner=users[1])
+    uuid = str(uuid4())
+
+    response = client.put(
+        OWNER_PATH,
+        headers={"X-API-Key": api_key.key},
+        json=[
+            {"identifier": str(owned.uuid), "fields": {"name": "updated"}},
+            {"identifier": str(other.uuid), "fields": {"name": "updated"}},
+        ],
+    )
+    assert response.status_code == 404, response.content.decode("utf-8")
+    assert response.json() == {"detail": f"Objects {other.uuid} not found."}
+
+    response = client.put(
+        OWNER_PATH,
+        headers={"X-API-Key": api_key.key},
+        json=[
+            {"identifier": str(owned.uuid), "fields": {"name": "updated"}},
+            {"identifier": uuid, "fields": {"name": "new"}},
+        ],
+    )
+    assert response.status_code == 200, response.content.decode("utf-8")
+    assert response.json() == {"items": [{"uuid": str(owned.uuid), "name": "updated"}, {"uuid": uuid, "name": "new"}]}
+    assert dict(SimpleModelWithOwner.objects.values_list("name", "owner")) == {
+        "updated": users[0].pk,
+        "new": users[0].pk,
+        "other": users[1].pk,
+    }
+
+
+@pytest.mark.django_db(transaction=True)
+def test_bulk_upsert_locks_existing_objects(client, mocker):
+    user = User.objects.create_user(email="apikeyuser@tempurl.com", first_name="API", last_name="Test User")
+    api_key = ApiKey.objects.create(user=user, key="api_key")
+    owned = SimpleModelWithOwner.objects.create(name="owned", owner=user)
+    select_for_update = mocker.spy(QuerySet, "select_for_update")
+
+    response = client.put(
+        OWNER_PATH,
+        headers={"X-API-Key": api_key.key},
+        json=[{"identifier": str(owned.uuid), "fields": {"name": "updated"}}],
+    )
+    assert response.status_code == 200, response.content.decode("utf-8")
+    assert select_for_update.call_count == 1
+
+
+@pytest.mark.django_db(transaction=True)
+def test_bulk_upsert_rejects_objects_created_by_others(client, mocker):
+    users = [
+        User.objects.create_user(email=f"apikeyuser{i}@tempurl.com", first_name="API", last_name="Test User")
+        for i in range(2)
+    ]
+    api_key = ApiKey.objects.create(user=users[0], key="api_key")
+    other = SimpleModelWithOwner.objects.create(name="other", owner=users[1])
+    # The other object is created after the scope check.
+    mocker.patch.object(RouteBuilder, "check_upsert_scope")
+
+    response = client.put(
+        OWNER_PATH,
+        headers={"X-API-Key": api_key.key},
+        json=[
+            {"identifier": str(uuid4()), "fields": {"name": "new"}},
+            {"identifier": str(other.uuid), "fields": {"name": "updated"}},
+        ],
+    )
+    assert response.status_code == 404, response.content.decode("utf-8")
+    assert response.json() == {"detail": f"Objects {other.uuid} not found."}
+    assert list(SimpleModelWithOwner.objects.values_list("name", "owner")) == [("other", users[1].pk)]
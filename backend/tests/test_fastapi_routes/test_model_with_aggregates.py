@@ -0,0 +1,183 @@
+from uuid import UUID
+
+import pytest
+from django.db import connection
+from test_app.models import SimpleModelWithOwner, WideModel
+
+from projectx.api.fastapi import RouteBuilder, check_api_key
+from projectx.users.models import ApiKey, User
+
+WIDE_PATH = "/widemodels/"
+ASYNC_PATH = "/asyncmodels/"
+OWNER_PATH = "/simplemodelwithowners/"
+ESTIMATED_PATH = "/estimatedmodels/count/"
+
+
+@pytest.fixture(name="route_builders")
+def get_route_builders():
+    config = {
+        "identifier": "uuid",
+        "identifier_class": UUID,
+        "filters": {"uuid": ["in"]},
+        "aggregate": {
+            "fields": {"count": ["sum", "min", "max"], "created": ["max"]},
+            "group_by": ["status", "category"],
+        },
+    }
+    return {
+        "wide": RouteBuilder(WideModel, config=config),
+        "async": RouteBuilder(WideModel, config={**config, "name": "AsyncModel", "async": True}),
+        "estimated": RouteBuilder(
+            WideModel, config={**config, "name": "EstimatedModel", "aggregate": {"estimate_threshold": 3}}
+        ),
+        "owner": RouteBuilder(
+            SimpleModelWithOwner,
+            request_fields=["name"],
+            owner_field="owner",
+            config={"identifier": "uuid", "identifier_class": UUID, "aggregate": {"group_by": ["name"]}},
+            authentication=check_api_key,
+        ),
+    }
+
+
+@pytest.fixture(name="instances")
+def create_instances():
+    return [
+        WideModel.objects.create(name=f"name{count}", count=count, status=status, category=category)
+        for count, status, category in [(1, "new", "a"), (2, "new", "b"), (4, "old", "a"), (8, "new", "a")]
+    ]
+
+
+@pytest.mark.parametrize("path", [WIDE_PATH, ASYNC_PATH])
+@pytest.mark.django_db(transaction=True)
+def test_count(client, instances, path):
+    response = client.get(f"{path}count/")
+    assert response.status_code == 200, response.content.decode("utf-8")
+    assert response.json() == {"count": 4, "approximate": False}
+
+    response = client.get(f"{path}count/", params={"uuid__in": [str(instances[0].uuid), str(instances[1].uuid)]})
+    assert response.status_code == 200, response.content.decode("utf-8")
+    assert response.json() == {"count": 2, "approximate": False}
+
+
+@pytest.mark.parametrize("path", [WIDE_PATH, ASYNC_PATH])
+@pytest.mark.django_db(transaction=True)
+def test_aggregate(client, instances, path):
+    response = client.get(f"{path}aggregate/")
+    assert response.status_code == 200, response.content.decode("utf-8")
+    assert response.json() == {
+        "items": [
+            {
+                "count": 4,
+                "count__sum": 15,
+                "count__min": 1,
+                "count__max": 8,
+                "created__max": instances[3].created.isoformat(),
+            }
+        ]
+    }
+
+    response = client.get(f"{path}aggregate/", params={"aggregates": "count__sum", "group_by": "status,category"})
+    assert response.status_code == 200, response.content.decode("utf-8")
+    assert response.json() == {
+        "items": [
+            {"status": "new", "category": "a", "count": 2, "count__sum": 9},
+            {"status": "new", "category": "b", "count": 1, "count__sum": 2},
+            {"status": "old", "category": "a", "count": 1, "count__sum": 4},
+        ]
+    }
+
+    params = {"aggregates": "count__max", "group_by": "status", "uuid__in": [str(instances[2].uuid)]}
+    response = client.get(f"{path}aggregate/", params=params)
+    assert response.status_code == 200, response.content.decode("utf-8")
+    assert response.json() == {"items": [{"status": "old", "count": 1, "count__max": 4}]}
+
+
+@pytest.mark.django_db(transaction=True)
+def test_aggregate_of_nothing(client):
+    response = client.get(f"{WIDE_PATH}aggregate/", params={"aggregates": "count__sum"})
+    assert response.status_code == 200, response.content.decode("utf-8")
+    assert response.json() == {"items": [{"count": 0, "count__sum": None}]}
+
+    response = client.get(f"{WIDE_PATH}aggregate/", params={"group_by": "status"})
+    assert response.status_code == 200, response.content.decode("utf-8")
+    assert response.json() == {"items": []}
+
+
+@pytest.mark.django_db(transaction=True)
+def test_invalid_aggregate(client):
+    response = client.get(f"{WIDE_PATH}aggregate/", params={"aggregates": "count__avg"})
+    assert response.status_code == 400, response.content.decode("utf-8")
+    assert response.json() == {
+        "detail": "Invalid aggregates ['count__avg'], choose from "
+        "['count__max', 'count__min', 'count__sum', 'created__max']."
+    }
+
+    response = client.get(f"{WIDE_PATH}aggregate/", params={"group_by": "name"})
+    assert response.status_code == 400, response.content.decode("utf-8")
+    assert response.json() == {"detail": "Invalid group by fields ['name'], choose from ['category', 'status']."}
+
+
+@pytest.mark.usefixtures("instances")
+@pytest.mark.django_db(transaction=True)
+def test_aggregate_is_one_query(route_builders, django_assert_num_queries):
+    with django_assert_num_queries(1):
+        response = route_builders["wide"].aggregate_response(None, None, (("count__sum",), ("status",)))
+    assert (
+        response.body
+        == b'{"items":[{"status":"new","count":3,"count__sum":11},{"status":"old","count":1,"count__sum":4}]}'
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+def test_aggregate_with_owner(client):
+    users = [
+        User.objects.create_user(email=f"apikeyuser{i}@tempurl.com", first_name="API", last_name="Test User")
+        for i in range(2)
+    ]
+    api_key = ApiKey.objects.create(user=users[0], key="api_key")
+    for user, name in [(users[0], "a"), (users[0], "a"), (users[0], "b"), (users[1], "a")]:
+        SimpleModelWithOwner.objects.create(name=name, owner=user)
+
+    response = client.get(f"{OWNER_PATH}count/", headers={"X-API-Key": api_key.key})
+    assert response.status_code == 200, response.content.decode("utf-8")
+    assert response.json() == {"count": 3, "approximate": False}
+
+    response = client.get(f"{OWNER_PATH}aggregate/", headers={"X-API-Key": api_key.key}, params={"group_by": "name"})
+    assert response.status_code == 200, response.content.decode("utf-8")
+    assert response.json() == {"items": [{"name": "a", "count": 2}, {"name": "b", "count": 1}]}
+
+
+@pytest.mark.django_db(transaction=True)
+def test_estimated_count(client, instances):
+    # Without statistics the rows are counted.
+    response = client.get(ESTIMATED_PATH)
+    assert response.status_code == 200, response.content.decode("utf-8")
+    assert response.json() == {"count": 4, "approximate": False}
+
+    with connection.cursor() as cursor:
+        cursor.execute(f"ANALYZE {WideModel._meta.db_table}")
+
+    response = client.get(ESTIMATED_PATH)
+    assert response.status_code == 200, response.content.decode("utf-8")
+    assert response.json() == {"count": 4, "approximate": True}
+
+    # Filtered counts are estimated by the query planner, and counted when the estimate is below the threshold.
+    params = {"uuid__in": [str(instance.uuid) for instance in instances[:3]]}
+    response = client.get(ESTIMATED_PATH, params=params)
+    assert response.status_code == 200, response.content.decode("utf-8")
+    assert response.json() == {"count": 3, "approximate": True}
+
+    response = client.get(ESTIMATED_PATH, params={"uuid__in": [str(instances[0].uuid)]})
+    assert response.status_code == 200, response.content.decode("utf-8")
+    assert response.json() == {"count": 1, "approximate": False}
+
+
+@pytest.mark.usefixtures("instances")
+@pytest.mark.django_db(transaction=True)
+def test_estimated_count_is_one_query(route_builders, django_assert_num_queries):
+    with connection.cursor() as cursor:
+        cursor.execute(f"ANALYZE {WideModel._meta.db_table}")
+
+    with django_assert_num_queries(1):
+        assert route_builders["estimated"].count(None, None).approximate
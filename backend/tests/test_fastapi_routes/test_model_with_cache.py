@@ -0,0 +1,214 @@
+from uuid import UUID
+
+import pytest
+from django.core.cache import caches
+from django.db import transaction
+from test_app.models import (
+    Choice,
+    Pizza,
+    Question,
+    SimpleIDModel,
+    SimpleModel,
+    SimpleModelWithOwner,
+    SimpleTimeStampedModel,
+    Topping,
+)
+
+from projectx.api.fastapi import RouteBuilder, check_api_key
+from projectx.users.models import ApiKey, User
+
+BASE_PATH = "/simplemodels/"
+ASYNC_PATH = "/asyncmodels/"
+VALUES_PATH = "/simpletimestampedmodels/"
+OWNER_PATH = "/simplemodelwithowners/"
+QUESTIONS_PATH = "/questions/"
+PIZZAS_PATH = "/pizzas/"
+STRING_PATH = "/stringmodels/"
+ID_PATH = "/simpleidmodels/"
+
+
+@pytest.fixture(name="locmem_cache", autouse=True)
+def locmem_cache_fixture(settings):
+    settings.CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+    yield caches["default"]
+    caches["default"].clear()
+
+
+@pytest.fixture(name="route_builders")
+def get_route_builders():
+    config = {"identifier": "uuid", "identifier_class": UUID, "cache": {"timeout": 60}}
+    return {
+        "sync": RouteBuilder(SimpleModel, response_fields=["uuid", "name"], config=config),
+        "async": RouteBuilder(
+            SimpleModel, response_fields=["uuid", "name"], config={**config, "name": "AsyncModel", "async": True}
+        ),
+        "values": RouteBuilder(
+            SimpleTimeStampedModel,
+            request_fields=["name"],
+            response_fields=["uuid", "name"],
+            config={**config, "fast_serialization": True, "pagination": {}},
+        ),
+        "owner": RouteBuilder(
+            SimpleModelWithOwner,
+            request_fields=["name"],
+            response_fields=["uuid", "name"],
+            owner_field="owner",
+            config=config,
+            authentication=check_api_key,
+        ),
+        "question": RouteBuilder(Question, config=config),
+        "pizza": RouteBuilder(Pizza, config=config),
+        "string": RouteBuilder(
+            SimpleModel,
+            response_fields=["name"],
+            config={"identifier": "uuid", "name": "StringModel", "cache": {"timeout": 60}},
+        ),
+        "id": RouteBuilder(SimpleIDModel, config={"cache": {"timeout": 60}}),
+    }
+
+
+def get_json(client, path, status, **kwargs):
+    response = client.get(path, **kwargs)
+    assert response.status_code == 200, response.content.decode("utf-8")
+    assert response.headers["X-Cache"] == status
+    return response.json()
+
+
+@pytest.mark.parametrize("path, builder", [(BASE_PATH, "sync"), (ASYNC_PATH, "async")])
+@pytest.mark.django_db(transaction=True)
+def test_cache_get_and_list(client, route_builders, path, builder):
+    instance = SimpleModel.objects.create(name="name")
+    other = SimpleModel.objects.create(name="other")
+
+    assert get_json(client, f"{path}{instance.uuid}/", "MISS") == {"uuid": str(instance.uuid), "name": "name"}
+    assert get_json(client, f"{path}{instance.uuid}/", "HIT") == {"uuid": str(instance.uuid), "name": "name"}
+    assert get_json(client, f"{path}{instance.uuid}/", "MISS", params={"fields": "name"}) == {"name": "name"}
+    assert len(get_json(client, path, "MISS")["items"]) == 2
+    assert len(get_json(client, path, "HIT")["items"]) == 2
+    assert route_builders[builder].response_cache.stats() == {"hits": 2, "misses": 3}
+
+    # Changing another instance leaves cached single instances alone, but not lists.
+    response = client.patch(f"{path}{other.uuid}/", json={"name": "other2"})
+    assert response.status_code == 200, response.content.decode("utf-8")
+    get_json(client, f"{path}{instance.uuid}/", "HIT")
+    get_json(client, path, "MISS")
+
+    response = client.put(f"{path}{instance.uuid}/", json={"name": "name2"})
+    assert response.status_code == 200, response.content.decode("utf-8")
+    assert get_json(client, f"{path}{instance.uuid}/", "MISS")["name"] == "name2"
+
+    # Writes from outside the API are picked up through signals.
+    SimpleModel.objects.get(pk=instance.pk).save()
+    get_json(client, f"{path}{instance.uuid}/", "MISS")
+
+    response = client.post(path, json={"name": "new", "config": {}})
+    assert response.status_code == 200, response.content.decode("utf-8")
+    assert len(get_json(client, path, "MISS")["items"]) == 3
+
+    response = client.delete(f"{path}{instance.uuid}/")
+    assert response.status_code == 200, response.content.decode("utf-8")
+    response = client.get(f"{path}{instance.uuid}/")
+    assert response.status_code == 404, response.content.decode("utf-8")
+
+
+@pytest.mark.django_db(transaction=True)
+def test_cache_with_values_and_pagination(client):
+    instances = [SimpleTimeStampedModel.objects.create(name=f"name{i}") for i in range(3)]
+
+    page = get_json(client, VALUES_PATH, "MISS", params={"limit": 2})
+    assert page["items"] == [{"uuid": str(instance.uuid), "name": instance.name} for instance in instances[:2]]
+    assert get_json(client, VALUES_PATH, "HIT", params={"limit": 2}) == page
+    assert get_json(client, VALUES_PATH, "MISS", params={"limit": 2, "cursor": page["next"]})["next"] is None
+
+    assert get_json(client, f"{VALUES_PATH}{instances[0].uuid}/", "MISS")["name"] == "name0"
+    assert get_json(client, f"{VALUES_PATH}{instances[0].uuid}/", "HIT")["name"] == "name0"
+
+
+@pytest.mark.django_db(transaction=True)
+def test_cache_is_scoped_by_owner(client):
+    api_keys = []
+    for name in ("user1", "user2"):
+        user = User.objects.create_user(email=f"{name}@tempurl.com", first_name=name, last_name="Test User")
+        SimpleModelWithOwner.objects.create(name=name, owner=user)
+        api_keys.append(ApiKey.objects.create(user=user, key=name))
+
+    for api_key in api_keys:
+        items = get_json(client, OWNER_PATH, "MISS", headers={"X-API-Key": api_key.key})["items"]
+        assert [item["name"] for item in items] == [api_key.key]
+
+
+@pytest.mark.django_db(transaction=True)
+def test_cache_invalidated_by_related_models(client):
+    question = Question.objects.create(name="question")
+    get_json(client, f"{QUESTIONS_PATH}{question.uuid}/", "MISS")
+    choice = Choice.objects.create(name="choice", question=question)
+    assert get_json(client, f"{QUESTIONS_PATH}{question.uuid}/", "MISS")["choices"] == [{"uuid": str(choice.uuid)}]
+
+    pizza = Pizza.objects.create(name="pizza")
+    topping = Topping.objects.create(name="topping")
+    get_json(client, f"{PIZZAS_PATH}{pizza.uuid}/", "MISS")
+    get_json(client, f"{PIZZAS_PATH}{pizza.uuid}/", "HIT")
+    pizza.toppings.add(topping)
+    assert get_json(client, f"{PIZZAS_PATH}{pizza.uuid}/", "MISS")["toppings"] == [{"uuid": str(topping.uuid)}]
+
+
+@pytest.mark.django_db(transaction=True)
+def test_cache_versions_bumped_on_commit(client):
+    instance = SimpleModel.objects.create(name="name")
+    get_json(client, BASE_PATH, "MISS")
+
+    with transaction.atomic():
+        instance.name = "name2"
+        instance.save()
+        # A concurrent read still sees the committed row, so it must not be stored under the version of the write.
+        assert get_json(client, BASE_PATH, "HIT")["items"] == [{"uuid": str(instance.uuid), "name": "name"}]
+
+    assert get_json(client, BASE_PATH, "MISS")["items"] == [{"uuid": str(instance.uuid), "name": "name2"}]
+
+
+@pytest.mark.django_db(transaction=True)
+def test_cache_keys_use_the_stored_identifier(client, route_builders):
+    instance = SimpleModel.objects.create(name="name")
+    id_instance = SimpleIDModel.objects.create(name="name")
+
+    for path, identifier, other_identifier in [
+        (STRING_PATH, str(instance.uuid).upper(), str(instance.uuid)),
+        (ID_PATH, f"0{id_instance.pk}", str(id_instance.pk)),
+    ]:
+        get_json(client, f"{path}{identifier}/", "MISS")
+        get_json(client, f"{path}{other_identifier}/", "HIT")
+
+        response = client.put(f"{path}{other_identifier}/", json={"name": "name2"})
+        assert response.status_code == 200, response.content.decode("utf-8")
+        assert get_json(client, f"{path}{identifier}/", "MISS")["name"] == "name2"
+
+    # An identifier which is not valid for the field can not match an object, but still has a key.
+    assert route_builders["id"].response_cache.identifier_key("one") == "one"
+
+
+@pytest.mark.django_db(transaction=True)
+def test_cache_versions_expire(route_builders, locmem_cache, mocker):
+    response_cache = route_builders["sync"].response_cache
+    add = mocker.spy(locmem_cache, "add")
+
+    response_cache.list_key(None, None, None)
+    response_cache.invalidate_all()
+
+    assert response_cache.version_timeout == 600
+    assert {call.kwargs["timeout"] for call in add.call_args_list} == {600}
+
+
+@pytest.mark.django_db(transaction=True)
+def test_cache_versions_restart_after_eviction(route_builders, locmem_cache):
+    instance = SimpleModel.objects.create(name="name")
+    response_cache = route_builders["sync"].response_cache
+
+    key = response_cache.get_key(instance.uuid, None, None)
+    assert response_cache.get_key(instance.uuid, None, None) == key
+
+    locmem_cache.clear()
+    assert response_cache.get_key(instance.uuid, None, None) != key
+
+    locmem_cache.clear()
+    response_cache.invalidate_all()
+    assert locmem_cache.get(response_cache.list_version_key)
@@ -0,0 +1,207 @@
+import time
+from uuid import UUID
+
+import pytest
+from django.utils.http import http_date
+from fastapi.testclient import TestClient
+from test_app.models import (
+    Ingredient,
+    Recipe,
+    SimpleModel,
+    SimpleTimeStampedModel,
+    Step,
+)
+
+from projectx.api.fastapi import RouteBuilder
+
+BASE_PATH = "/simpletimestampedmodels/"
+ASYNC_PATH = "/asyncmodels/"
+PAGED_PATH = "/pagedmodels/"
+RECIPE_PATH = "/recipes/"
+ASYNC_RECIPE_PATH = "/asyncrecipes/"
+
+
+@pytest.mark.django_db(transaction=True)
+@pytest.fixture(name="client")
+def get_client(app, router):
+    config = {"identifier": "uuid", "identifier_class": UUID, "conditional": {}}
+    RouteBuilder(
+        SimpleTimeStampedModel, request_fields=["name"], response_fields=["uuid", "name"], config=config
+    ).add_all_routes(router)
+    RouteBuilder(
+        SimpleModel, response_fields=["uuid", "name"], config={**config, "name": "AsyncModel", "async": True}
+    ).add_all_routes(router)
+    RouteBuilder(
+        SimpleTimeStampedModel,
+        response_fields=["name"],
+        config={**config, "name": "PagedModel", "conditional": {"field": "modified"}, "pagination": {"page_size": 2}},
+    ).add_list_route_to_router(router)
+    RouteBuilder(Recipe, response_fields=["name", "ingredients", "steps"], config=config).add_all_routes(router)
+    RouteBuilder(
+        Recipe,
+        response_fields=["name", "ingredients", "steps"],
+        config={**config, "name": "AsyncRecipe", "async": True},
+    ).add_all_routes(router)
+    app.include_router(router)
+    return TestClient(app)
+
+
+@pytest.mark.parametrize("path, model", [(BASE_PATH, SimpleTimeStampedModel), (ASYNC_PATH, SimpleModel)])
+@pytest.mark.django_db(transaction=True)
+def test_conditional_get(client, path, model):
+    instance = model.objects.create(name="name")
+
+    response = client.get(f"{path}{instance.uuid}/")
+    assert response.status_code == 200, response.content.decode("utf-8")
+    assert response.json() == {"uuid": str(instance.uuid), "name": "name"}
+    etag = response.headers["ETag"]
+    last_modified = response.headers["Last-Modified"]
+    assert etag.startswith('W/"')
+
+    response = client.get(f"{path}{instance.uuid}/", headers={"If-None-Match": etag})
+    assert response.status_code == 304, response.content.decode("utf-8")
+    assert response.content == b""
+    assert response.headers["ETag"] == etag
+
+    # The weak comparison also matches the strong form of the ETag, and any one of a list.
+    response = client.get(f"{path}{instance.uuid}/", headers={"If-None-Match": f'"other", {etag[2:]}'})
+    assert response.status_code == 304, response.content.decode("utf-8")
+
+    response = client.get(f"{path}{instance.uuid}/", headers={"If-Modified-Since": last_modified})
+    assert response.status_code == 304, response.content.decode("utf-8")
+
+    response = client.get(f"{path}{instance.uuid}/", headers={"If-Modified-Since": "not a date"})
+    assert response.status_code == 200, response.content.decode("utf-8")
+
+    response = client.get(f"{path}{instance.uuid}/", headers={"If-None-Match": etag}, params={"fields": "name"})
+    assert response.status_code == 200, response.content.decode("utf-8")
+    assert response.json() == {"name": "name"}
+
+    response = client.patch(f"{path}{instance.uuid}/", json={"name": "name2"})
+    assert response.status_code == 200, response.content.decode("utf-8")
+
+    response = client.get(f"{path}{instance.uuid}/", headers={"If-None-Match": etag})
+    assert response.status_code == 200, response.content.decode("utf-8")
+    assert response.json() == {"uuid": str(instance.uuid), "name": "name2"}
+    assert response.headers["ETag"] != etag
+
+    instance.delete()
+    response = client.get(f"{path}{instance.uuid}/", headers={"If-None-Match": "*"})
+    assert response.status_code == 404, response.content.decode("utf-8")
+
+
+@pytest.mark.parametrize("path", [RECIPE_PATH, ASYNC_RECIPE_PATH])
+@pytest.mark.django_db(transaction=True)
+def test_conditional_get_after_changing_links(client, path):
+    ingredients = [Ingredient.objects.create(name=f"ingredient{i}") for i in range(2)]
+    instance = Recipe.objects.create(name="name")
+    instance.ingredients.set([ingredients[0]])
+
+    response = client.get(f"{path}{instance.uuid}/")
+    assert response.status_code == 200, response.content.decode("utf-8")
+    etag = response.headers["ETag"]
+
+    # Only the links change, so the modification time must be touched for the ETag to change.
+    response = client.patch(f"{path}{instance.uuid}/", json={"ingredients": [{"id": ingredients[1].pk}]})
+    assert response.status_code == 200, response.content.decode("utf-8")
+    assert Recipe.objects.get().last_updated > instance.last_updated
+
+    response = client.get(f"{path}{instance.uuid}/", headers={"If-None-Match": etag})
+    assert response.status_code == 200, response.content.decode("utf-8")
+    assert response.json() == {"name": "name", "ingredients": [{"id": ingredients[1].pk}], "steps": []}
+    etag = response.headers["ETag"]
+
+    # Setting the same links changes nothing.
+    response = client.patch(f"{path}{instance.uuid}/", json={"ingredients": [{"id": ingredients[1].pk}]})
+    assert response.status_code == 200, response.content.decode("utf-8")
+    response = client.get(f"{path}{instance.uuid}/", headers={"If-None-Match": etag})
+    assert response.status_code == 304, response.content.decode("utf-8")
+
+
+@pytest.mark.parametrize("path", [RECIPE_PATH, ASYNC_RECIPE_PATH])
+@pytest.mark.django_db(transaction=True)
+def test_conditional_get_after_changing_related_objects(client, path):
+    ingredient = Ingredient.objects.create(name="ingredient")
+    instance = Recipe.objects.create(name="name")
+    instance.ingredients.set([ingredient])
+
+    response = client.get(f"{path}{instance.uuid}/")
+    assert response.status_code == 200, response.content.decode("utf-8")
+    etag = response.headers["ETag"]
+
+    # Neither write touches the recipe itself.
+    ingredient.save()
+    response = client.get(f"{path}{instance.uuid}/", headers={"If-None-Match": etag})
+    assert response.status_code == 200, response.content.decode("utf-8")
+    etag = response.headers["ETag"]
+
+    step = Step.objects.create(name="step", recipe=instance)
+    response = client.get(f"{path}{instance.uuid}/", headers={"If-None-Match": etag})
+    assert response.status_code == 200, response.content.decode("utf-8")
+    assert response.json()["steps"] == [{"id": step.pk}]
+    etag = response.headers["ETag"]
+
+    response = client.get(f"{path}{instance.uuid}/", headers={"If-None-Match": etag})
+    assert response.status_code == 304, response.content.decode("utf-8")
+
+    # Deleting a related object leaves the latest modification time, but changes the count.
+    step.delete()
+    response = client.get(f"{path}{instance.uuid}/", headers={"If-None-Match": etag})
+    assert response.status_code == 200, response.content.decode("utf-8")
+    assert response.json()["steps"] == []
+
+    response = client.get(path, headers={"If-None-Match": etag})
+    assert response.status_code == 200, response.content.decode("utf-8")
+    response = client.get(path, headers={"If-None-Match": response.headers["ETag"]})
+    assert response.status_code == 304, response.content.decode("utf-8")
+
+
+@pytest.mark.parametrize("path, model", [(BASE_PATH, SimpleTimeStampedModel), (ASYNC_PATH, SimpleModel)])
+@pytest.mark.django_db(transaction=True)
+def test_conditional_list(client, path, model):
+    instances = [model.objects.create(name=f"name{i}") for i in range(2)]
+
+    response = client.get(path)
+    assert response.status_code == 200, response.content.decode("utf-8")
+    etag = response.headers["ETag"]
+
+    response = client.get(path, headers={"If-None-Match": etag})
+    assert response.status_code == 304, response.content.decode("utf-8")
+    assert "Last-Modified" not in response.headers
+
+    # Deleting a row does not change the latest modification time, but must still change the ETag, and lists ignore
+    # If-Modified-Since.
+    instances[0].delete()
+    response = client.get(path, headers={"If-None-Match": etag})
+    assert response.status_code == 200, response.content.decode("utf-8")
+    assert len(response.json()["items"]) == 1
+
+    response = client.get(path, headers={"If-Modified-Since": http_date(time.time() + 60)})
+    assert response.status_code == 200, response.content.decode("utf-8")
+
+    instances[1].delete()
+    response = client.get(path)
+    assert response.status_code == 200, response.content.decode("utf-8")
+    assert "Last-Modified" not in response.headers
+
+
+@pytest.mark.django_db(transaction=True)
+def test_conditional_paginated_list(client):
+    for i in range(3):
+        SimpleTimeStampedModel.objects.create(name=f"name{i}")
+
+    response = client.get(PAGED_PATH)
+    assert response.status_code == 200, response.content.decode("utf-8")
+    etag = response.headers["ETag"]
+    next_cursor = response.json()["next"]
+
+    response = client.get(PAGED_PATH, headers={"If-None-Match": etag})
+    assert response.status_code == 304, response.content.decode("utf-8")
+
+    response = client.get(PAGED_PATH, headers={"If-None-Match": etag}, params={"cursor": next_cursor})
+    assert response.status_code == 200, response.content.decode("utf-8")
+    assert response.json() == {"items": [{"name": "name2"}], "next": None}
+
+    response = client.get(PAGED_PATH, params={"cursor": "not-base64!"})
+    assert response.status_code == 400, response.content.decode("utf-8")
+    assert response.json() == {"detail": "Invalid cursor."}
@@ -1,5 +1,6 @@
 import pytest
 from django.db.models import Q
+from fastapi import HTTPException
 from fastapi.testclient import TestClient
 from test_app.models import SimpleModel
 
@@ -51,7 +52,7 @@ def test_filtering_with_get(client, simple_model1, simple_model2):
 
     response = client.get(f"{BASE_PATH}{simple_model2.pk}/")
     assert response.status_code == 404, response.content.decode("utf-8")
-    assert response.json() == {"detail": "Object not found."}
+    assert response.json() == {"detail": f"Object {simple_model2.pk} not found."}
 
 
 @pytest.mark.django_db(transaction=True)
@@ -62,7 +63,7 @@ def test_filtering_with_patch(client, simple_model1, simple_model2):
 
     response = client.patch(f"{BASE_PATH}{simple_model2.pk}/", json={"name": "new_name"})
     assert response.status_code == 404, response.content.decode("utf-8")
-    assert response.json() == {"detail": "Object not found."}
+    assert response.json() == {"detail": f"Object {simple_model2.pk} not found."}
 
 
 @pytest.mark.django_db(transaction=True)
@@ -73,7 +74,7 @@ def test_filtering_with_put(client, simple_model1, simple_model2):
 
     response = client.put(f"{BASE_PATH}{simple_model2.pk}/", json={"name": "new_name"})
     assert response.status_code == 404, response.content.decode("utf-8")
-    assert response.json() == {"detail": "Object not found."}
+    assert response.json() == {"detail": f"Object {simple_model2.pk} not found."}
 
 
 @pytest.mark.django_db(transaction=True)
@@ -84,4 +85,21 @@ def test_filtering_with_delete(client, simple_model1, simple_model2):
 
     response = client.delete(f"{BASE_PATH}{simple_model2.pk}/")
     assert response.status_code == 404, response.content.decode("utf-8")
-    assert response.json() == {"detail": "Object not found."}
+    assert response.json() == {"detail": f"Object {simple_model2.pk} not found."}
+
+
+@pytest.mark.django_db(transaction=True)
+def test_filtering_resolves_instance_in_one_query(simple_model1, simple_model2, django_assert_num_queries):
+    def filter_by_name(_):
+        return Q(name__contains="XXX")
+
+    route_builder = RouteBuilder(SimpleModel, response_fields=["name"], query_filter=filter_by_name)
+
+    with django_assert_num_queries(1):
+        assert route_builder.get_function(simple_model1.pk, None) == simple_model1
+
+    with django_assert_num_queries(1):
+        with pytest.raises(HTTPException) as not_found:
+            route_builder.get_function(simple_model2.pk, None)
+
+    assert not_found.value.detail == f"Object {simple_model2.pk} not found."
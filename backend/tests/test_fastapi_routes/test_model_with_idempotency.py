@@ -0,0 +1,125 @@
+from uuid import UUID
+
+import pytest
+from django.core.cache import caches
+from test_app.models import SimpleModel, SimpleModelWithOwner
+
+from projectx.api.fastapi import RouteBuilder, check_api_key
+from projectx.users.models import ApiKey, User
+
+BASE_PATH = "/simplemodels/"
+ASYNC_PATH = "/asyncmodels/"
+OWNER_PATH = "/simplemodelwithowners/"
+
+
+@pytest.fixture(name="locmem_cache", autouse=True)
+def locmem_cache_fixture(settings):
+    settings.CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+    yield caches["default"]
+    caches["default"].clear()
+
+
+@pytest.fixture(name="route_builders")
+def get_route_builders():
+    config = {"identifier": "uuid", "identifier_class": UUID, "bulk": {}, "idempotency": {"lock_timeout": 0.2}}
+    return {
+        "sync": RouteBuilder(SimpleModel, response_fields=["uuid", "name"], config=config),
+        "async": RouteBuilder(
+            SimpleModel, response_fields=["uuid", "name"], config={**config, "name": "AsyncModel", "async": True}
+        ),
+        "owner": RouteBuilder(
+            SimpleModelWithOwner,
+            request_fields=["name"],
+            response_fields=["uuid", "name"],
+            owner_field="owner",
+            config=config,
+            authentication=check_api_key,
+        ),
+    }
+
+
+@pytest.mark.parametrize("path", [BASE_PATH, ASYNC_PATH])
+@pytest.mark.django_db(transaction=True)
+def test_idempotent_create(client, path):
+    response = client.post(path, json={"name": "name"}, headers={"Idempotency-Key": "key"})
+    assert response.status_code == 200, response.content.decode("utf-8")
+    assert "Idempotent-Replayed" not in response.headers
+    created = response.json()
+
+    response = client.post(path, json={"name": "name"}, headers={"Idempotency-Key": "key"})
+    assert response.status_code == 200, response.content.decode("utf-8")
+    assert response.headers["Idempotent-Replayed"] == "true"
+    assert response.json() == created
+    assert SimpleModel.objects.count() == 1
+
+    response = client.post(path, json={"name": "other"}, headers={"Idempotency-Key": "key"})
+    assert response.status_code == 422, response.content.decode("utf-8")
+    assert response.json() == {"detail": "The Idempotency-Key has already been used for a different request."}
+
+    for key in ["key2", None]:
+        headers = {"Idempotency-Key": key} if key else {}
+        response = client.post(path, json={"name": "name"}, headers=headers)
+        assert response.status_code == 200, response.content.decode("utf-8")
+    assert SimpleModel.objects.count() == 3
+
+
+@pytest.mark.parametrize("path", [f"{BASE_PATH}bulk/", f"{ASYNC_PATH}bulk/"])
+@pytest.mark.django_db(transaction=True)
+def test_idempotent_bulk_create(client, path):
+    body = [{"name": "name0"}, {"name": "name1"}]
+
+    response = client.post(path, json=body, headers={"Idempotency-Key": "key"})
+    assert response.status_code == 200, response.content.decode("utf-8")
+    created = response.json()
+
+    response = client.post(path, json=body, headers={"Idempotency-Key": "key"})
+    assert response.status_code == 200, response.content.decode("utf-8")
+    assert response.headers["Idempotent-Replayed"] == "true"
+    assert response.json() == created
+    assert SimpleModel.objects.count() == 2
+
+    # The same key is independent on the single create route.
+    response = client.post(BASE_PATH, json={"name": "name0"}, headers={"Idempotency-Key": "key"})
+    assert response.status_code == 200, response.content.decode("utf-8")
+    assert SimpleModel.objects.count() == 3
+
+
+@pytest.mark.django_db(transaction=True)
+def test_failed_requests_are_not_stored(client):
+    response = client.post(f"{BASE_PATH}bulk/", json=[{"name": ""}], headers={"Idempotency-Key": "key"})
+    assert response.status_code == 422, response.content.decode("utf-8")
+
+    response = client.post(f"{BASE_PATH}bulk/", json=[{"name": "name"}], headers={"Idempotency-Key": "key"})
+    assert response.status_code == 200, response.content.decode("utf-8")
+    assert "Idempotent-Replayed" not in response.headers
+    assert SimpleModel.objects.count() == 1
+
+
+@pytest.mark.parametrize("route_builder_name, path", [("sync", BASE_PATH), ("async", ASYNC_PATH)])
+@pytest.mark.django_db(transaction=True)
+def test_request_in_progress(client, route_builders, locmem_cache, route_builder_name, path):
+    store = route_builders[route_builder_name].idempotency_store
+    locmem_cache.add(f"{store.key('post', None, 'key')}:lock", 1)
+
+    response = client.post(path, json={"name": "name"}, headers={"Idempotency-Key": "key"})
+    assert response.status_code == 409, response.content.decode("utf-8")
+    assert response.json() == {"detail": "A request with this Idempotency-Key is already in progress."}
+    assert not SimpleModel.objects.exists()
+
+
+@pytest.mark.django_db(transaction=True)
+def test_keys_are_per_user(client):
+    users = [
+        User.objects.create_user(email=f"apikeyuser{i}@tempurl.com", first_name="API", last_name="Test User")
+        for i in range(2)
+    ]
+    api_keys = [ApiKey.objects.create(user=user, key=f"api_key{i}") for i, user in enumerate(users)]
+
+    for api_key in api_keys:
+        response = client.post(
+            OWNER_PATH, json={"name": "name"}, headers={"X-API-Key": api_key.key, "Idempotency-Key": "key"}
+        )
+        assert response.status_code == 200, response.content.decode("utf-8")
+        assert "Idempotent-Replayed" not in response.headers
+
+    assert SimpleModelWithOwner.objects.filter(owner__in=users).count() == 2
@@ -0,0 +1,111 @@
+from uuid import UUID
+
+import pytest
+from test_app.models import Pizza, SimpleModel, Topping
+
+from projectx.api.fastapi import InvalidReturnException, RouteBuilder
+from projectx.api.prefer import return_preference
+
+BASE_PATH = "/simplemodels/"
+ASYNC_PATH = "/asyncmodels/"
+MINIMAL_PATH = "/minimalmodels/"
+PIZZAS_PATH = "/pizzas/"
+MINIMAL = {"Prefer": "return=minimal"}
+
+
+@pytest.fixture(name="route_builders")
+def get_route_builders():
+    config = {"identifier": "uuid", "identifier_class": UUID, "bulk": {}}
+    return {
+        "sync": RouteBuilder(SimpleModel, response_fields=["uuid", "name"], config=config),
+        "async": RouteBuilder(
+            SimpleModel, response_fields=["uuid", "name"], config={**config, "name": "AsyncModel", "async": True}
+        ),
+        "minimal": RouteBuilder(
+            SimpleModel,
+            response_fields=["uuid", "name"],
+            config={**config, "name": "MinimalModel", "return": "minimal"},
+        ),
+        "pizza": RouteBuilder(Pizza, config=config),
+    }
+
+
+@pytest.mark.parametrize(
+    "path, headers", [(BASE_PATH, MINIMAL), (ASYNC_PATH, MINIMAL), (MINIMAL_PATH, {"Prefer": "respond-async"})]
+)
+@pytest.mark.django_db(transaction=True)
+def test_minimal_writes(client, path, headers):
+    response = client.post(path, json={"name": "name"}, headers=headers)
+    assert response.status_code == 201, response.content.decode("utf-8")
+    instance = SimpleModel.objects.get()
+    assert response.json() == {"uuid": str(instance.uuid)}
+    assert response.headers["Preference-Applied"] == "return=minimal"
+
+    response = client.patch(f"{path}{instance.uuid}/", json={"name": "patched"}, headers=headers)
+    assert response.status_code == 204, response.content.decode("utf-8")
+    assert response.content == b""
+    assert SimpleModel.objects.get().name == "patched"
+
+    response = client.put(f"{path}{instance.uuid}/", json={"name": "put", "config": {}}, headers=headers)
+    assert response.status_code == 204, response.content.decode("utf-8")
+    assert SimpleModel.objects.get().name == "put"
+
+    response = client.post(f"{path}bulk/", json=[{"name": "name0"}, {"name": "name1"}], headers=headers)
+    assert response.status_code == 201, response.content.decode("utf-8")
+    uuids = SimpleModel.objects.filter(name__in=["name0", "name1"]).order_by("name").values_list("uuid", flat=True)
+    assert response.json() == {"items": [{"uuid": str(uuid)} for uuid in uuids]}
+
+    response = client.delete(f"{path}{instance.uuid}/", headers=headers)
+    assert response.status_code == 204, response.content.decode("utf-8")
+    assert SimpleModel.objects.count() == 2
+
+
+@pytest.mark.parametrize("path, headers", [(BASE_PATH, {}), (MINIMAL_PATH, {"Prefer": "return=representation"})])
+@pytest.mark.django_db(transaction=True)
+def test_representation_writes(client, path, headers):
+    response = client.post(path, json={"name": "name"}, headers=headers)
+    assert response.status_code == 200, response.content.decode("utf-8")
+    instance = SimpleModel.objects.get()
+    assert response.json() == {"uuid": str(instance.uuid), "name": "name"}
+    assert "Preference-Applied" not in response.headers
+
+    response = client.delete(f"{path}{instance.uuid}/", headers=headers)
+    assert response.status_code == 200, response.content.decode("utf-8")
+    assert response.json() == {"uuid": str(instance.uuid), "name": "name"}
+
+
+@pytest.mark.django_db(transaction=True)
+def test_minimal_writes_do_not_load_related_objects(client, route_builders, django_assert_num_queries):
+    toppings = [Topping.objects.create(name=f"topping{i}") for i in range(2)]
+    pizza = Pizza.objects.create(name="pizza")
+    pizza.toppings.set(toppings)
+    api_instance = route_builders["pizza"].updating_schema(name="new")
+
+    # Load the pizza without prefetching its toppings, then update its name.
+    with django_assert_num_queries(2):
+        instance = route_builders["pizza"].get_instance(pizza.uuid, prefetch=False)
+        api_instance.update_instance(instance, fields_to_update={"name": "new"})
+
+    response = client.patch(f"{PIZZAS_PATH}{pizza.uuid}/", json={"name": "newer"}, headers=MINIMAL)
+    assert response.status_code == 204, response.content.decode("utf-8")
+    assert Pizza.objects.get().name == "newer"
+
+
+@pytest.mark.parametrize(
+    "prefer, expected",
+    [
+        (None, "representation"),
+        ("return=minimal", "minimal"),
+        ('respond-async, RETURN="minimal"; param=1', "minimal"),
+        ("return=other", "representation"),
+    ],
+)
+def test_return_preference(prefer, expected):
+    assert return_preference(prefer) == expected
+
+
+def test_invalid_return_config():
+    with pytest.raises(InvalidReturnException) as invalid_ex:
+        RouteBuilder(SimpleModel, config={"return": "nothing"})
+
+    assert str(invalid_ex.value) == "Return preference nothing not in ['minimal', 'representation']."
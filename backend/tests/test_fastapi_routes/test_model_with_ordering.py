@@ -0,0 +1,95 @@
+from datetime import timedelta
+from uuid import UUID
+
+import pytest
+from django.core.cache import caches
+from django.utils import timezone
+from test_app.models import SimpleTimeStampedModel
+
+from projectx.api.fastapi import RouteBuilder
+
+BASE_PATH = "/simpletimestampedmodels/"
+ASYNC_PATH = "/asyncmodels/"
+UNORDERED_PATH = "/unorderedmodels/"
+
+
+@pytest.fixture(name="route_builders")
+def get_route_builders():
+    config = {
+        "identifier": "uuid",
+        "identifier_class": UUID,
+        "ordering": {"fields": ["created", "modified", "name"], "default": "-created"},
+    }
+    return {
+        "sync": RouteBuilder(SimpleTimeStampedModel, response_fields=["name"], config={**config, "cache": {}}),
+        "async": RouteBuilder(
+            SimpleTimeStampedModel, response_fields=["name"], config={**config, "name": "AsyncModel", "async": True}
+        ),
+        "unordered": RouteBuilder(
+            SimpleTimeStampedModel,
+            response_fields=["uuid", "name"],
+            config={**config, "name": "UnorderedModel", "ordering": {"fields": ["name"]}},
+        ),
+    }
+
+
+def names(response):
+    assert response.status_code == 200, response.content.decode("utf-8")
+    return [item["name"] for item in response.json()["items"]]
+
+
+@pytest.fixture(name="instances")
+def create_instances():
+    now = timezone.now()
+    instances = []
+    for index, (name, days) in enumerate([("b", 0), ("a", 1), ("b", 2), ("a", 0)]):
+        instance = SimpleTimeStampedModel.objects.create(name=name)
+        SimpleTimeStampedModel.objects.filter(pk=instance.pk).update(
+            created=now + timedelta(days=days), modified=now + timedelta(seconds=index)
+        )
+        instances.append(instance)
+    return instances
+
+
+@pytest.mark.parametrize("path", [BASE_PATH, ASYNC_PATH])
+@pytest.mark.usefixtures("instances")
+@pytest.mark.django_db(transaction=True)
+def test_ordering(client, path):
+    assert names(client.get(path)) == ["b", "a", "b", "a"]
+    assert names(client.get(path, params={"ordering": "created"})) == ["b", "a", "a", "b"]
+    assert names(client.get(path, params={"ordering": "name,-modified"})) == ["a", "a", "b", "b"]
+    assert names(client.get(path, params={"ordering": "-modified"})) == ["a", "b", "a", "b"]
+
+
+@pytest.mark.django_db(transaction=True)
+def test_ordering_tiebreaker(client):
+    instances = [SimpleTimeStampedModel.objects.create(name=f"name{i}") for i in range(3)]
+    SimpleTimeStampedModel.objects.update(name="name")
+    # Updating a row moves it to the end of the table.
+    SimpleTimeStampedModel.objects.filter(pk=instances[0].pk).update(modified=timezone.now())
+    uuids = [str(instance.uuid) for instance in instances]
+
+    for params in [{"ordering": "name"}, {}]:
+        response = client.get(UNORDERED_PATH, params=params)
+        assert response.status_code == 200, response.content.decode("utf-8")
+        assert [item["uuid"] for item in response.json()["items"]] == uuids
+
+
+@pytest.mark.django_db(transaction=True)
+def test_invalid_ordering(client):
+    response = client.get(BASE_PATH, params={"ordering": "name,-uuid"})
+    assert response.status_code == 400, response.content.decode("utf-8")
+    assert response.json() == {"detail": "Invalid ordering ['uuid'], choose from ['created', 'modified', 'name']."}
+
+
+@pytest.mark.usefixtures("instances")
+@pytest.mark.django_db(transaction=True)
+def test_ordering_is_part_of_the_cache_key(client, settings):
+    settings.CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+    caches["default"].clear()
+
+    assert names(client.get(BASE_PATH)) == ["b", "a", "b", "a"]
+
+    response = client.get(BASE_PATH, params={"ordering": "name"})
+    assert response.headers["X-Cache"] == "MISS"
+    assert names(response) == ["a", "a", "b", "b"]
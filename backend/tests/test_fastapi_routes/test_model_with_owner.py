@@ -89,7 +89,7 @@ def test_testapp_testmodelwithowner_other_user_cannot_access(client, api_key_use
 
     response = client.get(f"{BASE_PATH}{uuid}/", headers={"X-API-Key": api_key_other_user.key})
     assert response.status_code == 404, response.content.decode("utf-8")
-    assert response.json() == {"detail": "Object not found."}
+    assert response.json() == {"detail": f"Object {uuid} not found."}
 
     response = client.put(
         f"{BASE_PATH}{uuid}/",
@@ -97,7 +97,7 @@ def test_testapp_testmodelwithowner_other_user_cannot_access(client, api_key_use
         json={"name": "Should not be able to set this!"},
     )
     assert response.status_code == 404, response.content.decode("utf-8")
-    assert response.json() == {"detail": "Object not found."}
+    assert response.json() == {"detail": f"Object {uuid} not found."}
 
     response = client.patch(
         f"{BASE_PATH}{uuid}/",
@@ -105,8 +105,8 @@ def test_testapp_testmodelwithowner_other_user_cannot_access(client, api_key_use
         json={"name": "Should not be able to set this!"},
     )
     assert response.status_code == 404, response.content.decode("utf-8")
-    assert response.json() == {"detail": "Object not found."}
+    assert response.json() == {"detail": f"Object {uuid} not found."}
 
     response = client.delete(f"{BASE_PATH}{uuid}/", headers={"X-API-Key": api_key_other_user.key})
     assert response.status_code == 404, response.content.decode("utf-8")
-    assert response.json() == {"detail": "Object not found."}
+    assert response.json() == {"detail": f"Object {uuid} not found."}
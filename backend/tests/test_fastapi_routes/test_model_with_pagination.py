@@ -0,0 +1,116 @@
+import base64
+import json
+from datetime import timedelta
+from uuid import UUID
+
+import pytest
+from django.utils import timezone
+from fastapi.testclient import TestClient
+from test_app.models import SimpleIDModel, SimpleTimeStampedModel
+
+from projectx.api.fastapi import RouteBuilder
+
+BASE_PATH = "/simpletimestampedmodels/"
+ID_BASE_PATH = "/simpleidmodels/"
+
+
+@pytest.mark.django_db(transaction=True)
+@pytest.fixture(name="client")
+def get_client(app, router):
+    route_builder = RouteBuilder(
+        SimpleTimeStampedModel,
+        request_fields=["name"],
+        response_fields=["name"],
+        config={
+            "identifier": "uuid",
+            "identifier_class": UUID,
+            "pagination": {"ordering": "-created", "page_size": 2, "max_page_size": 3},
+        },
+    )
+    route_builder.add_all_routes(router)
+    id_route_builder = RouteBuilder(SimpleIDModel, response_fields=["name"], config={"pagination": {}})
+    id_route_builder.add_all_routes(router)
+    app.include_router(router)
+    return TestClient(app)
+
+
+@pytest.mark.django_db(transaction=True)
+@pytest.fixture(name="timestamped_models")
+def create_timestamped_models():
+    same_time = timezone.now()
+    instances = [SimpleTimeStampedModel.objects.create(name=f"name{i}") for i in range(5)]
+    # Two rows with an identical ordering value must still page in a stable order.
+    SimpleTimeStampedModel.objects.filter(pk__in=[instances[1].pk, instances[2].pk]).update(created=same_time)
+    SimpleTimeStampedModel.objects.filter(pk=instances[0].pk).update(created=same_time - timedelta(days=1))
+    SimpleTimeStampedModel.objects.filter(pk__in=[i.pk for i in instances[3:]]).update(
+        created=same_time + timedelta(days=1)
+    )
+    return instances
+
+
+@pytest.mark.django_db(transaction=True)
+def test_pagination_pages_through_all_rows(client, timestamped_models, mocker):
+    assert timestamped_models
+
+    response = client.get(BASE_PATH)
+    assert response.status_code == 200, response.content.decode("utf-8")
+    assert response.json() == {"items": [{"name": "name4"}, {"name": "name3"}], "next": mocker.ANY}
+
+    response = client.get(BASE_PATH, params={"cursor": response.json()["next"]})
+    assert response.status_code == 200, response.content.decode("utf-8")
+    assert response.json()["items"] == [{"name": "name2"}, {"name": "name1"}]
+
+    response = client.get(BASE_PATH, params={"cursor": response.json()["next"]})
+    assert response.status_code == 200, response.content.decode("utf-8")
+    assert response.json() == {"items": [{"name": "name0"}], "next": None}
+
+
+@pytest.mark.django_db(transaction=True)
+def test_pagination_limit(client, timestamped_models):
+    assert timestamped_models
+
+    response = client.get(BASE_PATH, params={"limit": 3})
+    assert response.status_code == 200, response.content.decode("utf-8")
+    assert response.json()["items"] == [{"name": "name4"}, {"name": "name3"}, {"name": "name2"}]
+
+    response = client.get(BASE_PATH, params={"limit": 3, "cursor": response.json()["next"]})
+    assert response.status_code == 200, response.content.decode("utf-8")
+    assert response.json() == {"items": [{"name": "name1"}, {"name": "name0"}], "next": None}
+
+    response = client.get(BASE_PATH, params={"limit": 4})
+    assert response.status_code == 422, response.content.decode("utf-8")
+
+    response = client.get(BASE_PATH, params={"limit": 0})
+    assert response.status_code == 422, response.content.decode("utf-8")
+
+
+@pytest.mark.django_db(transaction=True)
+def test_pagination_by_pk(client):
+    for i in range(3):
+        SimpleIDModel.objects.create(name=f"name{i}")
+
+    response = client.get(ID_BASE_PATH, params={"limit": 2})
+    assert response.status_code == 200, response.content.decode("utf-8")
+    assert response.json()["items"] == [{"name": "name0"}, {"name": "name1"}]
+
+    response = client.get(ID_BASE_PATH, params={"limit": 2, "cursor": response.json()["next"]})
+    assert response.status_code == 200, response.content.decode("utf-8")
+    assert response.json() == {"items": [{"name": "name2"}], "next": None}
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        "not-base64!",
+        base64.urlsafe_b64encode(b"not json").decode(),
+        base64.urlsafe_b64encode(json.dumps(1).encode()).decode(),
+        base64.urlsafe_b64encode(json.dumps(["-created", "2020-01-01T00:00:00+00:00"]).encode()).decode(),
+        base64.urlsafe_b64encode(json.dumps(["created", "2020-01-01T00:00:00+00:00", "1"]).encode()).decode(),
+        base64.urlsafe_b64encode(json.dumps(["-created", "not a date", "1"]).encode()).decode(),
+    ],
+)
+@pytest.mark.django_db(transaction=True)
+def test_pagination_invalid_cursor(client, cursor):
+    response = client.get(BASE_PATH, params={"cursor": cursor})
+    assert response.status_code == 400, response.content.decode("utf-8")
+    assert response.json() == {"detail": "Invalid cursor."}
@@ -0,0 +1,134 @@
+from datetime import timedelta
+from uuid import UUID
+
+import pytest
+from django.core.cache import caches
+from django.utils import timezone
+from test_app.models import (
+    Choice,
+    Question,
+    SimpleModelWithArray,
+    SimpleTimeStampedModel,
+    UniqueModel,
+)
+
+from projectx.api.fastapi import RouteBuilder
+
+TIMESTAMPED_PATH = "/simpletimestampedmodels/"
+ASYNC_PATH = "/asyncmodels/"
+ARRAY_PATH = "/simplemodelwitharrays/"
+CHOICES_PATH = "/choices/"
+UNIQUE_PATH = "/uniquemodels/"
+
+
+@pytest.fixture(name="route_builders")
+def get_route_builders():
+    config = {
+        "identifier": "uuid",
+        "identifier_class": UUID,
+        "filters": {"uuid": ["exact", "in"], "created": ["gte", "lte"]},
+    }
+    return {
+        "timestamped": RouteBuilder(
+            SimpleTimeStampedModel, response_fields=["name"], config={**config, "cache": {}, "conditional": {}}
+        ),
+        "async": RouteBuilder(
+            SimpleTimeStampedModel, response_fields=["name"], config={**config, "name": "AsyncModel", "async": True}
+        ),
+        "array": RouteBuilder(
+            SimpleModelWithArray,
+            response_fields=["name"],
+            config={"filters": {"an_array": ["contains"], "name": ["exact", "isnull"]}},
+        ),
+        "choice": RouteBuilder(
+            Choice, response_fields=["name"], config={**config, "filters": {"question": ["exact", "in"]}}
+        ),
+        "unique": RouteBuilder(UniqueModel, response_fields=["name"], config={"filters": {"name": ["exact"]}}),
+    }
+
+
+def names(response):
+    assert response.status_code == 200, response.content.decode("utf-8")
+    return [item["name"] for item in response.json()["items"]]
+
+
+@pytest.mark.parametrize("path", [TIMESTAMPED_PATH, ASYNC_PATH])
+@pytest.mark.django_db(transaction=True)
+def test_list_filters(client, path):
+    instances = [SimpleTimeStampedModel.objects.create(name=f"name{i}") for i in range(3)]
+    now = timezone.now()
+    SimpleTimeStampedModel.objects.filter(pk=instances[0].pk).update(created=now - timedelta(days=2))
+    SimpleTimeStampedModel.objects.filter(pk=instances[2].pk).update(created=now + timedelta(days=2))
+
+    assert sorted(names(client.get(path))) == ["name0", "name1", "name2"]
+    assert names(client.get(path, params={"uuid": str(instances[1].uuid)})) == ["name1"]
+    assert sorted(names(client.get(path, params={"uuid__in": [str(instances[0].uuid), str(instances[2].uuid)]}))) == [
+        "name0",
+        "name2",
+    ]
+    params = {
+        "created__gte": (now - timedelta(days=1)).isoformat(),
+        "created__lte": (now + timedelta(days=1)).isoformat(),
+    }
+    assert names(client.get(path, params=params)) == ["name1"]
+
+    response = client.get(path, params={"uuid": "one"})
+    assert response.status_code == 422, response.content.decode("utf-8")
+    assert response.json()["detail"][0]["loc"] == ["query", "uuid"]
+
+
+@pytest.mark.django_db(transaction=True)
+def test_list_filters_on_arrays(client):
+    for name, an_array in [("name0", ["a", "b"]), ("name1", ["b", "c"]), ("name2", None)]:
+        SimpleModelWithArray.objects.create(name=name, an_array=an_array)
+
+    assert names(client.get(ARRAY_PATH, params={"an_array__contains": ["b"]})) == ["name0", "name1"]
+    assert names(client.get(ARRAY_PATH, params={"an_array__contains": ["a", "b"]})) == ["name0"]
+    assert names(client.get(ARRAY_PATH, params={"an_array__contains": ["b"], "name": "name1"})) == ["name1"]
+    assert names(client.get(ARRAY_PATH, params={"name__isnull": "true"})) == []
+
+
+@pytest.mark.django_db(transaction=True)
+def test_list_filters_on_foreign_keys(client):
+    questions = [Question.objects.create(name=f"question{i}") for i in range(3)]
+    for index, question in enumerate(questions):
+        Choice.objects.create(name=f"choice{index}", question=question)
+
+    assert names(client.get(CHOICES_PATH, params={"question": str(questions[1].uuid)})) == ["choice1"]
+    params = {"question__in": [str(questions[0].uuid), str(questions[1].uuid)]}
+    assert sorted(names(client.get(CHOICES_PATH, params=params))) == ["choice0", "choice1"]
+
+
+@pytest.mark.django_db(transaction=True)
+def test_list_filters_on_unique_together_field(client):
+    UniqueModel.objects.create(code="code0", name="name0", group="group")
+    UniqueModel.objects.create(code="code1", name="name1", group="group")
+
+    assert names(client.get(UNIQUE_PATH, params={"name": "name1"})) == ["name1"]
+
+
+@pytest.mark.django_db(transaction=True)
+def test_list_filters_are_part_of_the_cache_key(client, settings):
+    settings.CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+    caches["default"].clear()
+    instances = [SimpleTimeStampedModel.objects.create(name=f"name{i}") for i in range(2)]
+
+    assert names(client.get(TIMESTAMPED_PATH)) == ["name0", "name1"]
+
+    response = client.get(TIMESTAMPED_PATH, params={"uuid": str(instances[0].uuid)})
+    assert names(response) == ["name0"]
+    assert response.headers["X-Cache"] == "MISS"
+
+    response = client.get(TIMESTAMPED_PATH, params={"uuid": str(instances[0].uuid)})
+    assert names(response) == ["name0"]
+    assert response.headers["X-Cache"] == "HIT"
+
+
+@pytest.mark.django_db(transaction=True)
+def test_list_filters_are_part_of_the_etag(client):
+    instances = [SimpleTimeStampedModel.objects.create(name=f"name{i}") for i in range(2)]
+
+    etag = client.get(TIMESTAMPED_PATH).headers["ETag"]
+    response = client.get(TIMESTAMPED_PATH, params={"uuid": str(instances[0].uuid)}, headers={"If-None-Match": etag})
+    assert names(response) == ["name0"]
+    assert response.headers["ETag"] != etag
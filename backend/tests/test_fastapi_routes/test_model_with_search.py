@@ -0,0 +1,171 @@
+from uuid import UUID
+
+import pytest
+from django.core.cache import caches
+from django.db import connection
+from test_app.models import SearchableModel
+
+from projectx.api.fastapi import RouteBuilder
+
+SEARCHABLE_PATH = "/searchablemodels/"
+ASYNC_PATH = "/asyncmodels/"
+PAGINATED_PATH = "/paginatedmodels/"
+FAST_PATH = "/fastmodels/"
+ORDERED_PATH = "/orderedmodels/"
+UNORDERED_PATH = "/unorderedmodels/"
+
+
+@pytest.fixture(name="route_builders")
+def get_route_builders():
+    config = {"identifier": "uuid", "identifier_class": UUID, "search": {"fields": ["name", "description"]}}
+    return {
+        "searchable": RouteBuilder(SearchableModel, config={**config, "cache": {}, "conditional": {}}),
+        "async": RouteBuilder(SearchableModel, config={**config, "name": "AsyncModel", "async": True}),
+        "paginated": RouteBuilder(
+            SearchableModel, config={**config, "name": "PaginatedModel", "pagination": {"page_size": 2}}
+        ),
+        "fast": RouteBuilder(
+            SearchableModel,
+            config={**config, "name": "FastModel", "pagination": {"page_size": 2}, "fast_serialization": True},
+        ),
+        "ordered": RouteBuilder(
+            SearchableModel,
+            config={**config, "name": "OrderedModel", "ordering": {"fields": ["uuid"], "default": "-uuid"}},
+        ),
+        "unordered": RouteBuilder(
+            SearchableModel, config={**config, "name": "UnorderedModel", "ordering": {"fields": ["uuid"]}}
+        ),
+    }
+
+
+@pytest.fixture(name="trigger")
+def get_trigger(django_db_blocker, route_builders):
+    # The test models have no migrations, so the trigger is added by running the operation directly.
+    operation = route_builders["searchable"].search_trigger()
+    with django_db_blocker.unblock():
+        with connection.schema_editor() as editor:
+            operation.database_forwards("test_app", editor, None, None)
+        yield operation
+        with connection.schema_editor() as editor:
+            operation.database_backwards("test_app", editor, None, None)
+
+
+def names(response):
+    assert response.status_code == 200, response.content.decode("utf-8")
+    return [item["name"] for item in response.json()["items"]]
+
+
+@pytest.mark.usefixtures("trigger")
+@pytest.mark.parametrize("path", [SEARCHABLE_PATH, ASYNC_PATH])
+@pytest.mark.django_db(transaction=True)
+def test_search(client, path):
+    SearchableModel.objects.create(name="Salad", description="Leaves")
+    SearchableModel.objects.create(name="Pizza", description="A pizza oven")
+    SearchableModel.objects.create(name="Oven", description="Bakes pizzas")
+
+    # The most relevant matches are first, and words are matched by their stem.
+    assert names(client.get(path, params={"search": "pizza"})) == ["Pizza", "Oven"]
+    assert names(client.get(path, params={"search": "pizza -oven"})) == []
+    assert names(client.get(path, params={"search": "baked"})) == ["Oven"]
+    assert names(client.get(path, params={"search": " "})) == ["Salad", "Pizza", "Oven"]
+
+    response = client.get(path, params={"search": "pizza"})
+    assert set(response.json()["items"][0]) == {"uuid", "name", "description", "last_updated"}
+
+
+@pytest.mark.usefixtures("trigger")
+@pytest.mark.django_db(transaction=True)
+def test_search_ranked_unless_ordered(client):
+    instances = [SearchableModel.objects.create(name="Pizza", description="pizza " * i) for i in range(3)]
+
+    # Ordering is configured without a default, so the matches are ranked unless an ordering is requested.
+    response = client.get(UNORDERED_PATH, params={"search": "pizza"})
+    assert response.status_code == 200, response.content.decode("utf-8")
+    assert [item["uuid"] for item in response.json()["items"]] == [str(instance.uuid) for instance in instances[::-1]]
+
+    response = client.get(UNORDERED_PATH, params={"search": "pizza", "ordering": "uuid"})
+    expected = sorted(str(instance.uuid) for instance in instances)
+    assert [item["uuid"] for item in response.json()["items"]] == expected
+
+
+@pytest.mark.usefixtures("trigger")
+@pytest.mark.django_db(transaction=True)
+def test_search_vector_follows_writes(client):
+    response = client.post(SEARCHABLE_PATH, json={"name": "Pizza"})
+    assert response.status_code == 200, response.content.decode("utf-8")
+    assert names(client.get(SEARCHABLE_PATH, params={"search": "pizza"})) == ["Pizza"]
+
+    # Writes which send no signals keep the vector up to date too.
+    SearchableModel.objects.update(name="Salad")
+    assert names(client.get(SEARCHABLE_PATH, params={"search": "pizza"})) == []
+    assert names(client.get(SEARCHABLE_PATH, params={"search": "salad"})) == ["Salad"]
+
+
+@pytest.mark.usefixtures("trigger")
+@pytest.mark.parametrize("path", [PAGINATED_PATH, FAST_PATH])
+@pytest.mark.django_db(transaction=True)
+def test_search_pages(client, path):
+    instances = [
+        SearchableModel.objects.create(name=f"Pizza {i}", description="pizza " * description)
+        for i, description in enumerate([0, 2, 0, 1, 2])
+    ]
+    SearchableModel.objects.create(name="Salad")
+
+    # Pages are in rank order, and matches of the same rank are in primary key order, across pages too.
+    response = client.get(path, params={"search": "pizza"})
+    assert names(response) == ["Pizza 1", "Pizza 4"]
+
+    response = client.get(path, params={"search": "pizza", "cursor": response.json()["next"]})
+    assert names(response) == ["Pizza 3", "Pizza 0"]
+
+    response = client.get(path, params={"search": "pizza", "cursor": response.json()["next"]})
+    assert names(response) == ["Pizza 2"]
+    assert response.json()["next"] is None
+
+    # A cursor of the unranked list does not continue a search.
+    response = client.get(path)
+    assert names(response) == ["Pizza 0", "Pizza 1"]
+    response = client.get(path, params={"search": "pizza", "cursor": response.json()["next"]})
+    assert response.status_code == 400, response.content.decode("utf-8")
+
+    # An explicit ordering replaces the ranking.
+    expected = [instance.name for instance in sorted(instances, key=lambda instance: instance.uuid, reverse=True)]
+    assert names(client.get(ORDERED_PATH, params={"search": "pizza"})) == expected
+
+
+@pytest.mark.usefixtures("trigger")
+@pytest.mark.django_db(transaction=True)
+def test_search_is_one_query(route_builders, django_assert_num_queries):
+    SearchableModel.objects.create(name="Pizza")
+
+    with django_assert_num_queries(1) as context:
+        route_builders["searchable"].respond_list(None, None, None, search="pizza")
+
+    assert "@@" in context.captured_queries[0]["sql"]
+
+
+@pytest.mark.usefixtures("trigger")
+@pytest.mark.django_db(transaction=True)
+def test_search_is_part_of_the_cache_key_and_etag(client, settings):
+    settings.CACHES = {"default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}}
+    caches["default"].clear()
+    SearchableModel.objects.create(name="Pizza")
+    SearchableModel.objects.create(name="Salad")
+
+    etag = client.get(SEARCHABLE_PATH).headers["ETag"]
+
+    response = client.get(SEARCHABLE_PATH, params={"search": "salad"}, headers={"If-None-Match": etag})
+    assert names(response) == ["Salad"]
+    assert response.headers["X-Cache"] == "MISS"
+    assert response.headers["ETag"] != etag
+
+    response = client.get(SEARCHABLE_PATH, params={"search": "salad"})
+    assert names(response) == ["Salad"]
+    assert response.headers["X-Cache"] == "HIT"
+
+
+def test_search_trigger_uses_the_search_config():
+    route_builder = RouteBuilder(SearchableModel, config={"search": {"fields": ["name"], "config": "simple"}})
+
+    sql = route_builder.search_trigger().sql
+    assert 'tsvector_update_trigger("search_vector", \'pg_catalog.simple\', "name")' in sql[1]
@@ -0,0 +1,103 @@
+from uuid import UUID
+
+import pytest
+from django.db.models import Q
+from fastapi.testclient import TestClient
+from test_app import models
+
+from projectx.api.fastapi import RouteBuilder
+
+UUID_CONFIG = {"identifier": "uuid", "identifier_class": UUID}
+
+
+@pytest.mark.django_db(transaction=True)
+@pytest.fixture(name="client")
+def get_client(app, router):
+    def filter_by_name(_):
+        return Q(name__contains="XXX")
+
+    RouteBuilder(models.SimpleModel, config=UUID_CONFIG, query_filter=filter_by_name).add_all_routes(router)
+    RouteBuilder(models.Pizza, config={**UUID_CONFIG, "pagination": {"page_size": 2}}).add_all_routes(router)
+    RouteBuilder(models.Pizza, config={**UUID_CONFIG, "name": "FastPizza", "fast_serialization": True}).add_all_routes(
+        router
+    )
+    app.include_router(router)
+    return TestClient(app)
+
+
+@pytest.mark.django_db(transaction=True)
+@pytest.fixture(name="pizza")
+def create_pizza():
+    topping = models.Topping.objects.create(name="topping")
+    pizza = models.Pizza.objects.create(name="pizza")
+    pizza.toppings.add(topping)
+    return pizza
+
+
+@pytest.mark.django_db(transaction=True)
+def test_sparse_fields_list_and_get(client):
+    simple_model = models.SimpleModel.objects.create(name="XXX", config={"large": "blob"})
+    models.SimpleModel.objects.create(name="YYY - Should NOT appear in response")
+
+    response = client.get("/simplemodels/", params={"fields": "name,uuid"})
+    assert response.status_code == 200, response.content.decode("utf-8")
+    assert response.json() == {"items": [{"name": "XXX", "uuid": str(simple_model.uuid)}]}
+
+    response = client.get(f"/simplemodels/{simple_model.uuid}/", params={"fields": "config"})
+    assert response.status_code == 200, response.content.decode("utf-8")
+    assert response.json() == {"config": {"large": "blob"}}
+
+
+@pytest.mark.django_db(transaction=True)
+def test_sparse_fields_related(client, pizza):
+    topping_uuid = str(pizza.toppings.get().uuid)
+    models.Pizza.objects.create(name="pizza2")
+    models.Pizza.objects.create(name="pizza3")
+
+    response = client.get("/pizzas/", params={"fields": "toppings"})
+    assert response.status_code == 200, response.content.decode("utf-8")
+    items = response.json()["items"]
+    assert len(items) == 2
+
+    response = client.get("/pizzas/", params={"fields": "toppings", "cursor": response.json()["next"]})
+    assert response.status_code == 200, response.content.decode("utf-8")
+    assert response.json()["next"] is None
+    items += response.json()["items"]
+    assert sorted(items, key=lambda item: len(item["toppings"])) == [
+        {"toppings": []},
+        {"toppings": []},
+        {"toppings": [{"uuid": topping_uuid}]},
+    ]
+
+    for path in ["pizzas", "fastpizzas"]:
+        response = client.get(f"/{path}/{pizza.uuid}/", params={"fields": "name,toppings"})
+        assert response.status_code == 200, response.content.decode("utf-8")
+        assert response.json() == {"name": "pizza", "toppings": [{"uuid": topping_uuid}]}
+
+    response = client.get("/fastpizzas/", params={"fields": "name"})
+    assert response.status_code == 200, response.content.decode("utf-8")
+    assert sorted(item["name"] for item in response.json()["items"]) == ["pizza", "pizza2", "pizza3"]
+
+
+@pytest.mark.parametrize("fields", ["invalid", "name,invalid", "", ","])
+@pytest.mark.django_db(transaction=True)
+def test_sparse_fields_invalid(client, pizza, fields):
+    for path in ["/pizzas/", f"/pizzas/{pizza.uuid}/"]:
+        response = client.get(path, params={"fields": fields})
+        assert response.status_code == 400, response.content.decode("utf-8")
+        assert response.json()["detail"].endswith("choose from ['name', 'toppings', 'uuid'].")
+
+
+@pytest.mark.django_db(transaction=True)
+def test_sparse_fields_only_loads_requested_columns(pizza, django_assert_num_queries):
+    route_builder = RouteBuilder(models.SimpleModel, config=UUID_CONFIG)
+    models.SimpleModel.objects.create(name="name")
+    field_plans = route_builder.fields_function(fields="name")
+
+    instance = route_builder.get_queryset(None, field_plans).get()
+    assert instance.get_deferred_fields() == {"uuid", "created", "last_updated", "config"}
+
+    route_builder = RouteBuilder(models.Pizza, config=UUID_CONFIG)
+    with django_assert_num_queries(1):
+        instance = route_builder.get_queryset(None, route_builder.fields_function(fields="name")).get(pk=pizza.pk)
+    assert instance.get_deferred_fields() == set()
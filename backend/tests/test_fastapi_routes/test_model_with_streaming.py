@@ -0,0 +1,72 @@
+import json
+
+import pytest
+from django.db.models import Q
+from fastapi.testclient import TestClient
+from test_app.models import SimpleIDModel, SimpleModel
+
+from projectx.api.fastapi import RouteBuilder
+
+BASE_PATH = "/simplemodels/"
+ID_BASE_PATH = "/simpleidmodels/"
+
+
+@pytest.mark.django_db(transaction=True)
+@pytest.fixture(name="client")
+def get_client(app, router):
+    def filter_by_name(_):
+        return Q(name__contains="XXX")
+
+    route_builder = RouteBuilder(
+        SimpleModel,
+        response_fields=["name"],
+        query_filter=filter_by_name,
+        config={"streaming": {"format": "ndjson", "chunk_size": 2}},
+    )
+    route_builder.add_all_routes(router)
+    id_route_builder = RouteBuilder(SimpleIDModel, response_fields=["name"], config={"streaming": {"format": "json"}})
+    id_route_builder.add_all_routes(router)
+    app.include_router(router)
+    return TestClient(app)
+
+
+@pytest.mark.django_db(transaction=True)
+def test_streaming_ndjson(client):
+    for i in range(5):
+        SimpleModel.objects.create(name=f"XXX{i}")
+    SimpleModel.objects.create(name="YYY - Should NOT appear in response")
+
+    response = client.get(BASE_PATH)
+    assert response.status_code == 200, response.content.decode("utf-8")
+    assert response.headers["content-type"] == "application/x-ndjson"
+    lines = response.content.decode("utf-8").splitlines()
+    assert sorted(json.loads(line)["name"] for line in lines) == ["XXX0", "XXX1", "XXX2", "XXX3", "XXX4"]
+
+
+@pytest.mark.django_db(transaction=True)
+def test_streaming_ndjson_empty(client):
+    response = client.get(BASE_PATH)
+    assert response.status_code == 200, response.content.decode("utf-8")
+    assert response.content == b""
+
+
+@pytest.mark.django_db(transaction=True)
+def test_streaming_json(client):
+    for i in range(3):
+        SimpleIDModel.objects.create(name=f"name{i}")
+
+    response = client.get(ID_BASE_PATH)
+    assert response.status_code == 200, response.content.decode("utf-8")
+    assert response.headers["content-type"] == "application/json"
+    assert sorted(response.json()["items"], key=lambda item: item["name"]) == [
+        {"name": "name0"},
+        {"name": "name1"},
+        {"name": "name2"},
+    ]
+
+
+@pytest.mark.django_db(transaction=True)
+def test_streaming_json_empty(client):
+    response = client.get(ID_BASE_PATH)
+    assert response.status_code == 200, response.content.decode("utf-8")
+    assert response.json() == {"items": []}
@@ -63,3 +63,40 @@ def test_create_and_patch(client, mocker):
         "last_updated": mocker.ANY,
         "config": {"k2": "v2"},
     }
+
+
+@pytest.mark.django_db(transaction=True)
+def test_patch_only_writes_changed_fields(django_assert_num_queries):
+    route_builder = RouteBuilder(SimpleModel, config={"identifier": "uuid", "identifier_class": UUID})
+    instance = SimpleModel.objects.create(name="name", config={"k": "v"})
+    last_updated = instance.last_updated
+    api_instance = route_builder.updating_schema(name="name2")
+
+    with django_assert_num_queries(1) as context:
+        api_instance.update(instance, fields_to_update=api_instance.dict(exclude_unset=True))
+
+    update_sql = context.captured_queries[0]["sql"]
+    assert '"name"' in update_sql
+    assert '"last_updated"' in update_sql
+    assert '"config"' not in update_sql
+    assert '"created"' not in update_sql
+
+    instance.refresh_from_db()
+    assert instance.name == "name2"
+    assert instance.last_updated > last_updated
+
+
+@pytest.mark.django_db(transaction=True)
+def test_unchanged_update_is_not_written(client, django_assert_num_queries):
+    route_builder = RouteBuilder(SimpleModel, config={"identifier": "uuid", "identifier_class": UUID})
+    instance = SimpleModel.objects.create(name="name", config={"k": "v"})
+    last_updated = instance.last_updated
+
+    with django_assert_num_queries(0):
+        route_builder.updating_schema(name="name").update(instance, fields_to_update={"name": "name"})
+        route_builder.new_instance_schema(name="name", config={"k": "v"}).update(instance)
+
+    response = client.put(f"{BASE_PATH}{instance.uuid}/", json={"name": "name", "config": {"k": "v"}})
+    assert response.status_code == 200, response.content.decode("utf-8")
+    instance.refresh_from_db()
+    assert instance.last_updated == last_updated
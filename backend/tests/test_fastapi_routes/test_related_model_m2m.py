@@ -60,3 +60,14 @@ def test_related_model_with_m2m_create_list_update_get_and_delete(client, toppin
     response = client.delete(f"{BASE_PATH}{uuid}/")
     assert response.status_code == 404, response.content.decode("utf-8")
     assert response.json() == {"detail": f"Object {uuid} not found."}
+
+
+@pytest.mark.django_db(transaction=True)
+def test_related_model_with_m2m_missing_related_object(client, topping):
+    missing = "00000000-0000-0000-0000-000000000000"
+    response = client.post(BASE_PATH, json={"name": "name", "toppings": [{"uuid": str(topping.pk)}, {"uuid": missing}]})
+    assert response.status_code == 422, response.content.decode("utf-8")
+    assert response.json() == {
+        "detail": [{"loc": ["body", "toppings"], "msg": f"Topping {missing} does not exist.", "type": "value_error"}]
+    }
+    assert not models.Pizza.objects.exists()
@@ -0,0 +1,115 @@
+from uuid import UUID
+
+import pytest
+from test_app import models
+
+from projectx.api.fastapi import RouteBuilder
+
+CONFIG = {"identifier": "uuid", "identifier_class": UUID}
+
+
+@pytest.mark.django_db(transaction=True)
+@pytest.fixture(name="pizzas")
+def create_pizzas():
+    toppings = [models.Topping.objects.create(name=f"topping{i}") for i in range(3)]
+    pizzas = [models.Pizza.objects.create(name=f"pizza{i}") for i in range(10)]
+    for pizza in pizzas:
+        pizza.toppings.set(toppings)
+    return pizzas
+
+
+@pytest.mark.django_db(transaction=True)
+@pytest.fixture(name="questions")
+def create_questions():
+    questions = [models.Question.objects.create(name=f"question{i}") for i in range(10)]
+    for question in questions:
+        for i in range(3):
+            models.Choice.objects.create(name=f"choice{i}", question=question)
+    return questions
+
+
+@pytest.mark.django_db(transaction=True)
+def test_list_many_to_many_queries(pizzas, django_assert_num_queries):
+    route_builder = RouteBuilder(models.Pizza, config=CONFIG)
+
+    with django_assert_num_queries(2):
+        pizza_list = route_builder.multiple_instance_schema.from_qs(route_builder.get_queryset(None))
+
+    assert len(pizza_list.items) == len(pizzas)
+    assert all(len(pizza.toppings) == 3 for pizza in pizza_list.items)
+
+
+@pytest.mark.django_db(transaction=True)
+def test_list_reverse_many_to_many_queries(pizzas, django_assert_num_queries):
+    assert pizzas
+
+    route_builder = RouteBuilder(models.Topping, config=CONFIG)
+
+    # The reverse relation is not part of the schema, so it is not prefetched.
+    with django_assert_num_queries(1):
+        topping_list = route_builder.multiple_instance_schema.from_qs(route_builder.get_queryset(None))
+
+    assert len(topping_list.items) == 3
+
+
+@pytest.mark.django_db(transaction=True)
+def test_list_reverse_foreign_key_queries(questions, django_assert_num_queries):
+    route_builder = RouteBuilder(models.Question, config=CONFIG)
+
+    with django_assert_num_queries(2):
+        question_list = route_builder.multiple_instance_schema.from_qs(route_builder.get_queryset(None))
+
+    assert len(question_list.items) == len(questions)
+    assert all(len(question.choices) == 3 for question in question_list.items)
+
+
+@pytest.mark.django_db(transaction=True)
+def test_list_foreign_key_queries(questions, django_assert_num_queries):
+    route_builder = RouteBuilder(models.Choice, config=CONFIG)
+
+    with django_assert_num_queries(1):
+        choice_list = route_builder.multiple_instance_schema.from_qs(route_builder.get_queryset(None))
+
+    assert {choice.question for choice in choice_list.items} == {question.pk for question in questions}
+
+
+@pytest.mark.django_db(transaction=True)
+def test_get_queries(pizzas, django_assert_num_queries):
+    route_builder = RouteBuilder(models.Pizza, config=CONFIG)
+
+    with django_assert_num_queries(2):
+        pizza = route_builder.instance_schema.from_model(route_builder.get_function(pizzas[0].pk))
+
+    assert len(pizza.toppings) == 3
+
+
+@pytest.mark.django_db(transaction=True)
+def test_create_many_to_many_queries(django_assert_num_queries):
+    toppings = [models.Topping.objects.create(name=f"topping{i}") for i in range(20)]
+    route_builder = RouteBuilder(models.Pizza, config=CONFIG)
+    api_instance = route_builder.new_instance_schema(
+        name="pizza", toppings=[{"uuid": topping.uuid} for topping in toppings]
+    )
+
+    # Load the toppings, check the pizza uuid is unique, insert the pizza, then insert all the links at once.
+    with django_assert_num_queries(4):
+        pizza = api_instance.create_new()
+
+    assert pizza.toppings.count() == 20
+
+
+@pytest.mark.django_db(transaction=True)
+def test_update_many_to_many_queries(pizzas, django_assert_num_queries):
+    toppings = list(models.Topping.objects.all()) + [models.Topping.objects.create(name="topping3")]
+    route_builder = RouteBuilder(models.Pizza, config=CONFIG)
+    instance = route_builder.get_function(pizzas[0].pk)
+    api_instance = route_builder.new_instance_schema(
+        name="pizza", toppings=[{"uuid": topping.uuid} for topping in toppings[1:]]
+    )
+
+    # Load the toppings, update the pizza, read the links, change only the ones which differ, then read them back.
+    with django_assert_num_queries(6):
+        pizza = api_instance.update(instance)
+
+    assert sorted(topping["uuid"] for topping in pizza.toppings) == sorted(topping.uuid for topping in toppings[1:])
+    assert models.Pizza.toppings.through.objects.filter(pizza=pizzas[0]).count() == 3